@@ -0,0 +1,360 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List, Dict, Any, Callable, Optional
+
+from questions_module import Question, QUESTION_TYPES
+from search_module import SearchIndex
+from selection_module import SelectionIndex
+from storage_module import JournalStorage, LazyTestBank
+
+# Шаблони у форматі to_dict: по одному на кожен тип питання
+SAMPLE_DICTS: List[Dict[str, Any]] = [
+    {"q_type": "SingleChoice", "text": "Столиця Франції?", "difficulty": 1, "topic": "Загальне",
+     "options": ["Париж", "Лондон", "Берлін"], "correct": "Париж"},
+    {"q_type": "MultiChoice", "text": "Оберіть мови програмування:", "difficulty": 2, "topic": "Загальне",
+     "options": ["HTML", "Python", "CSS", "C++"], "correct_list": ["Python", "C++"]},
+    {"q_type": "Text", "text": "Що таке інкапсуляція?", "difficulty": 2, "topic": "ООП",
+     "keywords": ["приховування", "дані", "методи"]},
+    {"q_type": "Scale", "text": "Оцініть складність від 1 до 10", "difficulty": 1, "topic": "Загальне",
+     "correct_val": 7, "tolerance": 1},
+    {"q_type": "TrueFalse", "text": "Python - інтерпретована мова", "difficulty": 1, "topic": "Загальне",
+     "correct_bool": True},
+    {"q_type": "Matching", "text": "З'єднайте столиці:", "difficulty": 3, "topic": "Географія",
+     "pairs": {"Україна": "Київ", "Франція": "Париж", "Італія": "Рим"}},
+    {"q_type": "Ordering", "text": "Впорядкуйте етапи:", "difficulty": 3, "topic": "ООП",
+     "correct_order": ["аналіз", "проєктування", "реалізація", "тестування"]},
+    {"q_type": "FillBlank", "text": "Клас - це ___ об'єктів", "difficulty": 2, "topic": "ООП",
+     "acceptable_answers": ["шаблон", "креслення"]},
+]
+
+
+class LegacyQuestion:
+    # Розкладка питання до переходу на __slots__: словник екземпляра, власна копія q_type/topic і списки
+    def __init__(self, data: Dict[str, Any]):
+        self.__dict__.update(data)
+
+
+def synthetic_dicts(count: int):
+    # json.loads на кожне питання дає свіжі рядки, як під час читання tests.json
+    templates = [json.dumps(d, ensure_ascii=False) for d in SAMPLE_DICTS]
+    for i in range(count):
+        yield json.loads(templates[i % len(templates)])
+
+
+def measure_bytes_per_question(factory: Callable[[Dict[str, Any]], Any], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    bank = [factory(d) for d in synthetic_dicts(count)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del bank
+    return (current - base) / count
+
+
+def memory_benchmark(count: int) -> Dict[str, float]:
+    before = measure_bytes_per_question(LegacyQuestion, count)
+    after = measure_bytes_per_question(Question.from_dict, count)
+    return {"count": count, "legacy_bytes_per_question": before, "slots_bytes_per_question": after}
+
+
+WORDS = ["клас", "об'єкт", "метод", "спадкування", "поліморфізм", "інкапсуляція", "інтерфейс", "модуль",
+         "функція", "змінна", "цикл", "список", "словник", "рядок", "виняток", "файл", "столиця", "річка"]
+TOPICS = ["Загальне", "ООП", "Python", "Географія", "Алгоритми"]
+
+
+def _words(rng: random.Random, count: int) -> List[str]:
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+def _synthetic_dict(q_type: str, rng: random.Random) -> Dict[str, Any]:
+    data = {"q_type": q_type, "text": " ".join(_words(rng, rng.randint(4, 10))) + "?",
+            "difficulty": rng.randint(1, 3), "topic": rng.choice(TOPICS)}
+    if q_type in ("SingleChoice", "MultiChoice"):
+        options = list(dict.fromkeys(_words(rng, 5)))
+        data["options"] = options
+        if q_type == "SingleChoice":
+            data["correct"] = rng.choice(options)
+        else:
+            data["correct_list"] = rng.sample(options, rng.randint(1, len(options)))
+    elif q_type == "Text":
+        data["keywords"] = _words(rng, rng.randint(2, 12))
+    elif q_type == "Scale":
+        data.update({"correct_val": rng.randint(1, 10), "tolerance": rng.randint(0, 2)})
+    elif q_type == "TrueFalse":
+        data["correct_bool"] = rng.random() < 0.5
+    elif q_type == "Matching":
+        data["pairs"] = {f"{w}{i}": rng.choice(WORDS) for i, w in enumerate(_words(rng, 4))}
+    elif q_type == "Ordering":
+        data["correct_order"] = [f"{w}{i}" for i, w in enumerate(_words(rng, 5))]
+    elif q_type == "FillBlank":
+        data["acceptable_answers"] = _words(rng, rng.randint(1, 3))
+    return data
+
+
+def synthetic_bank(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    # Відтворюваний банк: однаковий seed дає однакові питання, типи йдуть по колу
+    rng = random.Random(seed)
+    types = list(QUESTION_TYPES)
+    return [_synthetic_dict(types[i % len(types)], rng) for i in range(count)]
+
+
+def synthetic_answer(data: Dict[str, Any], rng: random.Random) -> Any:
+    # Приблизно половина відповідей правильні, решта - випадкові
+    right = rng.random() < 0.5
+    q_type = data["q_type"]
+    if q_type == "SingleChoice":
+        return data["correct"] if right else rng.choice(data["options"])
+    if q_type == "MultiChoice":
+        return list(data["correct_list"]) if right else rng.sample(data["options"], 2)
+    if q_type == "Text":
+        return " ".join(data["keywords"] if right else _words(rng, 8))
+    if q_type == "Scale":
+        return data["correct_val"] if right else rng.randint(1, 10)
+    if q_type == "TrueFalse":
+        return data["correct_bool"] if right else rng.random() < 0.5
+    if q_type == "Matching":
+        values = list(data["pairs"].values())
+        return dict(data["pairs"]) if right else dict(zip(data["pairs"], rng.sample(values, len(values))))
+    if q_type == "Ordering":
+        order = list(data["correct_order"])
+        if not right:
+            rng.shuffle(order)
+        return order
+    if q_type == "FillBlank":
+        return rng.choice(data["acceptable_answers"]) if right else rng.choice(WORDS)
+    return None
+
+
+def best_time(fn: Callable[[], Any], repeat: int = 3) -> float:
+    # Мінімум з кількох повторів - найменш шумна оцінка
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def metric(value: float, unit: str, better: str = "higher") -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_check(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    # count відповідей на кожен тип: 100 різних питань, кожне перевіряє свою колонку відповідей
+    rng = random.Random(seed)
+    results = {}
+    for q_type in QUESTION_TYPES:
+        dicts = [_synthetic_dict(q_type, rng) for _ in range(100)]
+        questions = Question.from_dicts(dicts)
+        per_question = max(1, count // len(questions))
+        columns = [[synthetic_answer(d, rng) for _ in range(per_question)] for d in dicts]
+        total = per_question * len(questions)
+
+        def scalar():
+            for q, column in zip(questions, columns):
+                check = q.check
+                for answer in column:
+                    check(answer)
+
+        def batch():
+            for q, column in zip(questions, columns):
+                q.check_batch(column)
+
+        results[f"check.{q_type}"] = metric(total / best_time(scalar, 5), "checks/s")
+        results[f"check_batch.{q_type}"] = metric(total / best_time(batch, 5), "checks/s")
+    return results
+
+
+def bench_serialization(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    dicts = synthetic_bank(count, seed)
+    questions = Question.from_dicts(dicts)
+    return {
+        "from_dict": metric(count / best_time(lambda: [Question.from_dict(d) for d in dicts]), "questions/s"),
+        "from_dicts": metric(count / best_time(lambda: Question.from_dicts(dicts)), "questions/s"),
+        "to_dict": metric(count / best_time(lambda: [q.to_dict() for q in questions]), "questions/s"),
+        "json_round_trip": metric(count / best_time(
+            lambda: Question.from_dicts(json.loads(json.dumps([q.to_dict() for q in questions])))), "questions/s"),
+    }
+
+
+def bench_storage(size: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    # Ті самі виклики, що робить DataManager редактора: повний запис, завантаження, дописування операцій
+    dicts = synthetic_bank(size, seed)
+    tests_per_bank = max(1, size // 1000)
+    raw = {f"Тест {i}": dicts[i::tests_per_bank] for i in range(tests_per_bank)}
+    repeat = 3 if size <= 100_000 else 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tests.json")
+
+        def save_full():
+            storage = JournalStorage(path)
+            storage.write(raw)
+            storage.compact()
+
+        def load_eager():
+            storage = JournalStorage(path)
+            data = storage.load()
+            return {name: Question.from_dicts(q_list) for name, q_list in data.items()}
+
+        def load_lazy_one():
+            storage = JournalStorage(path)
+            storage.load()
+            return LazyTestBank(storage)[next(iter(raw))]
+
+        save_time = best_time(save_full, repeat)
+        load_time = best_time(load_eager, repeat)
+        lazy_time = best_time(load_lazy_one, repeat)
+
+        storage = JournalStorage(path)
+        storage.load()
+        ops = [{"op": "add", "test": next(iter(raw)), "index": 0, "question": d} for d in dicts[:100]]
+        start = time.perf_counter()
+        for op in ops:
+            storage.apply_ops([op])
+        incremental_time = time.perf_counter() - start
+
+    prefix = f"storage.{size}"
+    return {
+        f"{prefix}.save": metric(size / save_time, "questions/s"),
+        f"{prefix}.load": metric(size / load_time, "questions/s"),
+        f"{prefix}.load_lazy_first_test": metric(lazy_time, "s", "lower"),
+        f"{prefix}.incremental_save": metric(len(ops) / incremental_time, "saves/s"),
+    }
+
+
+def bench_search(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    questions = Question.from_dicts(synthetic_bank(count, seed))
+    queries = [" ".join(w[:rng.randint(3, len(w))] for w in _words(rng, rng.randint(1, 2))) for _ in range(200)]
+
+    def build():
+        index = SearchIndex()
+        for q in questions:
+            index.add(q)
+        return index
+
+    index = build()
+    return {
+        "search.build": metric(count / best_time(build), "questions/s"),
+        "search.query": metric(len(queries) / best_time(lambda: [index.search(q) for q in queries]), "queries/s"),
+    }
+
+
+def bench_selection(count: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    questions = Question.from_dicts(synthetic_bank(count, seed))
+    index = SelectionIndex(questions)
+    draws = 10_000
+
+    def sessions():
+        # Адаптивні сесії по 5 питань, як у AdaptiveSession
+        for _ in range(draws // 5):
+            sampler = index.sampler(rng)
+            difficulty = 1
+            for _ in range(5):
+                sampler.draw(difficulty) or sampler.draw()
+                difficulty = rng.randint(1, 3)
+
+    return {
+        "selection.build": metric(count / best_time(lambda: SelectionIndex(questions)), "questions/s"),
+        "selection.choice": metric(draws / best_time(lambda: [index.choice(rng.randint(1, 3), None, rng)
+                                                              for _ in range(draws)]), "draws/s"),
+        "selection.session_draw": metric(draws / best_time(sessions), "draws/s"),
+    }
+
+
+SUITES = {
+    "quick": {"count": 10_000, "storage_sizes": [1_000]},
+    "full": {"count": 100_000, "storage_sizes": [1_000, 100_000, 1_000_000]},
+}
+BENCHMARKS = ["check", "serialization", "storage", "search", "selection", "memory"]
+
+
+def run_suite(suite: str = "quick", only: Optional[List[str]] = None, seed: int = 0,
+              count: Optional[int] = None, storage_sizes: Optional[List[int]] = None) -> Dict[str, Any]:
+    config = SUITES[suite]
+    count = count or config["count"]
+    storage_sizes = storage_sizes or config["storage_sizes"]
+    selected = only or [name for name in BENCHMARKS if name != "memory"]
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in selected:
+        print(f"... {name}", file=sys.stderr)
+        if name == "check":
+            results.update(bench_check(count, seed))
+        elif name == "serialization":
+            results.update(bench_serialization(count, seed))
+        elif name == "storage":
+            for size in storage_sizes:
+                results.update(bench_storage(size, seed))
+        elif name == "search":
+            results.update(bench_search(count, seed))
+        elif name == "selection":
+            results.update(bench_selection(count, seed))
+        elif name == "memory":
+            memory = memory_benchmark(count)
+            results["memory.legacy"] = metric(memory["legacy_bytes_per_question"], "bytes/question", "lower")
+            results["memory.slots"] = metric(memory["slots_bytes_per_question"], "bytes/question", "lower")
+        else:
+            raise ValueError(f"Невідомий бенчмарк: {name}")
+    meta = {"suite": suite, "seed": seed, "count": count, "storage_sizes": storage_sizes,
+            "python": platform.python_version(), "platform": platform.platform(), "time": time.time()}
+    return {"meta": meta, "results": results}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    # Регресія - результат гірший за базовий більш ніж на tolerance (частка)
+    regressions = []
+    for name, current in results["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base["value"] or not current["value"]:
+            continue
+        if current["better"] == "higher":
+            change = current["value"] / base["value"] - 1.0
+        else:
+            change = base["value"] / current["value"] - 1.0
+        if change < -tolerance:
+            regressions.append(f"{name}: {base['value']:.4g} -> {current['value']:.4g} {current['unit']} "
+                               f"({change:+.0%})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарки банку питань")
+    parser.add_argument("--suite", choices=list(SUITES), default="quick")
+    parser.add_argument("--only", help=f"Через кому: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--count", type=int, default=None, help="Кількість питань у синтетичному банку")
+    parser.add_argument("--storage-sizes", help="Розміри банку для бенчмарку сховища, через кому")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Куди записати результати (JSON)")
+    parser.add_argument("--baseline", help="Попередні результати для порівняння")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустиме погіршення (частка)")
+    args = parser.parse_args()
+
+    report = run_suite(args.suite, args.only.split(",") if args.only else None, args.seed, args.count,
+                       [int(s) for s in args.storage_sizes.split(",")] if args.storage_sizes else None)
+    for name, result in report["results"].items():
+        print(f"{name:40} {result['value']:>14.4g} {result['unit']}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nРегресії:")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\nРегресій немає")
@@ -0,0 +1,255 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator, Optional
+
+from questions_module import Question
+from storage_module import JsonStorage, JournalStorage, RawBank, Op, apply_op
+
+# Формат файлу .qbank (усі числа little-endian):
+#   заголовок | таблиця тестів | записи питань фіксованої ширини | індекс зсувів рядків | дані рядків (UTF-8)
+# Рядки (тексти, теми, типи, решта полів питання як компактний JSON) лежать в одній таблиці без повторів,
+# записи посилаються на них за номером. Читач відкриває файл через mmap і декодує питання лише при зверненні.
+
+MAGIC = b"QBNK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIQQQQ")
+TEST_RECORD = struct.Struct("<III")
+QUESTION_RECORD = struct.Struct("<IiIII")
+OFFSET = struct.Struct("<Q")
+NO_STRING = 0xFFFFFFFF
+NO_DIFFICULTY = -2 ** 31
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.blobs: List[bytes] = []
+
+    def add(self, value: str) -> int:
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.blobs)
+            self.blobs.append(value.encode("utf-8"))
+        return string_id
+
+
+def _pack_question(data: Dict[str, Any], strings: _StringTable) -> bytes:
+    extra = dict(data)
+    # Базові поля йдуть у запис напряму, а якщо мають незвичний тип - лишаються в JSON-навантаженні
+    refs = []
+    for key in ("q_type", "text", "topic"):
+        value = extra.get(key)
+        if isinstance(value, str):
+            refs.append(strings.add(extra.pop(key)))
+        else:
+            refs.append(NO_STRING)
+    difficulty = extra.get("difficulty")
+    if type(difficulty) is int and NO_DIFFICULTY < difficulty < 2 ** 31:
+        del extra["difficulty"]
+    else:
+        difficulty = NO_DIFFICULTY
+    payload = strings.add(json.dumps(extra, ensure_ascii=False, separators=(",", ":"))) if extra else NO_STRING
+    return QUESTION_RECORD.pack(refs[0], difficulty, refs[1], refs[2], payload)
+
+
+def write_bank(path: str, raw: RawBank):
+    strings = _StringTable()
+    test_records = []
+    question_records = []
+    for test_name, q_list in raw.items():
+        test_records.append(TEST_RECORD.pack(strings.add(test_name), len(question_records), len(q_list)))
+        question_records.extend(_pack_question(qd, strings) for qd in q_list)
+
+    tests_offset = HEADER.size
+    questions_offset = tests_offset + TEST_RECORD.size * len(test_records)
+    string_index_offset = questions_offset + QUESTION_RECORD.size * len(question_records)
+    string_data_offset = string_index_offset + OFFSET.size * (len(strings.blobs) + 1)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(test_records), len(question_records), len(strings.blobs),
+                            tests_offset, questions_offset, string_index_offset, string_data_offset))
+        f.write(b"".join(test_records))
+        f.write(b"".join(question_records))
+        position = 0
+        offsets = [OFFSET.pack(0)]
+        for blob in strings.blobs:
+            position += len(blob)
+            offsets.append(OFFSET.pack(position))
+        f.write(b"".join(offsets))
+        f.write(b"".join(strings.blobs))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class BinaryBank(Mapping):
+    """
+    Банк тестів у форматі .qbank, відкритий через mmap. Поводиться як dict
+    "назва тесту -> список словників to_dict", але розбирає записи лише запитаного тесту.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path}: файл банку питань обрізаний")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, test_count, self.total_questions, self.string_count, tests_offset,
+         self._questions_offset, self._string_index_offset, self._string_data_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: це не файл банку питань .qbank версії {VERSION}")
+        # Розділи йдуть один за одним, а останній зсув рядків - довжина даних рядків: файл має містити все
+        index_end = self._string_index_offset + OFFSET.size * (self.string_count + 1)
+        if (tests_offset + TEST_RECORD.size * test_count > self._questions_offset
+                or self._questions_offset + QUESTION_RECORD.size * self.total_questions > self._string_index_offset
+                or index_end > self._string_data_offset or self._string_data_offset > len(self._mm)
+                or self._string_data_offset + OFFSET.unpack_from(self._mm, index_end - OFFSET.size)[0] > len(self._mm)):
+            self.close()
+            raise ValueError(f"{path}: файл банку питань обрізаний")
+
+        self._tests: Dict[str, tuple] = {}
+        for i in range(test_count):
+            name_id, first, count = TEST_RECORD.unpack_from(self._mm, tests_offset + i * TEST_RECORD.size)
+            self._tests[self.string(name_id)] = (first, count)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def string(self, string_id: int) -> str:
+        index_pos = self._string_index_offset + string_id * OFFSET.size
+        start = OFFSET.unpack_from(self._mm, index_pos)[0]
+        end = OFFSET.unpack_from(self._mm, index_pos + OFFSET.size)[0]
+        base = self._string_data_offset
+        return self._mm[base + start:base + end].decode("utf-8")
+
+    def question_dict(self, position: int) -> Dict[str, Any]:
+        q_type, difficulty, text, topic, payload = QUESTION_RECORD.unpack_from(
+            self._mm, self._questions_offset + position * QUESTION_RECORD.size)
+        data = {}
+        if q_type != NO_STRING:
+            data["q_type"] = self.string(q_type)
+        if text != NO_STRING:
+            data["text"] = self.string(text)
+        if difficulty != NO_DIFFICULTY:
+            data["difficulty"] = difficulty
+        if topic != NO_STRING:
+            data["topic"] = self.string(topic)
+        if payload != NO_STRING:
+            data.update(json.loads(self.string(payload)))
+        return data
+
+    def __getitem__(self, test_name: str) -> List[Dict[str, Any]]:
+        first, count = self._tests[test_name]
+        return [self.question_dict(first + i) for i in range(count)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._tests)
+
+    def __len__(self) -> int:
+        return len(self._tests)
+
+    def question_count(self, test_name: str) -> int:
+        return self._tests[test_name][1]
+
+    def question(self, test_name: str, index: int) -> Question:
+        first, count = self._tests[test_name]
+        if not 0 <= index < count:
+            raise IndexError(index)
+        return Question.from_dict(self.question_dict(first + index))
+
+
+class BinaryStorage(JsonStorage):
+    """
+    Бекенд DataManager поверх .qbank: читання ліниве через mmap.
+    Формат не допускає дописування, тож збереження переписує файл цілком (атомарно).
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._bank: Optional[BinaryBank] = None
+
+    def load(self) -> Mapping:
+        with self._lock:
+            if self._bank is not None:
+                self._bank.close()
+                self._bank = None
+            self._data = {}
+            self._fingerprint = self.fingerprint()
+            if os.path.exists(self.path):
+                self._bank = BinaryBank(self.path)
+                return self._bank
+            return self._data
+
+    def test_names(self) -> List[str]:
+        with self._lock:
+            return list(self._bank) if self._bank is not None else []
+
+    def load_test(self, test_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            if self._bank is None or test_name not in self._bank:
+                return []
+            return self._bank[test_name]
+
+    def question_count(self, test_name: str) -> int:
+        with self._lock:
+            if self._bank is None or test_name not in self._bank:
+                return 0
+            return self._bank.question_count(test_name)
+
+    def apply_ops(self, ops: List[Op]):
+        if not ops:
+            return
+        with self._lock:
+            raw = {name: self.load_test(name) for name in self.test_names()}
+            for op in ops:
+                apply_op(raw, op)
+            # На Windows відкритий mmap не дає замінити файл, тож старий банк закриваємо перед записом,
+            # але відкриваємо знову і при невдачі: інакше наступне збереження побачить порожній банк
+            if self._bank is not None:
+                self._bank.close()
+                self._bank = None
+            try:
+                write_bank(self.path, raw)
+            finally:
+                self.load()
+
+
+def json_to_binary(json_path: str, bank_path: str):
+    # Через сховище, а не json.load: так враховуються і спільний пул питань, і ще не згорнутий журнал
+    source = JournalStorage(json_path)
+    source.load()
+    write_bank(bank_path, {name: source.load_test(name) for name in source.test_names()})
+
+
+def binary_to_json(bank_path: str, json_path: str):
+    with BinaryBank(bank_path) as bank:
+        data = {name: bank[name] for name in bank}
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перетворення банку питань між tests.json і .qbank")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+
+    if args.source.endswith(".qbank"):
+        binary_to_json(args.source, args.target)
+    else:
+        json_to_binary(args.source, args.target)
+    print(f"Збережено: {args.target}")
@@ -0,0 +1,123 @@
+from typing import List, Dict, Any, MutableMapping
+
+Op = Dict[str, Any]
+
+
+class Command:
+    """
+    Одна зміна банку тестів. Команда тримає посилання лише на змінені об'єкти (питання, список питань),
+    а не на копію банку, тож кожен крок історії коштує O(змін).
+    """
+
+    def do(self, tests: MutableMapping) -> List[Op]:
+        raise NotImplementedError
+
+    def undo(self, tests: MutableMapping) -> List[Op]:
+        raise NotImplementedError
+
+
+class AddQuestion(Command):
+    def __init__(self, test_name: str, question, index: int = None):
+        self.test_name = test_name
+        self.question = question
+        self.index = index
+
+    def do(self, tests):
+        q_list = tests[self.test_name]
+        if self.index is None:
+            self.index = len(q_list)
+        q_list.insert(self.index, self.question)
+        return [{"op": "add", "test": self.test_name, "index": self.index, "question": self.question.to_dict()}]
+
+    def undo(self, tests):
+        del tests[self.test_name][self.index]
+        return [{"op": "remove", "test": self.test_name, "index": self.index}]
+
+
+class DeleteQuestion(Command):
+    def __init__(self, test_name: str, index: int):
+        self.test_name = test_name
+        self.index = index
+        self.question = None
+
+    def do(self, tests):
+        self.question = tests[self.test_name].pop(self.index)
+        return [{"op": "remove", "test": self.test_name, "index": self.index}]
+
+    def undo(self, tests):
+        tests[self.test_name].insert(self.index, self.question)
+        return [{"op": "add", "test": self.test_name, "index": self.index, "question": self.question.to_dict()}]
+
+
+class CreateTest(Command):
+    def __init__(self, test_name: str):
+        self.test_name = test_name
+
+    def do(self, tests):
+        tests[self.test_name] = []
+        return [{"op": "put", "test": self.test_name, "questions": []}]
+
+    def undo(self, tests):
+        del tests[self.test_name]
+        return [{"op": "del", "test": self.test_name}]
+
+
+class DeleteTest(Command):
+    def __init__(self, test_name: str):
+        self.test_name = test_name
+        self.questions = None
+
+    def do(self, tests):
+        self.questions = tests[self.test_name]
+        del tests[self.test_name]
+        return [{"op": "del", "test": self.test_name}]
+
+    def undo(self, tests):
+        tests[self.test_name] = self.questions
+        return [{"op": "put", "test": self.test_name, "questions": [q.to_dict() for q in self.questions]}]
+
+
+class CommandHistory:
+    """
+    Журнал команд з undo/redo. Кожна виконана, скасована чи повторена команда
+    додає свої операції у pending_ops - саме їх DataManager дописує у сховище при збереженні.
+    """
+
+    def __init__(self, tests: MutableMapping, limit: int = 500):
+        self.tests = tests
+        self.limit = limit
+        self.undo_stack: List[Command] = []
+        self.redo_stack: List[Command] = []
+        self.pending_ops: List[Op] = []
+
+    def execute(self, command: Command):
+        self.pending_ops.extend(command.do(self.tests))
+        self.undo_stack.append(command)
+        if len(self.undo_stack) > self.limit:
+            del self.undo_stack[0]
+        self.redo_stack.clear()
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo(self) -> Command:
+        command = self.undo_stack.pop()
+        self.pending_ops.extend(command.undo(self.tests))
+        self.redo_stack.append(command)
+        return command
+
+    def redo(self) -> Command:
+        command = self.redo_stack.pop()
+        self.pending_ops.extend(command.do(self.tests))
+        self.undo_stack.append(command)
+        return command
+
+    def has_unsaved_changes(self) -> bool:
+        return bool(self.pending_ops)
+
+    def mark_saved(self, count: int):
+        # Прибираємо лише ті операції, що вже записані: поки йшло збереження, могли з'явитися нові
+        del self.pending_ops[:count]
@@ -0,0 +1,221 @@
+import argparse
+import json
+import random
+import zlib
+from typing import List, Dict, Any, Hashable, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from search_module import tokenize
+
+# MinHash: NUM_PERM хеш-функцій "помножити і зсунути" ((a·x + b) mod 2^64) >> 32, підпис розбито на BANDS смуг по ROWS значень.
+# Пара з подібністю Жаккара s потрапляє в спільний кошик хоча б однієї смуги з імовірністю 1 - (1 - s^ROWS)^BANDS:
+# при 16×4 це ~0.5 для s = 0.5 і >0.98 для s = 0.8
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 4
+_MASK = (1 << 64) - 1
+_rng = random.Random(20240101)
+_A = [_rng.randrange(0, 1 << 64) | 1 for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 64) for _ in range(NUM_PERM)]
+
+
+def question_content(question) -> str:
+    # Текст питання разом з варіантами: переставлені чи трохи змінені варіанти теж мають збігатися
+    options = getattr(question, "options", None) or ()
+    return " ".join([question.text, *map(str, options)])
+
+
+def dict_content(data: Dict[str, Any]) -> str:
+    # Те саме для питання у вигляді словника зі сховища, без створення об'єкта Question
+    return " ".join([data.get("text", ""), *map(str, data.get("options") or ())])
+
+
+def shingles(text: str, k: int = SHINGLE) -> List[int]:
+    # Символьні k-грами нормалізованого тексту, хешовані crc32 (однаково в усіх процесах)
+    normalized = " ".join(tokenize(text))
+    if len(normalized) <= k:
+        return [zlib.crc32(normalized.encode("utf-8"))]
+    grams = {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+    return [zlib.crc32(gram.encode("utf-8")) for gram in grams]
+
+
+def signature(text: str) -> Tuple[int, ...]:
+    values = shingles(text)
+    if np is not None:
+        x = np.fromiter(values, dtype=np.uint64, count=len(values))
+        # Переповнення uint64 тут і є взяттям за модулем 2^64
+        hashed = (np.array(_A, dtype=np.uint64)[:, None] * x + np.array(_B, dtype=np.uint64)[:, None]) >> np.uint64(32)
+        return tuple(hashed.min(axis=1).tolist())
+    return tuple(min(((a * x + b) & _MASK) >> 32 for x in values) for a, b in zip(_A, _B))
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    # Частка однакових мінімумів - незміщена оцінка подібності Жаккара множин k-грам
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+def _bands(sig: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [sig[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+
+class MinHashIndex:
+    """
+    Індекс майже однакових питань. Кожне питання потрапляє в BANDS кошиків LSH,
+    тож пошук схожих переглядає лише кандидатів зі спільних кошиків, а не весь банк.
+    """
+
+    def __init__(self, threshold: float = 0.6):
+        self.threshold = threshold
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], set]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key) -> bool:
+        return key in self._signatures
+
+    def add(self, key: Hashable, text: str):
+        self.add_signature(key, signature(text))
+
+    def add_signature(self, key: Hashable, sig: Tuple[int, ...]):
+        # Підпис можна порахувати заздалегідь (наприклад, у фоновому потоці) і лише вставити тут
+        if key in self._signatures:
+            self.remove(key)
+        self._signatures[key] = sig
+        for buckets, band in zip(self._buckets, _bands(sig)):
+            buckets.setdefault(band, set()).add(key)
+
+    def add_question(self, question):
+        self.add(question, question_content(question))
+
+    def remove(self, key: Hashable):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for buckets, band in zip(self._buckets, _bands(sig)):
+            bucket = buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band]
+
+    def query(self, text: str, exclude: Optional[Hashable] = None) -> List[Tuple[float, Any]]:
+        # Схожі записи з оцінкою подібності, від найсхожішого
+        sig = signature(text)
+        candidates = set()
+        for buckets, band in zip(self._buckets, _bands(sig)):
+            candidates.update(buckets.get(band, ()))
+        candidates.discard(exclude)
+        scored = [(similarity(sig, self._signatures[key]), key) for key in candidates]
+        return sorted(((s, key) for s, key in scored if s >= self.threshold), key=lambda item: -item[0])
+
+    def similar_questions(self, question) -> List[Tuple[float, Any]]:
+        return self.query(question_content(question), exclude=question)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+def signature_matrix(texts: Iterable[str], chunk_size: int = 5000) -> "np.ndarray":
+    """
+    Підписи всього банку одразу: k-грами пакета зливаються в один масив,
+    а мінімум по кожному питанню береться через np.minimum.reduceat.
+    """
+    texts = list(texts)
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint64)
+    a = np.array(_A, dtype=np.uint64)
+    b = np.array(_B, dtype=np.uint64)
+    for start in range(0, len(texts), chunk_size):
+        per_text = [shingles(text) for text in texts[start:start + chunk_size]]
+        lengths = np.fromiter((len(values) for values in per_text), dtype=np.int64, count=len(per_text))
+        flat = np.fromiter((x for values in per_text for x in values), dtype=np.uint64, count=int(lengths.sum()))
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        for p in range(NUM_PERM):
+            hashed = (a[p] * flat + b[p]) >> np.uint64(32)
+            result[start:start + len(per_text), p] = np.minimum.reduceat(hashed, offsets)
+    return result
+
+
+def cluster(texts: List[str], threshold: float = 0.6) -> List[List[int]]:
+    """Групи майже однакових текстів (індекси), розмір групи не менше 2."""
+    if np is None:
+        raise RuntimeError("Для пакетного пошуку дублікатів потрібен numpy")
+    if not texts:
+        return []
+    sigs = signature_matrix(texts)
+    union = _UnionFind(len(texts))
+    for band in range(BANDS):
+        block = np.ascontiguousarray(sigs[:, band * ROWS:(band + 1) * ROWS])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * ROWS))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+        ends = np.append(starts[1:], len(order))
+        for s, e in zip(starts[ends - starts > 1], ends[ends - starts > 1]):
+            # Випадкові сусіди по кошику відсіюються перевіркою повного підпису: кожен член порівнюється
+            # з представниками вже знайдених у цьому кошику груп і або приєднується, або стає новим представником
+            representatives = []
+            for member in order[s:e]:
+                if representatives:
+                    scores = (sigs[representatives] == sigs[member]).mean(axis=1)
+                    best = int(scores.argmax())
+                    if scores[best] >= threshold:
+                        union.union(int(representatives[best]), int(member))
+                        continue
+                representatives.append(member)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(union.find(i), []).append(i)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def cluster_bank(tests: Dict[str, List[Any]], threshold: float = 0.6) -> List[List[Dict[str, Any]]]:
+    # tests - "назва тесту -> список питань"; результат - групи з назвою тесту, індексом і текстом
+    locations = [(name, idx, q) for name, q_list in tests.items() for idx, q in enumerate(q_list)]
+    groups = cluster([question_content(q) for _, _, q in locations], threshold)
+    return [[{"test": locations[i][0], "index": locations[i][1], "text": locations[i][2].text} for i in group]
+            for group in groups]
+
+
+if __name__ == "__main__":
+    from questions_module import Question
+    from storage_module import open_storage, TESTS_FILE
+
+    parser = argparse.ArgumentParser(description="Пошук майже однакових питань у банку тестів")
+    parser.add_argument("--tests-file", default=TESTS_FILE)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--out", help="Куди записати групи дублікатів (JSON)")
+    args = parser.parse_args()
+
+    storage = open_storage(args.tests_file)
+    storage.load()
+    bank = {name: Question.from_dicts(storage.load_test(name)) for name in storage.test_names()}
+    clusters = cluster_bank(bank, args.threshold)
+    print(f"Груп схожих питань: {len(clusters)}")
+    for group in clusters[:20]:
+        print(" | ".join(f"{item['test']}#{item['index']}: {item['text'][:40]}" for item in group))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(clusters, f, ensure_ascii=False, indent=4)
@@ -1,12 +1,16 @@
 from typing import List
 import random
 
+from search_module import SearchIndex
+
 class TestEditor:
     def __init__(self):
         self.questions: List[object] = []
+        self.index = SearchIndex()
 
     def add_question(self, question):
         self.questions.append(question)
+        self.index.add(question)
         print(f"[+] Додано питання: {question.text}")
 
     def show_all(self):
@@ -21,6 +25,7 @@ class TestEditor:
         if 0 <= index < len(self.questions):
             old_text = self.questions[index].text
             self.questions[index].text = new_text
+            self.index.update(self.questions[index])
             print(f"[~] Питання №{index + 1} змінено:\n    '{old_text}' → '{new_text}'")
         else:
             print("Неправильний номер питання.")
@@ -28,12 +33,14 @@ class TestEditor:
     def delete_question(self, index: int):
         if 0 <= index < len(self.questions):
             removed = self.questions.pop(index)
+            if removed not in self.questions:
+                self.index.remove(removed)
             print(f"[-] Питання '{removed.text}' видалено.")
         else:
             print("Неправильний номер питання.")
 
     def find_question(self, keyword: str):
-        found = [q for q in self.questions if keyword.lower() in q.text.lower()]
+        found = self.index.search(keyword)
         if found:
             print(f"\nЗнайдено за '{keyword}':")
             for i, q in enumerate(found, 1):
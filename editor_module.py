@@ -1,13 +1,15 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 from ttkbootstrap.dialogs import Querybox
-import json
-import os
 
 try:
     from questions_module import (
-        Question, SingleChoiceQuestion, MultiChoiceQuestion, TextQuestion,
+        Question, QUESTION_TYPES, SingleChoiceQuestion, MultiChoiceQuestion, TextQuestion,
         ScaleQuestion, TrueFalseQuestion, MatchingQuestion,
         OrderingQuestion, FillBlankQuestion
     )
@@ -15,48 +17,152 @@ except ImportError:
     messagebox.showerror("Помилка", "Файл questions_module.py не знайдено!")
     exit()
 
-TESTS_FILE = "tests.json"
+from storage_module import open_storage, LazyTestBank, TESTS_FILE, TESTS_DIR
+from dedup_module import MinHashIndex, question_content, dict_content, signature
+from commands_module import CommandHistory, AddQuestion, DeleteQuestion, CreateTest, DeleteTest
 
 
 class DataManager:
-    @staticmethod
-    def load_tests() -> dict:
-        if not os.path.exists(TESTS_FILE):
-            return {}
+    # Якщо банк уже розкладено по файлах тестів (каталог tests.d), працюємо з ним
+    storage = open_storage(TESTS_DIR if os.path.isdir(TESTS_DIR) else TESTS_FILE)
+
+    @classmethod
+    def read_tests(cls, lazy: bool = False) -> dict:
+        # Без діалогів: може виконуватися у фоновому потоці
+        data = cls.storage.load()
+        if lazy:
+            return LazyTestBank(cls.storage)
+        tests = {}
+        for test_name, q_list in data.items():
+            tests[test_name] = Question.from_dicts(q_list)
+        return tests
+
+    @classmethod
+    def read_duplicates(cls, test_names, limit: int) -> list:
+        # Підписи MinHash питань кількох тестів (поки не набереться limit питань) - зі словників сховища,
+        # без створення об'єктів Question і без кешування прочитаних тестів у сховищі.
+        # Результат: [(тест, [(підпис, текст), ...]), ...]
+        result = []
+        total = 0
+        for test_name in test_names:
+            entries = [(signature(dict_content(data)), data.get("text", ""))
+                       for data in cls.storage.peek_test(test_name)]
+            result.append((test_name, entries))
+            total += len(entries)
+            if total >= limit:
+                break
+        return result
+
+    @classmethod
+    def load_tests(cls, lazy: bool = False) -> dict:
         try:
-            with open(TESTS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            tests = {}
-            for test_name, q_list in data.items():
-                tests[test_name] = [Question.from_dict(qd) for qd in q_list]
-            return tests
+            return cls.read_tests(lazy)
         except Exception as e:
             messagebox.showerror("Помилка читання", f"Не вдалося завантажити тести: {e}")
             return {}
 
-    @staticmethod
-    def save_tests(tests_dict: dict):
-        data_to_save = {}
-        for test_name, q_list in tests_dict.items():
-            data_to_save[test_name] = [q.to_dict() for q in q_list]
+    @classmethod
+    def save_ops(cls, ops: list, overwrite: bool = False):
+        # Інкрементальне збереження: у сховище йдуть лише операції з журналу команд редактора.
+        # overwrite - файл змінили ззовні, а користувач обрав свою версію: переписуємо знімок повністю
+        cls.storage.apply_ops(ops)
+        if overwrite:
+            cls.storage.compact()
+
 
-        with open(TESTS_FILE, "w", encoding="utf-8") as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+class IOWorker:
+    """
+    Один фоновий потік для читання і запису банку тестів. Tk не можна чіпати з інших потоків,
+    тож результати забирає головний цикл: root.after періодично перевіряє завершені задачі.
+    """
+
+    POLL_MS = 100
+
+    def __init__(self, root):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="editor-io")
+        self.pending = []
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        future = self.executor.submit(fn, *args)
+        self.pending.append((future, on_done, on_error))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.POLL_MS, self._poll)
+        return future
+
+    def busy(self) -> bool:
+        return bool(self.pending)
+
+    def _poll(self):
+        finished = [task for task in self.pending if task[0].done()]
+        self.pending = [task for task in self.pending if not task[0].done()]
+        for future, on_done, on_error in finished:
+            error = future.exception()
+            if error is None:
+                if on_done: on_done(future.result())
+            elif on_error:
+                on_error(error)
+        if self.pending:
+            self.root.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def wait(self):
+        # Блокує до завершення всіх задач і одразу віддає їхні результати та помилки
+        for future, _, _ in list(self.pending):
+            future.exception()
+        self._poll()
+
+    def run(self, fn, *args):
+        # Синхронний виклик у фоновому потоці (щоб запис ішов у тому ж порядку, що й решта задач)
+        return self.executor.submit(fn, *args).result()
+
+    def shutdown(self):
+        # Дочікуємося незавершених задач і віддаємо їхні результати, поки вікно ще існує
+        self.executor.shutdown(wait=True)
+        self._poll()
 
 
 class TestEditorApp:
+    RENDER_CHUNK = 200
+    AUTOSAVE_MS = 30000
+    DUPLICATE_BATCH = 500
+
     def __init__(self, root):
         self.root = root
         self.root.title("Редактор Тестів (Режим Адміністратора)")
         self.root.geometry("900x600")
 
-        self.tests = DataManager.load_tests()
+        self.io = IOWorker(root)
+        self.tests = {}
         self.current_test_name = None
+        self.history = CommandHistory(self.tests)
+        self.loaded = False
+        self.saving = False
+        # Індекс схожих питань по всьому банку. Ключ - (тест, питання) для відкритих тестів
+        # і (тест, номер) для решти: їхні питання ще не створені, і текст береться з _duplicate_text.
+        # Невідкриті тести індексуються у фоні вже після завантаження, пачками по DUPLICATE_BATCH питань
+        self.duplicates = MinHashIndex()
+        self._duplicate_text = {}
+        self._raw_duplicates = {}
+        self._unindexed = []
+        self._index_generation = 0
+        self._render_generation = 0
 
         self.setup_ui()
-        self.refresh_test_list()
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.load_in_background()
+        self.root.after(self.AUTOSAVE_MS, self.autosave)
 
     def setup_ui(self):
+        self.status_lbl = tb.Label(self.root, text="", bootstyle=SECONDARY, padding=(10, 0, 10, 5))
+        self.status_lbl.pack(side="bottom", fill="x")
+
         main_frame = tb.Frame(self.root, padding=10)
         main_frame.pack(fill="both", expand=True)
 
@@ -102,27 +208,131 @@ class TestEditorApp:
         tb.Button(btn_frame_right, text="Видалити питання", bootstyle=WARNING, command=self.delete_question).pack(
             side="left")
         tb.Button(btn_frame_right, text="Зберегти зміни", bootstyle=SUCCESS, command=self.save_all).pack(side="right")
+        tb.Button(btn_frame_right, text="Повторити", bootstyle=(SECONDARY, OUTLINE), command=self.redo).pack(
+            side="right", padx=(0, 10))
+        tb.Button(btn_frame_right, text="Скасувати", bootstyle=(SECONDARY, OUTLINE), command=self.undo).pack(
+            side="right", padx=(0, 10))
 
     def refresh_test_list(self):
-        for item in self.test_listbox.get_children():
-            self.test_listbox.delete(item)
-        for test_name in self.tests.keys():
-            self.test_listbox.insert("", "end", iid=test_name, text=test_name)
+        # Оновлюємо лише рядки, що змінилися: видалені тести, нові тести, змінена кількість питань
+        names = list(self.tests.keys())
+        wanted = set(names)
+        stale = [iid for iid in self.test_listbox.get_children() if iid not in wanted]
+        if stale:
+            self.test_listbox.delete(*stale)
+        for pos, test_name in enumerate(names):
+            label = self.test_label(test_name)
+            if not self.test_listbox.exists(test_name):
+                self.test_listbox.insert("", pos, iid=test_name, text=label)
+            elif self.test_listbox.item(test_name, "text") != label:
+                self.test_listbox.item(test_name, text=label)
+
+    def test_label(self, test_name):
+        if isinstance(self.tests, LazyTestBank):
+            count = self.tests.question_count(test_name)
+        else:
+            count = len(self.tests[test_name])
+        return f"{test_name} ({count})"
+
+    def update_test_label(self, test_name):
+        if self.test_listbox.exists(test_name):
+            self.test_listbox.item(test_name, text=self.test_label(test_name))
 
     def on_test_select(self, event):
         selected = self.test_listbox.selection()
         if not selected: return
         self.current_test_name = selected[0]
         self.test_title_lbl.config(text=f"Редагування: {self.current_test_name}")
+        self.index_duplicates(self.current_test_name)
         self.refresh_questions_list()
 
+    def index_duplicates(self, test_name):
+        # Відкритий тест можна редагувати, а номери питань тоді зсуваються:
+        # записи (тест, номер) замінюються самими питаннями
+        count = self._raw_duplicates.pop(test_name, None)
+        if count is not None:
+            self.drop_raw_duplicates(test_name, count)
+        for q in self.tests[test_name]:
+            self.index_question(q, test_name)
+
+    def index_next_tests(self):
+        if not self._unindexed:
+            return
+        generation = self._index_generation
+        self.io.submit(DataManager.read_duplicates, list(self._unindexed), self.DUPLICATE_BATCH,
+                       on_done=lambda batch: self.on_duplicates_read(batch, generation),
+                       on_error=lambda error: self.set_status(f"Пошук дублікатів зупинено: {error}"))
+
+    def on_duplicates_read(self, batch, generation):
+        if generation != self._index_generation:
+            return  # Банк тим часом перезавантажили
+        for test_name, entries in batch:
+            self._unindexed.remove(test_name)
+            # Тест, який уже відкрили, створили заново чи видалили, індексується через свої питання
+            if test_name not in self.tests or self.tests.is_loaded(test_name):
+                continue
+            for idx, (sig, text) in enumerate(entries):
+                self.duplicates.add_signature((test_name, idx), sig)
+                self._duplicate_text[(test_name, idx)] = text
+            self._raw_duplicates[test_name] = len(entries)
+        self.index_next_tests()
+
+    def drop_raw_duplicates(self, test_name, count):
+        for idx in range(count):
+            self.duplicates.remove((test_name, idx))
+            self._duplicate_text.pop((test_name, idx), None)
+
+    def index_question(self, question, test_name):
+        if (test_name, question) not in self.duplicates:
+            self.duplicates.add((test_name, question), question_content(question))
+
+    def unindex_question(self, question, test_name):
+        # Одне спільне питання може стояти в тесті двічі: прибираємо, лише коли не лишилося жодного
+        if test_name in self.tests and any(item is question for item in self.tests[test_name]):
+            return
+        self.duplicates.remove((test_name, question))
+
+    def unindex_test(self, test_name, questions):
+        count = self._raw_duplicates.pop(test_name, None)
+        if count is not None:
+            self.drop_raw_duplicates(test_name, count)
+        for q in questions:
+            self.duplicates.remove((test_name, q))
+
+    def sync_duplicates(self, command, undone=False):
+        # Індекс іде слідом за банком: видалені питання з нього прибираються, повернуті undo - додаються
+        if isinstance(command, (AddQuestion, DeleteQuestion)):
+            if isinstance(command, AddQuestion) != undone:
+                self.index_question(command.question, command.test_name)
+            else:
+                self.unindex_question(command.question, command.test_name)
+        elif isinstance(command, DeleteTest):
+            if undone:
+                for q in command.questions:
+                    self.index_question(q, command.test_name)
+            else:
+                self.unindex_test(command.test_name, command.questions)
+
+    def run_command(self, command):
+        self.history.execute(command)
+        self.sync_duplicates(command)
+
+    def similar_questions(self, question):
+        # (подібність, текст схожого питання, тест) - від найсхожішого
+        result = []
+        for score, (test_name, item) in self.duplicates.query(question_content(question)):
+            text = self._duplicate_text.get((test_name, item), "") if isinstance(item, int) else item.text
+            result.append((score, text, test_name))
+        return result
+
     def create_test(self):
+        if not self.loaded: return
         name = Querybox.get_string(prompt="Введіть назву нового тесту:", title="Новий тест")
         if name:
             if name in self.tests:
                 messagebox.showwarning("Помилка", "Тест з такою назвою вже існує!")
                 return
-            self.tests[name] = []
+            self.run_command(CreateTest(name))
             self.refresh_test_list()
 
     def delete_test(self):
@@ -130,26 +340,78 @@ class TestEditorApp:
         if not selected: return
         test_name = selected[0]
         if messagebox.askyesno("Підтвердження", f"Видалити тест '{test_name}'?"):
-            del self.tests[test_name]
+            self.run_command(DeleteTest(test_name))
             self.current_test_name = None
             self.test_title_lbl.config(text="Виберіть тест зі списку")
             self.refresh_test_list()
             self.refresh_questions_list()
 
+    @staticmethod
+    def row_ids(questions):
+        # Рядок прив'язаний до uid питання; одне спільне питання двічі в тесті отримує суфікс
+        ids = []
+        seen = {}
+        for q in questions:
+            iid = f"q{q.uid}"
+            if iid in seen:
+                seen[iid] += 1
+                iid = f"{iid}.{seen[iid]}"
+            else:
+                seen[iid] = 0
+            ids.append(iid)
+        return ids
+
     def refresh_questions_list(self):
-        for item in self.q_tree.get_children():
-            self.q_tree.delete(item)
-        if not self.current_test_name: return
+        # Рядки прив'язані до стабільного uid питання, тож після додавання чи видалення
+        # змінюється лише кілька рядків, а не весь список
+        self._render_generation += 1
+        questions = self.tests[self.current_test_name] if self.current_test_name else []
+        wanted = self.row_ids(questions)
+        wanted_set = set(wanted)
+
+        existing = self.q_tree.get_children()
+        current = [iid for iid in existing if iid in wanted_set]
+        if len(current) != len(existing):
+            self.q_tree.delete(*[iid for iid in existing if iid not in wanted_set])
+
+        if not current and len(questions) > self.RENDER_CHUNK:
+            # Зовсім новий список (інший тест): малюємо частинами, щоб не блокувати головний цикл Tk
+            self._render_chunk(questions, wanted, 0, self._render_generation)
+            return
 
-        for idx, q in enumerate(self.tests[self.current_test_name]):
-            self.q_tree.insert("", "end", iid=str(idx), values=(q.q_type, q.text, q.difficulty))
+        current_set = set(current)
+        for pos, (iid, q) in enumerate(zip(wanted, questions)):
+            if pos < len(current) and current[pos] == iid:
+                continue
+            if iid in current_set:
+                self.q_tree.move(iid, "", pos)
+                current.remove(iid)
+            else:
+                self.q_tree.insert("", pos, iid=iid, values=(q.q_type, q.text, q.difficulty))
+                current_set.add(iid)
+            current.insert(pos, iid)
+
+    def _render_chunk(self, questions, ids, start, generation):
+        if generation != self._render_generation:
+            return
+        end = min(start + self.RENDER_CHUNK, len(questions))
+        for iid, q in zip(ids[start:end], questions[start:end]):
+            self.q_tree.insert("", "end", iid=iid, values=(q.q_type, q.text, q.difficulty))
+        if end < len(questions):
+            self.root.after(1, self._render_chunk, questions, ids, end, generation)
 
-    def delete_question(self):
+    def selected_question_index(self):
         selected = self.q_tree.selection()
-        if not selected: return
-        idx = int(selected[0])
+        if not selected: return None
+        ids = self.row_ids(self.tests[self.current_test_name])
+        return ids.index(selected[0]) if selected[0] in ids else None
+
+    def delete_question(self):
+        idx = self.selected_question_index()
+        if idx is None: return
         if messagebox.askyesno("Підтвердження", "Видалити обране питання?"):
-            del self.tests[self.current_test_name][idx]
+            self.run_command(DeleteQuestion(self.current_test_name, idx))
+            self.update_test_label(self.current_test_name)
             self.refresh_questions_list()
 
     def add_question(self):
@@ -158,12 +420,160 @@ class TestEditorApp:
             return
         QuestionBuilderDialog(self.root, self)
 
-    def save_all(self):
-        DataManager.save_tests(self.tests)
-        messagebox.showinfo("Збережено", "Усі зміни успішно збережено у файл tests.json!")
+    def undo(self):
+        if self.history.can_undo():
+            self.sync_duplicates(self.history.undo(), undone=True)
+            self.after_history_change()
+
+    def redo(self):
+        if self.history.can_redo():
+            self.sync_duplicates(self.history.redo())
+            self.after_history_change()
+
+    def after_history_change(self):
+        if self.current_test_name not in self.tests:
+            self.current_test_name = None
+            self.test_title_lbl.config(text="Виберіть тест зі списку")
+        self.refresh_test_list()
+        self.refresh_questions_list()
+
+    def set_status(self, text):
+        self.status_lbl.config(text=text)
+
+    def load_in_background(self):
+        self.loaded = False
+        self._index_generation += 1
+        self.set_status("Завантаження тестів...")
+        self.io.submit(self.read_bank, on_done=self.on_loaded, on_error=self.on_load_error)
+
+    @staticmethod
+    def read_bank():
+        return DataManager.read_tests(True)
+
+    def on_loaded(self, tests):
+        self.tests = tests
+        self.history = CommandHistory(self.tests)
+        self.duplicates = MinHashIndex()
+        self._duplicate_text = {}
+        self._raw_duplicates = {}
+        self._unindexed = list(tests)
+        self._index_generation += 1
+        self.loaded = True
+        self.current_test_name = None
+        self.test_title_lbl.config(text="Виберіть тест зі списку")
+        self.refresh_test_list()
+        self.refresh_questions_list()
+        self.set_status(f"Завантажено тестів: {len(self.tests)}")
+        self.index_next_tests()
+
+    def on_load_error(self, error):
+        self.loaded = True
+        self.set_status("Тести не завантажено")
+        messagebox.showerror("Помилка читання", f"Не вдалося завантажити тести: {error}")
+
+    def save_all(self, silent=False):
+        if not self.loaded or self.saving:
+            return
+        if not self.history.has_unsaved_changes():
+            if not silent:
+                messagebox.showinfo("Збережено", "Усі зміни успішно збережено у файл tests.json!")
+            return
+
+        overwrite = False
+        if DataManager.storage.changed_externally():
+            if silent:
+                self.set_status("tests.json змінено іншою програмою - автозбереження пропущено")
+                return
+            choice = messagebox.askyesnocancel(
+                "Конфлікт", "Файл tests.json змінено іншою програмою.\n"
+                            "Так - перезаписати його вашою версією.\n"
+                            "Ні - завантажити версію з диска (незбережені зміни буде втрачено).")
+            if choice is None:
+                return
+            if not choice:
+                self.load_in_background()
+                return
+            overwrite = True
+
+        # Операції - готові словники, які редактор більше не змінює, тож копії списку досить:
+        # поки фоновий потік пише їх у файл, нові правки просто додаються в pending_ops
+        ops = list(self.history.pending_ops)
+        self.saving = True
+        self.set_status("Збереження...")
+        self.io.submit(DataManager.save_ops, ops, overwrite,
+                       on_done=lambda _: self.on_saved(len(ops), silent), on_error=self.on_save_error)
+
+    def on_saved(self, count, silent):
+        self.saving = False
+        self.history.mark_saved(count)
+        self.set_status(f"Збережено о {time.strftime('%H:%M:%S')}")
+        if not silent:
+            messagebox.showinfo("Збережено", "Усі зміни успішно збережено у файл tests.json!")
+
+    def on_save_error(self, error):
+        self.saving = False
+        self.set_status("Помилка збереження")
+        messagebox.showerror("Помилка запису", f"Не вдалося зберегти тести: {error}")
+
+    def autosave(self):
+        if self.history.has_unsaved_changes():
+            self.save_all(silent=True)
+        self.root.after(self.AUTOSAVE_MS, self.autosave)
+
+    def on_close(self):
+        # Спершу дочікуємося фонового запису: його помилка має показатися, поки вікно ще існує
+        self.io.wait()
+        if self.loaded and self.history.has_unsaved_changes():
+            choice = messagebox.askyesnocancel("Вихід", "Зберегти незбережені зміни?")
+            if choice is None:
+                return
+            if choice and not self.save_before_close():
+                return
+        self.io.shutdown()
+        self.root.destroy()
+
+    def save_before_close(self) -> bool:
+        # Збереження при виході чекає на результат: вікно закривається, лише коли зміни записано
+        # або користувач сам відмовився від них
+        overwrite = False
+        if DataManager.storage.changed_externally():
+            choice = messagebox.askyesnocancel(
+                "Конфлікт", "Файл tests.json змінено іншою програмою.\n"
+                            "Так - перезаписати його вашою версією.\n"
+                            "Ні - вийти без збереження змін.")
+            if choice is None:
+                return False
+            if not choice:
+                return True
+            overwrite = True
+
+        ops = list(self.history.pending_ops)
+        self.set_status("Збереження...")
+        try:
+            self.io.run(DataManager.save_ops, ops, overwrite)
+        except Exception as e:
+            self.set_status("Помилка збереження")
+            messagebox.showerror("Помилка запису", f"Не вдалося зберегти тести: {e}\n"
+                                                   f"Вікно не закрито, щоб зміни не було втрачено.")
+            return False
+        self.history.mark_saved(len(ops))
+        return True
 
 
 class QuestionBuilderDialog(tb.Toplevel):
+    # q_type -> (метод, що будує поля форми, метод, що створює з них питання).
+    # У списку типів лише ті зареєстровані типи, для яких є форма: новий тип без неї редактор просто не пропонує
+    FORMS = {
+        "SingleChoice": ("build_single_choice_ui", "make_single_choice"),
+        "MultiChoice": ("build_multi_choice_ui", "make_multi_choice"),
+        "Text": ("build_text_ui", "make_text"),
+        "Scale": ("build_scale_ui", "make_scale"),
+        "TrueFalse": ("build_true_false_ui", "make_true_false"),
+        "Matching": ("build_matching_ui", "make_matching"),
+        "Ordering": ("build_ordering_ui", "make_ordering"),
+        "FillBlank": ("build_fill_blank_ui", "make_fill_blank"),
+    }
+
     def __init__(self, parent, editor_app):
         super().__init__(parent)
         self.editor_app = editor_app
@@ -174,8 +584,7 @@ class QuestionBuilderDialog(tb.Toplevel):
         tb.Label(self, text="Тип питання:", font=("Helvetica", 10, "bold")).pack(pady=(10, 5))
         self.type_var = tb.StringVar(value="SingleChoice")
         self.type_combo = tb.Combobox(self, textvariable=self.type_var, state="readonly",
-                                      values=["SingleChoice", "MultiChoice", "Text", "Scale",
-                                              "TrueFalse", "Matching", "Ordering", "FillBlank"])
+                                      values=[q_type for q_type in QUESTION_TYPES if q_type in self.FORMS])
         self.type_combo.pack(fill="x", padx=20)
         self.type_combo.bind("<<ComboboxSelected>>", self.build_dynamic_ui)
 
@@ -198,59 +607,114 @@ class QuestionBuilderDialog(tb.Toplevel):
         for widget in self.dynamic_frame.winfo_children():
             widget.destroy()
 
-        q_type = self.type_var.get()
-
-        if q_type == "SingleChoice":
-            tb.Label(self.dynamic_frame, text="Варіанти (з нового рядка):").pack(anchor="w")
-            self.options_text = tb.Text(self.dynamic_frame, height=4)
-            self.options_text.pack(fill="x", pady=(0, 10))
-            tb.Label(self.dynamic_frame, text="Правильна відповідь:").pack(anchor="w")
-            self.correct_entry = tb.Entry(self.dynamic_frame)
-            self.correct_entry.pack(fill="x")
-
-        elif q_type == "MultiChoice":
-            tb.Label(self.dynamic_frame, text="Варіанти (з нового рядка):").pack(anchor="w")
-            self.options_text = tb.Text(self.dynamic_frame, height=4)
-            self.options_text.pack(fill="x", pady=(0, 10))
-            tb.Label(self.dynamic_frame, text="Правильні відповіді (через кому):").pack(anchor="w")
-            self.correct_entry = tb.Entry(self.dynamic_frame)
-            self.correct_entry.pack(fill="x")
-
-        elif q_type == "Text":
-            tb.Label(self.dynamic_frame, text="Ключові слова (через кому):").pack(anchor="w")
-            self.keywords_entry = tb.Entry(self.dynamic_frame)
-            self.keywords_entry.pack(fill="x")
-
-        elif q_type == "Scale":
-            tb.Label(self.dynamic_frame, text="Правильне числове значення:").pack(anchor="w")
-            self.val_entry = tb.Entry(self.dynamic_frame)
-            self.val_entry.pack(fill="x", pady=(0, 10))
-            tb.Label(self.dynamic_frame, text="Допустима похибка (наприклад, 1):").pack(anchor="w")
-            self.tol_entry = tb.Entry(self.dynamic_frame)
-            self.tol_entry.pack(fill="x")
-
-        elif q_type == "TrueFalse":
-            tb.Label(self.dynamic_frame, text="Правильна відповідь:").pack(anchor="w")
-            self.tf_var = tb.StringVar(value="Правда")
-            tb.Combobox(self.dynamic_frame, textvariable=self.tf_var, state="readonly",
-                        values=["Правда", "Брехня"]).pack(fill="x")
-
-        elif q_type == "Matching":
-            tb.Label(self.dynamic_frame, text="Пари через тире 'Термін - Визначення' (з нового рядка):").pack(
-                anchor="w")
-            self.match_text = tb.Text(self.dynamic_frame, height=5)
-            self.match_text.pack(fill="x")
-
-        elif q_type == "Ordering":
-            tb.Label(self.dynamic_frame, text="Правильна послідовність (кожен елемент з нового рядка):").pack(
-                anchor="w")
-            self.order_text = tb.Text(self.dynamic_frame, height=5)
-            self.order_text.pack(fill="x")
-
-        elif q_type == "FillBlank":
-            tb.Label(self.dynamic_frame, text="Допустимі варіанти пропущеного слова (через кому):").pack(anchor="w")
-            self.blank_entry = tb.Entry(self.dynamic_frame)
-            self.blank_entry.pack(fill="x")
+        build, _ = self.FORMS[self.type_var.get()]
+        getattr(self, build)()
+
+    def build_single_choice_ui(self):
+        tb.Label(self.dynamic_frame, text="Варіанти (з нового рядка):").pack(anchor="w")
+        self.options_text = tb.Text(self.dynamic_frame, height=4)
+        self.options_text.pack(fill="x", pady=(0, 10))
+        tb.Label(self.dynamic_frame, text="Правильна відповідь:").pack(anchor="w")
+        self.correct_entry = tb.Entry(self.dynamic_frame)
+        self.correct_entry.pack(fill="x")
+
+    def build_multi_choice_ui(self):
+        tb.Label(self.dynamic_frame, text="Варіанти (з нового рядка):").pack(anchor="w")
+        self.options_text = tb.Text(self.dynamic_frame, height=4)
+        self.options_text.pack(fill="x", pady=(0, 10))
+        tb.Label(self.dynamic_frame, text="Правильні відповіді (через кому):").pack(anchor="w")
+        self.correct_entry = tb.Entry(self.dynamic_frame)
+        self.correct_entry.pack(fill="x")
+
+    def build_text_ui(self):
+        tb.Label(self.dynamic_frame, text="Ключові слова (через кому):").pack(anchor="w")
+        self.keywords_entry = tb.Entry(self.dynamic_frame)
+        self.keywords_entry.pack(fill="x")
+        self.build_fuzzy_option()
+
+    def build_scale_ui(self):
+        tb.Label(self.dynamic_frame, text="Правильне числове значення:").pack(anchor="w")
+        self.val_entry = tb.Entry(self.dynamic_frame)
+        self.val_entry.pack(fill="x", pady=(0, 10))
+        tb.Label(self.dynamic_frame, text="Допустима похибка (наприклад, 1):").pack(anchor="w")
+        self.tol_entry = tb.Entry(self.dynamic_frame)
+        self.tol_entry.pack(fill="x")
+
+    def build_true_false_ui(self):
+        tb.Label(self.dynamic_frame, text="Правильна відповідь:").pack(anchor="w")
+        self.tf_var = tb.StringVar(value="Правда")
+        tb.Combobox(self.dynamic_frame, textvariable=self.tf_var, state="readonly",
+                    values=["Правда", "Брехня"]).pack(fill="x")
+
+    def build_matching_ui(self):
+        tb.Label(self.dynamic_frame, text="Пари через тире 'Термін - Визначення' (з нового рядка):").pack(
+            anchor="w")
+        self.match_text = tb.Text(self.dynamic_frame, height=5)
+        self.match_text.pack(fill="x")
+
+    def build_ordering_ui(self):
+        tb.Label(self.dynamic_frame, text="Правильна послідовність (кожен елемент з нового рядка):").pack(
+            anchor="w")
+        self.order_text = tb.Text(self.dynamic_frame, height=5)
+        self.order_text.pack(fill="x")
+
+    def build_fill_blank_ui(self):
+        tb.Label(self.dynamic_frame, text="Допустимі варіанти пропущеного слова (через кому):").pack(anchor="w")
+        self.blank_entry = tb.Entry(self.dynamic_frame)
+        self.blank_entry.pack(fill="x")
+        self.build_fuzzy_option()
+
+    def build_fuzzy_option(self):
+        self.fuzzy_var = tb.BooleanVar(value=False)
+        tb.Checkbutton(self.dynamic_frame, text="Нечітке порівняння (опечатки, закінчення, латинські літери)",
+                       variable=self.fuzzy_var).pack(anchor="w", pady=(10, 0))
+
+    def fuzzy_config(self):
+        # Порожній словник - налаштування за замовчуванням (допустимі помилки залежать від довжини слова)
+        return {} if self.fuzzy_var.get() else None
+
+    def make_single_choice(self, q_text, difficulty):
+        options = [opt.strip() for opt in self.options_text.get("1.0", "end").strip().split('\n') if
+                   opt.strip()]
+        correct = self.correct_entry.get().strip()
+        return SingleChoiceQuestion(q_text, options, correct, difficulty)
+
+    def make_multi_choice(self, q_text, difficulty):
+        options = [opt.strip() for opt in self.options_text.get("1.0", "end").strip().split('\n') if
+                   opt.strip()]
+        correct_list = [c.strip() for c in self.correct_entry.get().split(',') if c.strip()]
+        return MultiChoiceQuestion(q_text, options, correct_list, difficulty)
+
+    def make_text(self, q_text, difficulty):
+        keywords = [k.strip() for k in self.keywords_entry.get().split(',') if k.strip()]
+        return TextQuestion(q_text, keywords, difficulty, fuzzy=self.fuzzy_config())
+
+    def make_scale(self, q_text, difficulty):
+        val = int(self.val_entry.get().strip())
+        tol = int(self.tol_entry.get().strip())
+        return ScaleQuestion(q_text, val, tol, difficulty)
+
+    def make_true_false(self, q_text, difficulty):
+        correct_bool = True if self.tf_var.get() == "Правда" else False
+        return TrueFalseQuestion(q_text, correct_bool, difficulty)
+
+    def make_matching(self, q_text, difficulty):
+        lines = [line.strip() for line in self.match_text.get("1.0", "end").strip().split('\n') if line.strip()]
+        pairs = {}
+        for line in lines:
+            if '-' in line:
+                k, v = line.split('-', 1)
+                pairs[k.strip()] = v.strip()
+        return MatchingQuestion(q_text, pairs, difficulty)
+
+    def make_ordering(self, q_text, difficulty):
+        correct_order = [line.strip() for line in self.order_text.get("1.0", "end").strip().split('\n') if
+                         line.strip()]
+        return OrderingQuestion(q_text, correct_order, difficulty)
+
+    def make_fill_blank(self, q_text, difficulty):
+        acceptable = [ans.strip() for ans in self.blank_entry.get().split(',') if ans.strip()]
+        return FillBlankQuestion(q_text, acceptable, difficulty, fuzzy=self.fuzzy_config())
 
     def save_question(self):
         q_text = self.text_entry.get("1.0", "end").strip()
@@ -259,54 +723,20 @@ class QuestionBuilderDialog(tb.Toplevel):
             return
 
         difficulty = self.diff_var.get()
-        q_type = self.type_var.get()
-        new_q = None
+        _, make = self.FORMS[self.type_var.get()]
 
         try:
-            if q_type == "SingleChoice":
-                options = [opt.strip() for opt in self.options_text.get("1.0", "end").strip().split('\n') if
-                           opt.strip()]
-                correct = self.correct_entry.get().strip()
-                new_q = SingleChoiceQuestion(q_text, options, correct, difficulty)
-
-            elif q_type == "MultiChoice":
-                options = [opt.strip() for opt in self.options_text.get("1.0", "end").strip().split('\n') if
-                           opt.strip()]
-                correct_list = [c.strip() for c in self.correct_entry.get().split(',') if c.strip()]
-                new_q = MultiChoiceQuestion(q_text, options, correct_list, difficulty)
-
-            elif q_type == "Text":
-                keywords = [k.strip() for k in self.keywords_entry.get().split(',') if k.strip()]
-                new_q = TextQuestion(q_text, keywords, difficulty)
-
-            elif q_type == "Scale":
-                val = int(self.val_entry.get().strip())
-                tol = int(self.tol_entry.get().strip())
-                new_q = ScaleQuestion(q_text, val, tol, difficulty)
-
-            elif q_type == "TrueFalse":
-                correct_bool = True if self.tf_var.get() == "Правда" else False
-                new_q = TrueFalseQuestion(q_text, correct_bool, difficulty)
-
-            elif q_type == "Matching":
-                lines = [line.strip() for line in self.match_text.get("1.0", "end").strip().split('\n') if line.strip()]
-                pairs = {}
-                for line in lines:
-                    if '-' in line:
-                        k, v = line.split('-', 1)
-                        pairs[k.strip()] = v.strip()
-                new_q = MatchingQuestion(q_text, pairs, difficulty)
-
-            elif q_type == "Ordering":
-                correct_order = [line.strip() for line in self.order_text.get("1.0", "end").strip().split('\n') if
-                                 line.strip()]
-                new_q = OrderingQuestion(q_text, correct_order, difficulty)
-
-            elif q_type == "FillBlank":
-                acceptable = [ans.strip() for ans in self.blank_entry.get().split(',') if ans.strip()]
-                new_q = FillBlankQuestion(q_text, acceptable, difficulty)
-
-            self.editor_app.tests[self.editor_app.current_test_name].append(new_q)
+            new_q = getattr(self, make)(q_text, difficulty)
+            similar = self.editor_app.similar_questions(new_q)
+            if similar:
+                score, other_text, test_name = similar[0]
+                if not messagebox.askyesno(
+                        "Можливий дублікат",
+                        f"Схоже питання ({score:.0%}) вже є в тесті '{test_name}':\n\n{other_text}\n\nДодати все одно?",
+                        parent=self):
+                    return
+            self.editor_app.run_command(AddQuestion(self.editor_app.current_test_name, new_q))
+            self.editor_app.update_test_label(self.editor_app.current_test_name)
             self.editor_app.refresh_questions_list()
             self.destroy()
 
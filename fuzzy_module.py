@@ -0,0 +1,202 @@
+from typing import List, Dict, Any, Iterable, Optional, Tuple, FrozenSet
+
+from search_module import tokenize
+
+# Латинські літери, які на письмі не відрізнити від кириличних (після casefold, тож і великі теж):
+# студент, що перемкнув розкладку посеред слова, не має втрачати бал
+# Ґ часто пишуть як Г, а Ё трапляється в текстах, набраних російською розкладкою
+LOOKALIKES = str.maketrans("aceiopxykbhmtґё", "асеіорхуквнмтге")
+
+# Найуживаніші закінчення іменників, прикметників і дієслів, від довших до коротших.
+# Це не повноцінний стемер: мета - щоб "функції", "функцію" і "функція" зводились до однієї основи
+ENDINGS = ("ями", "ами", "ові", "еві", "ого", "ому", "ими", "іми", "ися", "ись", "ться",
+           "ах", "ях", "ам", "ям", "ів", "їв", "ий", "ій", "ої", "ою", "ею", "єю", "им", "ім", "их", "іх",
+           "ом", "ем", "єм", "ти", "ть",
+           "а", "я", "у", "ю", "і", "ї", "и", "о", "е", "є", "ь")
+MIN_STEM = 3
+_ENDINGS_BY_LENGTH = [(n, frozenset(e for e in ENDINGS if len(e) == n))
+                      for n in sorted({len(e) for e in ENDINGS}, reverse=True)]
+
+# Скільки різних слів відповіді пам'ятає один FuzzyMatcher (відповіді студентів часто повторюються)
+TOKEN_CACHE_SIZE = 4096
+
+
+def normalize_token(token: str) -> str:
+    return token.translate(LOOKALIKES)
+
+
+def stem(token: str) -> str:
+    for n, endings in _ENDINGS_BY_LENGTH:
+        if len(token) - n >= MIN_STEM and token[-n:] in endings:
+            return token[:-n]
+    return token
+
+
+def normalize_text(text: str, stemming: bool = True) -> Tuple[str, ...]:
+    tokens = (normalize_token(token) for token in tokenize(text))
+    return tuple(stem(token) for token in tokens) if stemming else tuple(tokens)
+
+
+def auto_distance(token: str) -> int:
+    # Допустима кількість помилок залежить від довжини слова: у коротких словах одна помилка - вже інше слово
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 6:
+        return 1
+    return 2
+
+
+def bounded_distance(a: str, b: str, limit: int, transpositions: bool = True) -> int:
+    """
+    Відстань Левенштейна (з transpositions - Дамерау, варіант OSA), але не більша за limit + 1:
+    рахується лише смуга шириною 2·limit + 1 навколо діагоналі, і щойно весь рядок матриці
+    перевищив limit, обчислення припиняється.
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > limit:
+        return limit + 1
+    if not len_a or not len_b:
+        return max(len_a, len_b)
+    over = limit + 1
+    previous2: List[int] = []
+    previous = [j if j <= limit else over for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        lo = max(1, i - limit)
+        hi = min(len_b, i + limit)
+        current = [over] * (len_b + 1)
+        current[0] = i if i <= limit else over
+        ca = a[i - 1]
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            cb = b[j - 1]
+            cost = 0 if ca == cb else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if transpositions and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value if value <= limit else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[len_b]
+
+
+def _deletions(token: str, depth: int) -> set:
+    # Усі рядки, отримані видаленням до depth символів (разом із самим словом)
+    result = {token}
+    frontier = {token}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        result |= frontier
+    return result
+
+
+class FuzzyMatcher:
+    """
+    Нечітке порівняння відповіді з еталонними фразами (ключовими словами чи допустимими відповідями).
+    Фрази нормалізуються (регістр, латинські двійники літер, закінчення) один раз при створенні,
+    а всі їхні слова потрапляють в індекс видалень: слово на відстані не більше k від еталона
+    має з ним спільний рядок серед своїх видалень до k символів. Тож для слова відповіді кандидати
+    знаходяться кількома пошуками в словнику, а обмежена відстань рахується лише для них.
+    Результат для кожного слова відповіді кешується.
+    """
+
+    __slots__ = ("max_distance", "transpositions", "stemming", "_always", "_phrases", "_weights",
+                 "_vocabulary", "_limits", "_ids", "_deletes", "_depth", "_cache")
+
+    def __init__(self, phrases: Iterable[str], max_distance: Optional[int] = None, transpositions: bool = True,
+                 stemming: bool = True):
+        self.max_distance = max_distance
+        self.transpositions = transpositions
+        self.stemming = stemming
+        weights: Dict[Tuple[int, ...], int] = {}
+        self._always = 0
+        self._vocabulary: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for phrase in phrases:
+            tokens = normalize_text(phrase, stemming)
+            if not tokens:
+                # Як і в KeywordMatcher: порожня фраза збігається з будь-якою відповіддю
+                self._always += 1
+                continue
+            key = tuple(self._token_id(token) for token in tokens)
+            weights[key] = weights.get(key, 0) + 1
+        self._phrases = list(weights)
+        self._weights = [weights[key] for key in self._phrases]
+        self._limits = [auto_distance(token) if max_distance is None else max_distance for token in self._vocabulary]
+        self._depth = max(self._limits, default=0)
+        self._deletes: Dict[str, List[int]] = {}
+        for token_id, (token, limit) in enumerate(zip(self._vocabulary, self._limits)):
+            for variant in _deletions(token, limit):
+                self._deletes.setdefault(variant, []).append(token_id)
+        self._cache: Dict[str, FrozenSet[int]] = {}
+
+    def _token_id(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is None:
+            token_id = self._ids[token] = len(self._vocabulary)
+            self._vocabulary.append(token)
+        return token_id
+
+    def config(self) -> Dict[str, Any]:
+        return {"max_distance": self.max_distance, "transpositions": self.transpositions, "stemming": self.stemming}
+
+    def token_matches(self, raw: str) -> FrozenSet[int]:
+        """Номери еталонних слів, з якими збігається слово відповіді (вже розбите tokenize)."""
+        found = self._cache.get(raw)
+        if found is not None:
+            return found
+        token = normalize_token(raw)
+        if self.stemming:
+            token = stem(token)
+        candidates = set()
+        deletes = self._deletes
+        for variant in _deletions(token, self._depth):
+            candidates.update(deletes.get(variant, ()))
+        vocabulary, limits, transpositions = self._vocabulary, self._limits, self.transpositions
+        found = frozenset(token_id for token_id in candidates
+                          if bounded_distance(token, vocabulary[token_id], limits[token_id],
+                                              transpositions) <= limits[token_id])
+        if len(self._cache) >= TOKEN_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[raw] = found
+        return found
+
+    def _answer(self, text: str) -> List[FrozenSet[int]]:
+        # Кеш ключується словом до нормалізації, тож для повторених слів не рахується навіть основа
+        token_matches = self.token_matches
+        return [token_matches(token) for token in tokenize(text)]
+
+    def matches(self, text: str) -> int:
+        # Той самий зміст, що й KeywordMatcher.matches: скільки фраз (з повторами) є у відповіді,
+        # але фраза має збігтися з цілими словами поспіль, а не бути підрядком
+        count = self._always
+        if not self._phrases:
+            return count
+        answer = self._answer(text)
+        present = frozenset().union(*answer)
+        for phrase, weight in zip(self._phrases, self._weights):
+            if phrase[0] not in present:
+                continue
+            if len(phrase) == 1 or any(all(token_id in answer[start + k] for k, token_id in enumerate(phrase))
+                                       for start in range(len(answer) - len(phrase) + 1)):
+                count += weight
+        return count
+
+    def full_match(self, text: str) -> bool:
+        # Уся відповідь (а не її частина) збігається з однією з фраз
+        answer = self._answer(text)
+        for phrase in self._phrases:
+            if len(phrase) == len(answer) and all(token_id in ids for token_id, ids in zip(phrase, answer)):
+                return True
+        return bool(self._always) and not answer
+
+
+if __name__ == "__main__":
+    matcher = FuzzyMatcher(["функція", "змінна", "цикл for"])
+    for answer in ["Функцію та змінні", "фунція, змінна", "цикл for і while", "цикли fro", "фyнкція (латинська y)"]:
+        print(f"{answer!r}: {matcher.matches(answer)} з 3")
+    print(bounded_distance("kitten", "sitting", 3), bounded_distance("kitten", "sitting", 1))
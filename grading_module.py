@@ -0,0 +1,423 @@
+import argparse
+import json
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Callable, Hashable, Optional, Sequence, Tuple, Iterator
+
+from questions_module import Question
+from storage_module import open_storage, TESTS_FILE
+
+_MISSING = object()
+# Відповідь є, але її тип не підходить питанню (число замість списку тощо): 0 балів і позначка в результаті
+_INVALID = object()
+
+
+def _text(raw: Any) -> str:
+    # Варіанти відповідей - рядки; число ("4" чи 4) приймаємо як рядок, решту - ні
+    if isinstance(raw, str):
+        return raw
+    if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+        return str(raw)
+    raise ValueError(f"очікувався рядок, отримано {type(raw).__name__}")
+
+
+def _decode_bool(raw: Any) -> Any:
+    if isinstance(raw, str):
+        return raw.strip().lower() in ("true", "так", "правда", "1")
+    if isinstance(raw, (bool, int, float)):
+        return raw
+    raise ValueError(f"очікувалось так/ні, отримано {type(raw).__name__}")
+
+
+def _decode_number(raw: Any) -> Any:
+    if isinstance(raw, bool):
+        raise ValueError("очікувалось число, отримано bool")
+    if isinstance(raw, float) and not math.isfinite(raw):
+        raise ValueError("очікувалось скінченне число")
+    if isinstance(raw, (int, float, str)):
+        return raw
+    raise ValueError(f"очікувалось число, отримано {type(raw).__name__}")
+
+
+def _decode_list(raw: Any) -> Any:
+    if isinstance(raw, str):
+        return [raw]
+    if isinstance(raw, (list, tuple)):
+        return [_text(item) for item in raw]
+    raise ValueError(f"очікувався список, отримано {type(raw).__name__}")
+
+
+def _decode_pairs(raw: Any) -> Any:
+    # Пари можуть прийти як {"термін": "визначення"} або як [["термін", "визначення"], ...]
+    if isinstance(raw, list):
+        pairs = {}
+        for pair in raw:
+            if not isinstance(pair, (list, tuple)) or len(pair) != 2:
+                raise ValueError("пара має складатися з двох елементів")
+            pairs[_text(pair[0])] = _text(pair[1])
+        return pairs
+    if isinstance(raw, dict):
+        return {key: _text(value) for key, value in raw.items()}
+    raise ValueError(f"очікувались пари, отримано {type(raw).__name__}")
+
+
+# q_type -> як перевірити і перетворити відповідь з JSON у форму, яку очікує check() цього типу.
+# Декодер кидає ValueError, якщо відповідь не можна звести до потрібного типу
+ANSWER_DECODERS = {
+    "SingleChoice": _text,
+    "Text": _text,
+    "FillBlank": _text,
+    "Scale": _decode_number,
+    "TrueFalse": _decode_bool,
+    "MultiChoice": _decode_list,
+    "Ordering": _decode_list,
+    "Matching": _decode_pairs,
+}
+
+
+def decode_answer(question: Question, raw: Any) -> Any:
+    decoder = ANSWER_DECODERS.get(question.q_type)
+    if decoder is None:
+        return raw
+    try:
+        return decoder(raw)
+    except ValueError:
+        return _INVALID
+
+
+def parse_sheet(line: str) -> Optional[Dict[str, Any]]:
+    # Рядок файлу бланків; битий JSON чи значення, яке не є об'єктом, дає None - такий рядок пропускається
+    try:
+        sheet = json.loads(line)
+    except ValueError:
+        return None
+    return sheet if isinstance(sheet, dict) else None
+
+
+def sheet_answers(sheet: Dict[str, Any], count: int) -> List[Any]:
+    # Відповіді - список у порядку питань або словник {"індекс питання": відповідь}
+    answers = sheet.get("answers", [])
+    if isinstance(answers, dict):
+        return [answers.get(str(i), _MISSING) for i in range(count)]
+    if not isinstance(answers, list):
+        return [_MISSING] * count
+    answers = list(answers[:count])
+    return answers + [_MISSING] * (count - len(answers))
+
+
+def decode_sheet(questions: List[Question], sheet: Dict[str, Any]) -> List[Any]:
+    # Відсутня відповідь (або null) не перевіряється і дає 0 балів
+    return [_MISSING if raw is _MISSING or raw is None else decode_answer(question, raw)
+            for question, raw in zip(questions, sheet_answers(sheet, len(questions)))]
+
+
+def invalid_answers(row: List[Any]) -> List[int]:
+    return [i for i, answer in enumerate(row) if answer is _INVALID]
+
+
+def missing_answers(row: List[Any]) -> List[int]:
+    return [i for i, answer in enumerate(row) if answer is _MISSING]
+
+
+def _folded(answer: Any) -> Any:
+    return answer.lower().strip() if isinstance(answer, str) else answer
+
+
+def _stripped(answer: Any) -> Any:
+    return answer.strip() if isinstance(answer, str) else answer
+
+
+# q_type -> нормалізація відповіді для ключа кешу: різні відповіді з однаковим ключем мають гарантовано
+# однакову оцінку (check цих типів сам так нормалізує). Відповіді-списки і словники не кешуються
+ANSWER_KEYS: Dict[str, Callable[[Any], Any]] = {
+    "SingleChoice": _folded,
+    "FillBlank": _folded,
+    "Text": _folded,
+    "Scale": _stripped,
+    "TrueFalse": lambda answer: answer,
+}
+
+
+class GradingCache:
+    """
+    Обмежений LRU-кеш оцінок: (uid питання, версія питання, нормалізована відповідь) -> бал.
+    На великому іспиті відповіді на питання з вибором, так/ні чи шкалою зводяться до кількох різних,
+    тож check() рахується один раз на різну відповідь. Зміна правильної відповіді чи налаштувань
+    питання змінює його версію, і старі записи просто витісняються.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[int, int, Hashable], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def worth_batching(question: Question) -> bool:
+        # Вибір, так/ні, шкала і точний FillBlank у check_batch перевіряються швидше (~0.1-0.3 мкс на відповідь),
+        # ніж групування і пошук у кеші, тож пакетно кешуються лише дорогі перевірки: ключові слова і нечіткі
+        return question.q_type == "Text" or getattr(question, "fuzzy", None) is not None
+
+    def _store(self, key: Tuple[int, int, Hashable], score: float):
+        self._entries[key] = score
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def check(self, question: Question, answer: Any) -> float:
+        normalize = ANSWER_KEYS.get(question.q_type)
+        if normalize is None:
+            return question.check(answer)
+        key = (question.uid, question.version, normalize(answer))
+        try:
+            score = self._entries.get(key)
+        except TypeError:
+            # Нехешована відповідь (наприклад, список замість рядка) - перевіряємо без кешу
+            return question.check(answer)
+        if score is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+        self.misses += 1
+        score = question.check(answer)
+        self._store(key, score)
+        return score
+
+    def check_batch(self, question: Question, answers: Sequence[Any]) -> List[float]:
+        # Відповіді пакета спершу групуються за ключем, тож кеш переглядається один раз на різну відповідь,
+        # а всі нові різні відповіді перевіряються одним викликом check_batch
+        normalize = ANSWER_KEYS.get(question.q_type)
+        if normalize is None or not self.worth_batching(question):
+            return question.check_batch(answers)
+        groups: Dict[Hashable, List[int]] = {}
+        uncached: List[int] = []
+        for i, answer in enumerate(answers):
+            try:
+                groups.setdefault(normalize(answer), []).append(i)
+            except TypeError:
+                # Нехешована відповідь (наприклад, список замість рядка) - перевіряємо без кешу
+                uncached.append(i)
+
+        scores: List[Optional[float]] = [None] * len(answers)
+        uid, version = question.uid, question.version
+        entries = self._entries
+        missing = []
+        for normalized, positions in groups.items():
+            key = (uid, version, normalized)
+            score = entries.get(key)
+            if score is None:
+                missing.append((key, positions))
+                self.misses += 1
+                self.hits += len(positions) - 1
+                continue
+            entries.move_to_end(key)
+            self.hits += len(positions)
+            for i in positions:
+                scores[i] = score
+        if missing:
+            checked = question.check_batch([answers[positions[0]] for _, positions in missing])
+            for (key, positions), score in zip(missing, checked):
+                self._store(key, score)
+                for i in positions:
+                    scores[i] = score
+        if uncached:
+            for i, score in zip(uncached, question.check_batch([answers[i] for i in uncached])):
+                scores[i] = score
+        return scores
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "hit_rate": self.hit_rate}
+
+    def clear(self):
+        self._entries.clear()
+
+
+def grade_rows(questions: List[Question], rows: List[List[Any]],
+               cache: Optional[GradingCache] = None) -> List[List[float]]:
+    # Оцінювання колонками: кожне питання перевіряє всі відповіді пакета одним викликом check_batch
+    scores = [[0.0] * len(questions) for _ in rows]
+    for q_idx, question in enumerate(questions):
+        present = [i for i, row in enumerate(rows) if row[q_idx] is not _MISSING and row[q_idx] is not _INVALID]
+        if not present:
+            continue
+        column = [rows[i][q_idx] for i in present]
+        try:
+            checked = cache.check_batch(question, column) if cache is not None else question.check_batch(column)
+        except (TypeError, ValueError, AttributeError, OverflowError, KeyError):
+            # Запасний шлях: відповідь пройшла декодер, але check() на ній падає. Пакет перевіряється
+            # по одній відповіді, а зламані позначаються в рядку як _INVALID замість того, щоб зупинити весь запуск
+            checked = []
+            for i, answer in zip(present, column):
+                try:
+                    checked.append(question.check(answer))
+                except (TypeError, ValueError, AttributeError, OverflowError, KeyError):
+                    rows[i][q_idx] = _INVALID
+                    checked.append(0.0)
+        for i, score in zip(present, checked):
+            scores[i][q_idx] = score
+    return scores
+
+
+def grade_sheets(questions: List[Question], sheets: List[Dict[str, Any]],
+                 cache: Optional[GradingCache] = None) -> List[List[float]]:
+    return grade_rows(questions, [decode_sheet(questions, sheet) for sheet in sheets], cache)
+
+
+def student_result(sheet: Dict[str, Any], row: List[float], decoded: Optional[List[Any]] = None) -> Dict[str, Any]:
+    result = {"student": sheet.get("student"), "score": sum(row), "scores": row}
+    invalid = invalid_answers(decoded) if decoded is not None else []
+    if invalid:
+        # Індекси питань, відповіді на які мали неправильний тип і отримали 0 балів
+        result["invalid"] = invalid
+    missing = missing_answers(decoded) if decoded is not None else []
+    if missing:
+        # Питання без відповіді: 0 балів у сумі, але для калібрування IRT це пропуск, а не помилка
+        result["missing"] = missing
+    return result
+
+
+class GradingReport:
+    def __init__(self, question_count: int):
+        self.students = 0
+        self.total_score = 0.0
+        self.question_sums = [0.0] * question_count
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Рядки файлу бланків, які не вдалося прочитати як бланк (битий JSON, не об'єкт)
+        self.skipped_lines = 0
+
+    def add(self, scores: List[float]):
+        self.students += 1
+        self.total_score += sum(scores)
+        for i, value in enumerate(scores):
+            self.question_sums[i] += value
+
+    def merge(self, students: int, total_score: float, question_sums: List[float]):
+        self.students += students
+        self.total_score += total_score
+        for i, value in enumerate(question_sums):
+            self.question_sums[i] += value
+
+    def add_cache_stats(self, hits: int, misses: int):
+        self.cache_hits += hits
+        self.cache_misses += misses
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "students": self.students,
+            "mean_score": self.total_score / self.students if self.students else 0.0,
+            "question_means": [s / self.students if self.students else 0.0 for s in self.question_sums],
+        }
+        lookups = self.cache_hits + self.cache_misses
+        if lookups:
+            data["cache_hit_rate"] = self.cache_hits / lookups
+        if self.skipped_lines:
+            data["skipped_lines"] = self.skipped_lines
+        return data
+
+
+# Кожен процес-обробник відновлює питання один раз, а не для кожного пакета, і тримає свій кеш оцінок
+_worker_questions: List[Question] = []
+_worker_cache = GradingCache()
+
+
+def _init_worker(question_dicts: List[Dict[str, Any]]):
+    global _worker_questions
+    _worker_questions = Question.from_dicts(question_dicts)
+
+
+def _grade_chunk(lines: List[str]) -> Tuple[List[Dict[str, Any]], float, List[float], int, int, int]:
+    # Рядки, що не є бланком, пропускаються: один битий рядок не повинен зупиняти оцінювання всього файлу
+    sheets = [sheet for sheet in map(parse_sheet, lines) if sheet is not None]
+    hits, misses = _worker_cache.hits, _worker_cache.misses
+    rows = [decode_sheet(_worker_questions, sheet) for sheet in sheets]
+    scores = grade_rows(_worker_questions, rows, _worker_cache)
+
+    results = [student_result(sheet, row, decoded) for sheet, row, decoded in zip(sheets, scores, rows)]
+    chunk_report = GradingReport(len(_worker_questions))
+    for result in results:
+        chunk_report.add(result["scores"])
+    return (results, chunk_report.total_score, chunk_report.question_sums,
+            _worker_cache.hits - hits, _worker_cache.misses - misses, len(lines) - len(sheets))
+
+
+def _read_chunks(path: str, chunk_size: int) -> Iterator[List[str]]:
+    chunk = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                chunk.append(line)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_test_dicts(test_name: str, tests_file: str = TESTS_FILE) -> List[Dict[str, Any]]:
+    storage = open_storage(tests_file)
+    storage.load()
+    if test_name not in storage.test_names():
+        raise KeyError(f"Тест '{test_name}' не знайдено у {tests_file}")
+    return storage.load_test(test_name)
+
+
+def grade_file(test_name: str, sheets_path: str, results_path: Optional[str] = None,
+               workers: Optional[int] = None, chunk_size: int = 2000,
+               tests_file: str = TESTS_FILE) -> GradingReport:
+    """
+    Розбиває файл бланків відповідей (JSON Lines) на пакети і оцінює їх у пулі процесів.
+    У польоті одночасно не більше 2 пакетів на процес, тож пам'ять не залежить від розміру файлу.
+    """
+    question_dicts = load_test_dicts(test_name, tests_file)
+    workers = workers or os.cpu_count() or 1
+    report = GradingReport(len(question_dicts))
+    out = open(results_path, "w", encoding="utf-8") if results_path else None
+
+    def collect(done):
+        for future in done:
+            results, total, question_sums, hits, misses, skipped = future.result()
+            report.merge(len(results), total, question_sums)
+            report.add_cache_stats(hits, misses)
+            report.skipped_lines += skipped
+            if out:
+                out.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(question_dicts,)) as pool:
+            pending = set()
+            for chunk in _read_chunks(sheets_path, chunk_size):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(_grade_chunk, chunk))
+            done, _ = wait(pending)
+            collect(done)
+    finally:
+        if out:
+            out.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Паралельне оцінювання бланків відповідей")
+    parser.add_argument("test", help="Назва тесту з tests.json")
+    parser.add_argument("sheets", help="Файл бланків у форматі JSON Lines")
+    parser.add_argument("--out", help="Куди записати результати по кожному студенту")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--tests-file", default=TESTS_FILE)
+    args = parser.parse_args()
+
+    summary = grade_file(args.test, args.sheets, args.out, args.workers, args.chunk_size, args.tests_file)
+    print(json.dumps(summary.to_dict(), ensure_ascii=False, indent=4))
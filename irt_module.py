@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Двопараметрична логістична модель (2PL): P(правильно | θ) = 1 / (1 + exp(-a·(θ - b)))
+if np is not None:
+    THETA_GRID = np.linspace(-4.0, 4.0, 81)
+    PRIOR = np.exp(-0.5 * THETA_GRID ** 2)
+    PRIOR /= PRIOR.sum()
+    LOG_PRIOR = np.log(PRIOR)
+
+_EPS = 1e-9
+
+
+def require_numpy():
+    # Без numpy модуль імпортується (сервер працює в інших режимах), але IRT недоступна
+    if np is None:
+        raise RuntimeError("Для IRT (режим cat, калібрування) потрібен numpy")
+
+
+def default_params(questions: List[Any]) -> "Tuple[np.ndarray, np.ndarray]":
+    # Поки немає калібрування: складність 1/2/3 -> b = -1/0/1, розрізнювальна здатність a = 1
+    b = np.array([float(q.difficulty) - 2.0 for q in questions])
+    return np.ones(len(questions)), b
+
+
+def probability(a: "np.ndarray", b: "np.ndarray", theta: "np.ndarray") -> "np.ndarray":
+    # Рядки - точки сітки θ, стовпці - питання
+    z = np.multiply.outer(theta, a) - a * b
+    return np.clip(1.0 / (1.0 + np.exp(-z)), _EPS, 1.0 - _EPS)
+
+
+class ItemBank:
+    """
+    Питання тесту з параметрами IRT і заздалегідь обчисленими таблицями інформативності.
+    Для кожної точки сітки θ зберігаються TOP_K найінформативніших питань, тож вибір наступного
+    питання - це прохід коротким списком; повний векторний перерахунок - лише коли список вичерпано.
+    """
+
+    TOP_K = 64
+
+    def __init__(self, questions: List[Any], a: "Optional[np.ndarray]" = None, b: "Optional[np.ndarray]" = None):
+        require_numpy()
+        self.questions = questions
+        default_a, default_b = default_params(questions)
+        self.a = np.asarray(a, dtype=float) if a is not None else default_a
+        self.b = np.asarray(b, dtype=float) if b is not None else default_b
+        self.topics = np.array([getattr(q, "topic", None) for q in questions], dtype=object)
+        self._top: Dict[Any, np.ndarray] = {}
+        self._topic_items: Dict[Any, np.ndarray] = {}
+
+    def information(self, grid_idx: int, items: "Optional[np.ndarray]" = None) -> "np.ndarray":
+        a = self.a if items is None else self.a[items]
+        b = self.b if items is None else self.b[items]
+        p = probability(a, b, THETA_GRID[grid_idx:grid_idx + 1])[0]
+        return a * a * p * (1.0 - p)
+
+    def items_for(self, topic=None) -> "Optional[np.ndarray]":
+        if topic is None:
+            return None
+        if topic not in self._topic_items:
+            self._topic_items[topic] = np.flatnonzero(self.topics == topic)
+        return self._topic_items[topic]
+
+    def top_items(self, topic=None) -> "np.ndarray":
+        # Таблиця [точка сітки] -> індекси TOP_K питань за спаданням інформативності; будується раз на тему
+        if topic not in self._top:
+            items = self.items_for(topic)
+            count = len(self.questions) if items is None else len(items)
+            k = min(self.TOP_K, count)
+            table = np.empty((len(THETA_GRID), k), dtype=np.int64)
+            for g in range(len(THETA_GRID)):
+                info = self.information(g, items)
+                best = np.argpartition(-info, k - 1)[:k] if k < count else np.arange(count)
+                best = best[np.argsort(-info[best], kind="stable")]
+                table[g] = best if items is None else items[best]
+            self._top[topic] = table
+        return self._top[topic]
+
+    def best_item(self, grid_idx: int, used: set, topic=None) -> Optional[int]:
+        for item in self.top_items(topic)[grid_idx]:
+            if item not in used:
+                return int(item)
+        items = self.items_for(topic)
+        candidates = np.arange(len(self.questions)) if items is None else items
+        if used:
+            candidates = candidates[~np.isin(candidates, list(used))]
+        if not len(candidates):
+            return None
+        info = self.information(grid_idx, candidates)
+        return int(candidates[np.argmax(info)])
+
+
+class CATSession:
+    """Комп'ютерне адаптивне тестування: оцінка здібності θ (EAP) і вибір питання з максимальною інформацією."""
+
+    def __init__(self, bank: ItemBank, max_items: int = 10, se_target: float = 0.3, topic=None):
+        self.bank = bank
+        self.max_items = max_items
+        self.se_target = se_target
+        self.topic = topic
+        self.used: set = set()
+        self.log_posterior = LOG_PRIOR.copy()
+        self.theta = 0.0
+        self.se = float(np.sqrt((PRIOR * THETA_GRID ** 2).sum()))
+
+    def finished(self) -> bool:
+        return len(self.used) >= self.max_items or self.se <= self.se_target
+
+    def next_item(self) -> Optional[int]:
+        if self.finished():
+            return None
+        grid_idx = int(np.abs(THETA_GRID - self.theta).argmin())
+        item = self.bank.best_item(grid_idx, self.used, self.topic)
+        if item is not None:
+            self.used.add(item)
+        return item
+
+    def record(self, item: int, score: float):
+        # Частковий бал (0.5 у Scale, частка ключових слів у Text) входить у правдоподібність дробово
+        p = probability(self.bank.a[item:item + 1], self.bank.b[item:item + 1], THETA_GRID)[:, 0]
+        self.log_posterior += score * np.log(p) + (1.0 - score) * np.log(1.0 - p)
+        posterior = np.exp(self.log_posterior - self.log_posterior.max())
+        posterior /= posterior.sum()
+        self.theta = float((posterior * THETA_GRID).sum())
+        self.se = float(np.sqrt((posterior * (THETA_GRID - self.theta) ** 2).sum()))
+
+
+def calibrate(scores: "np.ndarray", iterations: int = 30) -> "Tuple[np.ndarray, np.ndarray]":
+    """
+    Оцінює параметри a, b для всіх питань разом (EM з квадратурою на сітці θ).
+    scores - матриця студенти × питання з балами 0..1, NaN - питання не задавали.
+    """
+    require_numpy()
+    x = np.asarray(scores, dtype=float)
+    observed = ~np.isnan(x)
+    hits = np.where(observed, x, 0.0)
+    misses = observed - hits
+
+    a = np.ones(x.shape[1])
+    c = np.zeros(x.shape[1])
+    theta = THETA_GRID[:, None]
+    for _ in range(iterations):
+        b = -c / a
+        p = probability(a, b, THETA_GRID)
+        # E-крок: апостеріорний розподіл θ кожного студента на сітці
+        log_lik = hits @ np.log(p).T + misses @ np.log(1.0 - p).T + LOG_PRIOR
+        weights = np.exp(log_lik - log_lik.max(axis=1, keepdims=True))
+        weights /= weights.sum(axis=1, keepdims=True)
+        expected_n = weights.T @ observed
+        expected_r = weights.T @ hits
+
+        # M-крок: один крок Ньютона логістичної регресії logit P = a·θ + c для кожного питання
+        resid = expected_r - expected_n * p
+        w = expected_n * p * (1.0 - p)
+        g_a = (resid * theta).sum(axis=0)
+        g_c = resid.sum(axis=0)
+        h_aa = (w * theta ** 2).sum(axis=0) + _EPS
+        h_ac = (w * theta).sum(axis=0)
+        h_cc = w.sum(axis=0) + _EPS
+        det = h_aa * h_cc - h_ac ** 2 + _EPS
+        a = np.clip(a + (h_cc * g_a - h_ac * g_c) / det, 0.2, 4.0)
+        c = np.clip(c + (h_aa * g_c - h_ac * g_a) / det, -4.0 * a, 4.0 * a)
+    return a, -c / a
+
+
+def difficulty_from_b(b: "np.ndarray") -> List[int]:
+    # Зворотне відображення на шкалу складності редактора (1-3)
+    return [int(v) for v in np.clip(np.rint(b + 2.0), 1, 3)]
+
+
+def load_results_matrix(results_path: str) -> "np.ndarray":
+    # Файл результатів grading_module / pipeline_module: {"student": ..., "scores": [...], "missing": [...]} на рядок.
+    # Питання без відповіді - NaN, а не 0: calibrate не має рахувати їх неправильними
+    require_numpy()
+    rows = []
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                row = [float(score) for score in result["scores"]]
+                for idx in result.get("missing", ()):
+                    row[idx] = np.nan
+                rows.append(row)
+    return np.array(rows, dtype=float)
+
+
+def _params_items(a: "np.ndarray", b: "np.ndarray") -> List[Dict[str, float]]:
+    return [{"a": float(ai), "b": float(bi)} for ai, bi in zip(a, b)]
+
+
+def _params_arrays(items: List[Dict[str, float]]) -> "Tuple[np.ndarray, np.ndarray]":
+    require_numpy()
+    return np.array([d["a"] for d in items], dtype=float), np.array([d["b"] for d in items], dtype=float)
+
+
+def save_params(path: str, a: "np.ndarray", b: "np.ndarray"):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_params_items(a, b), f, indent=4)
+
+
+def load_params(path: str) -> "Tuple[np.ndarray, np.ndarray]":
+    with open(path, "r", encoding="utf-8") as f:
+        return _params_arrays(json.load(f))
+
+
+def params_path(tests_path: str) -> str:
+    # Параметри калібрування лежать поруч із банком: tests.json і tests.d -> tests.irt.json
+    return os.path.splitext(os.path.normpath(tests_path))[0] + ".irt.json"
+
+
+def save_test_params(path: str, test_name: str, a: "np.ndarray", b: "np.ndarray"):
+    # Файл параметрів банку - {"назва тесту": [{"a": ..., "b": ...}, ...]}; інші тести лишаються як були
+    data = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    data[test_name] = _params_items(a, b)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def load_bank_params(path: str) -> "Dict[str, Tuple[np.ndarray, np.ndarray]]":
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {test_name: _params_arrays(items) for test_name, items in data.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Калібрування параметрів IRT за результатами оцінювання")
+    parser.add_argument("results", help="Файл результатів у форматі JSON Lines")
+    parser.add_argument("out", help="Куди записати параметри питань")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--test", help="Назва тесту: параметри дописуються у файл банку (його читає server_module)")
+    args = parser.parse_args()
+
+    a, b = calibrate(load_results_matrix(args.results), args.iterations)
+    if args.test:
+        save_test_params(args.out, args.test, a, b)
+    else:
+        save_params(args.out, a, b)
+    print(f"Відкалібровано питань: {len(a)}")
+    print(f"Рекомендована складність: {difficulty_from_b(b)}")
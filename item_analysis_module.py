@@ -0,0 +1,246 @@
+import argparse
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import chain, islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from questions_module import Question
+from grading_module import decode_sheet, grade_rows, load_test_dicts, parse_sheet, _MISSING, _read_chunks
+from storage_module import open_storage, TESTS_FILE
+
+# Межі частки правильних відповідей для шкали складності редактора (1 - легке, 3 - складне)
+EASY_P = 0.7
+HARD_P = 0.3
+
+CHOICE_TYPES = ("SingleChoice", "MultiChoice")
+OTHER_OPTION = "<інше>"
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Для аналізу питань потрібен numpy")
+
+
+def suggest_difficulty(p_value: float) -> int:
+    if p_value >= EASY_P:
+        return 1
+    if p_value >= HARD_P:
+        return 2
+    return 3
+
+
+def _normalized(counts: Counter) -> Counter:
+    # Сирі відповіді рахуються без обробки, а нормалізуються лише різні значення - їх небагато
+    result = Counter()
+    for answer, n in counts.items():
+        if isinstance(answer, str) and answer:
+            result[answer.lower().strip()] += n
+    return result
+
+
+def analyze_chunk(questions: List[Question],
+                  sheets: List[Any]) -> "Tuple[np.ndarray, np.ndarray, Dict[int, Counter], int]":
+    # Бали пакета, кількість пропущених відповідей, частоти варіантів для питань з вибором
+    # і кількість пропущених бланків: усе, що не є об'єктом (None - рядок, який не розібрався як JSON)
+    require_numpy()
+    rows = [decode_sheet(questions, sheet) for sheet in sheets if isinstance(sheet, dict)]
+    skipped = len(sheets) - len(rows)
+    block = np.asarray(grade_rows(questions, rows), dtype=np.float32).reshape(len(rows), len(questions))
+    omitted = np.zeros(len(questions), dtype=np.int64)
+    option_counts = {}
+    for i, q in enumerate(questions):
+        column = [row[i] for row in rows]
+        omitted[i] = column.count(_MISSING)
+        if q.q_type == "SingleChoice":
+            option_counts[i] = _normalized(Counter(a for a in column if type(a) is str))
+        elif q.q_type == "MultiChoice":
+            option_counts[i] = _normalized(Counter(chain.from_iterable(a for a in column if type(a) is list)))
+    return block, omitted, option_counts, skipped
+
+
+class ItemAnalysis:
+    """
+    Аналіз питань тесту за бланками відповідей. Бланки оцінюються пакетами тим самим check_batch,
+    що й під час звичайного оцінювання; бали складаються в матрицю студенти × питання (float32),
+    а всі показники рахуються над нею векторно.
+    """
+
+    def __init__(self, questions: List[Question]):
+        require_numpy()
+        self.questions = questions
+        self._blocks: List[np.ndarray] = []
+        self.omitted = np.zeros(len(questions), dtype=np.int64)
+        self.option_counts: Dict[int, Counter] = {i: Counter() for i, q in enumerate(questions)
+                                                  if q.q_type in CHOICE_TYPES}
+        self.skipped = 0
+
+    def add_sheets(self, sheets: List[Dict[str, Any]]):
+        self.merge(*analyze_chunk(self.questions, sheets))
+
+    def merge(self, block: "np.ndarray", omitted: "np.ndarray", option_counts: Dict[int, Counter],
+              skipped: int = 0):
+        self.skipped += skipped
+        self._blocks.append(block)
+        self.omitted += omitted
+        for i, counts in option_counts.items():
+            self.option_counts[i].update(counts)
+
+    def matrix(self) -> "np.ndarray":
+        if len(self._blocks) > 1:
+            self._blocks = [np.vstack(self._blocks)]
+        return self._blocks[0] if self._blocks else np.zeros((0, len(self.questions)), dtype=np.float32)
+
+    def options_report(self, index: int) -> Dict[str, int]:
+        counts = self.option_counts[index]
+        report = {}
+        for option in self.questions[index].options:
+            report[option] = counts.get(option.lower().strip(), 0)
+        report[OTHER_OPTION] = sum(counts.values()) - sum(report.values())
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        x = self.matrix()
+        students, items = x.shape
+        if not students:
+            return self._with_skipped({"students": 0, "items": []})
+
+        total = x.sum(axis=1, dtype=np.float64)
+        p = x.mean(axis=0, dtype=np.float64)
+        var_x = np.einsum("ij,ij->j", x, x, dtype=np.float64) / students - p * p
+        var_total = total.var()
+        cov_x_total = np.einsum("ij,i->j", x, total, dtype=np.float64) / students - p * total.mean()
+
+        # Точково-бісеріальна кореляція з сумою решти питань (без самого питання),
+        # інакше питання корелює саме з собою і розрізнювальна здатність завищується
+        cov_x_rest = cov_x_total - var_x
+        var_rest = var_total - 2.0 * cov_x_total + var_x
+        denominator = np.sqrt(np.clip(var_x * var_rest, 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            discrimination = np.where(denominator > 1e-12, cov_x_rest / denominator, np.nan)
+
+        alpha = None
+        if items > 1 and var_total > 0:
+            alpha = float(items / (items - 1) * (1.0 - var_x.sum() / var_total))
+
+        rows = []
+        for i, q in enumerate(self.questions):
+            row = {"index": i, "q_type": q.q_type, "text": q.text, "topic": q.topic,
+                   "difficulty": q.difficulty, "suggested_difficulty": suggest_difficulty(p[i]),
+                   "p_value": float(p[i]),
+                   "discrimination": None if np.isnan(discrimination[i]) else float(discrimination[i]),
+                   "omitted": int(self.omitted[i])}
+            if i in self.option_counts:
+                row["options"] = self.options_report(i)
+            rows.append(row)
+        return self._with_skipped({"students": students, "mean_score": float(total.mean()), "alpha": alpha,
+                                   "items": rows})
+
+    def _with_skipped(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        # Бланки, які не вдалося прочитати (битий JSON, не об'єкт), - як skipped_lines у звіті оцінювання
+        if self.skipped:
+            report["skipped"] = self.skipped
+        return report
+
+
+def analyze_sheets(questions: List[Question], sheets: Iterable[Dict[str, Any]],
+                   chunk_size: int = 5000) -> Dict[str, Any]:
+    analysis = ItemAnalysis(questions)
+    sheets = iter(sheets)
+    while True:
+        chunk = list(islice(sheets, chunk_size))
+        if not chunk:
+            break
+        analysis.add_sheets(chunk)
+    return analysis.report()
+
+
+_worker_questions: List[Question] = []
+
+
+def _init_worker(question_dicts: List[Dict[str, Any]]):
+    global _worker_questions
+    _worker_questions = Question.from_dicts(question_dicts)
+
+
+def _analyze_lines(lines: List[str]):
+    return analyze_chunk(_worker_questions, [parse_sheet(line) for line in lines])
+
+
+def analyze_file(test_name: str, sheets_path: str, workers: Optional[int] = None, chunk_size: int = 5000,
+                 tests_file: str = TESTS_FILE) -> Dict[str, Any]:
+    # Те саме, що analyze_sheets, але пакети оцінюються в пулі процесів (як у grading_module.grade_file)
+    question_dicts = load_test_dicts(test_name, tests_file)
+    analysis = ItemAnalysis(Question.from_dicts(question_dicts))
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(question_dicts,)) as pool:
+        pending = set()
+        for chunk in _read_chunks(sheets_path, chunk_size):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    analysis.merge(*future.result())
+            pending.add(pool.submit(_analyze_lines, chunk))
+        done, _ = wait(pending)
+        for future in done:
+            analysis.merge(*future.result())
+    return analysis.report()
+
+
+def write_report(report: Dict[str, Any], path: str):
+    if path.endswith(".csv"):
+        columns = ["index", "q_type", "text", "topic", "difficulty", "suggested_difficulty",
+                   "p_value", "discrimination", "omitted", "options"]
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for row in report["items"]:
+                row = dict(row)
+                if "options" in row:
+                    row["options"] = "; ".join(f"{opt}={n}" for opt, n in row["options"].items())
+                writer.writerow(row)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+
+
+def apply_difficulty(test_name: str, report: Dict[str, Any], tests_file: str = TESTS_FILE) -> int:
+    # Переносить рекомендовану складність у банк тестів, звідки її бачить редактор
+    storage = open_storage(tests_file)
+    storage.load()
+    q_dicts = [dict(data) for data in storage.load_test(test_name)]
+    changed = 0
+    for row in report["items"]:
+        if row["index"] < len(q_dicts) and q_dicts[row["index"]].get("difficulty") != row["suggested_difficulty"]:
+            q_dicts[row["index"]]["difficulty"] = row["suggested_difficulty"]
+            changed += 1
+    if changed:
+        storage.apply_ops([{"op": "put", "test": test_name, "questions": q_dicts}])
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Аналіз питань тесту за бланками відповідей")
+    parser.add_argument("test", help="Назва тесту з tests.json")
+    parser.add_argument("sheets", help="Файл бланків у форматі JSON Lines")
+    parser.add_argument("--out", help="Звіт у форматі .json або .csv")
+    parser.add_argument("--apply", action="store_true", help="Записати рекомендовану складність у банк тестів")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--tests-file", default=TESTS_FILE)
+    args = parser.parse_args()
+
+    result = analyze_file(args.test, args.sheets, args.workers, args.chunk_size, args.tests_file)
+    if args.out:
+        write_report(result, args.out)
+    print(f"Студентів: {result['students']}, середній бал: {result.get('mean_score', 0.0):.2f}, "
+          f"α Кронбаха: {result.get('alpha')}")
+    if args.apply:
+        print(f"Змінено складність питань: {apply_difficulty(args.test, result, args.tests_file)}")
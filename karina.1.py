@@ -2,6 +2,9 @@ import time
 import random
 import json
 
+from selection_module import SelectionIndex
+from results_module import AttemptStore, question_key
+
 class Question:
     def __init__(self, text, options=None, correct=None, difficulty=1, topic="general"):
         self.text = text
@@ -26,9 +29,12 @@ class Question:
 
 
 class TestSystem:
-    def __init__(self):
+    TEST_NAME = "Тестування"
+
+    def __init__(self, store=None):
         self.questions = []
-        self.results = []
+        # Спроби зберігаються у файлі, агрегати статистики оновлюються при кожному записі
+        self.store = store or AttemptStore()
 
     def add_question(self, question):
         self.questions.append(question)
@@ -57,46 +63,61 @@ class TestSystem:
         score = 0
         total_time = 0
         asked = []
+        answers = []
         difficulty = 1
+        sampler = SelectionIndex(self.questions).sampler()
 
         for _ in range(5):
-            available = [q for q in self.questions if q.difficulty == difficulty and q not in asked]
-
-            if not available:
-                available = [q for q in self.questions if q not in asked]
-
-            question = random.choice(available)
+            question = sampler.draw(difficulty) or sampler.draw()
+            if question is None:
+                break
             asked.append(question)
 
             answer, duration = question.ask()
             total_time += duration
 
-            if answer.lower() == str(question.correct).lower():
+            correct = answer.lower() == str(question.correct).lower()
+            if correct:
                 print("Правильно!\n")
                 score += 1
                 difficulty = min(3, difficulty + 1)
             else:
                 print(f"Неправильно! Правильна відповідь: {question.correct}\n")
                 difficulty = max(1, difficulty - 1)
+            answers.append({"question": question_key(question), "topic": question.topic,
+                            "score": 1.0 if correct else 0.0, "time": duration})
 
             input("Натисніть Enter для наступного питання...")
 
+        if not asked:
+            print("Не знайшлося жодного питання для тесту!")
+            return
+
         avg_time = total_time / len(asked)
-        self.results.append({"score": score, "time": total_time})
+        self.store.record(self.TEST_NAME, answers, seconds=total_time)
         self.finish_screen(score, len(asked), avg_time)
 
     def show_statistics(self):
-        if not self.results:
+        stats = self.store.test_stats(self.TEST_NAME)
+        if stats is None:
             print("Статистика пуста.")
             return
 
-        avg_score = sum(r["score"] for r in self.results) / len(self.results)
-        avg_time = sum(r["time"] for r in self.results) / len(self.results)
-
         print("\nСтатистика:")
-        print(f"Тестів пройдено: {len(self.results)}")
-        print(f"Середній бал: {avg_score:.2f}")
-        print(f"Середній час: {avg_time:.2f} сек")
+        print(f"Тестів пройдено: {stats.count}")
+        print(f"Середній бал: {stats.mean:.2f} (σ = {stats.stddev:.2f})")
+        median, p90 = stats.time_percentile(50), stats.time_percentile(90)
+        if median is None:
+            # У спробах не записано час - перцентилів немає
+            print(f"Середній час: {stats.mean_time:.2f} сек")
+        else:
+            print(f"Середній час: {stats.mean_time:.2f} сек, медіана {median:.2f} сек, 90% - до {p90:.2f} сек")
+
+        topics = {q.topic for q in self.questions}
+        for topic in sorted(topics):
+            topic_stats = self.store.topic_stats(topic)
+            if topic_stats is not None:
+                print(f"  {topic}: відповідей {topic_stats.count}, правильних {topic_stats.mean:.0%}")
 
     def save_questions(self, filename="questions.json"):
         data = [{
@@ -152,6 +173,7 @@ class TestSystem:
             elif choice == "4":
                 self.save_questions()
             elif choice == "5":
+                self.store.close()
                 print("Вихід...")
                 break
             else:
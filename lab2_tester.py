@@ -1,6 +1,8 @@
 from typing import List, Optional
 import random
 
+from search_module import SearchIndex
+
 
 class Question:
     def __init__(self, text: str, correct_answer: str, topic: str = "", difficulty: int = 1):
@@ -18,9 +20,11 @@ class Test:
         self.name = name
         self.description = description
         self.questions: List[Question] = []
+        self.index = SearchIndex()
 
     def add_question(self, question: Question) -> None:
         self.questions.append(question)
+        self.index.add(question)
 
     def create_and_add_question(self, text: str, correct_answer: str, topic: str = "", difficulty: int = 1) -> Question:
         q = Question(text=text, correct_answer=correct_answer, topic=topic, difficulty=difficulty)
@@ -38,6 +42,7 @@ class Test:
     def edit_question_text(self, index: int, new_text: str) -> None:
         if 0 <= index < len(self.questions):
             self.questions[index].text = new_text
+            self.index.update(self.questions[index])
         else:
             print("Неправильний номер питання для редагування.")
 
@@ -49,13 +54,14 @@ class Test:
 
     def delete_question(self, index: int) -> None:
         if 0 <= index < len(self.questions):
-            self.questions.pop(index)
+            removed = self.questions.pop(index)
+            if removed not in self.questions:
+                self.index.remove(removed)
         else:
             print("Неправильний номер питання для видалення.")
 
     def find_questions(self, keyword: str) -> List[Question]:
-        found = [q for q in self.questions if keyword.lower() in q.text.lower()]
-        return found
+        return self.index.search(keyword)
 
     def sort_questions_by_text(self) -> None:
         self.questions.sort(key=lambda q: q.text.lower())
@@ -110,7 +116,7 @@ class TestEditor:
     def global_search_questions(self, keyword: str) -> None:
         found_any = False
         for test in self.tests:
-            found = [q for q in test.questions if keyword.lower() in q.text.lower()]
+            found = test.find_questions(keyword)
             if found:
                 found_any = True
                 print(f"\nУ тесті '{test.name}' знайдено:")
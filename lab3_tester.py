@@ -1,5 +1,6 @@
 from typing import List
 from questions import Question, TextQuestion, ChoiceQuestion, RatingQuestion, MatchingQuestion, MultipleChoiceQuestion
+from search_module import SearchIndex
 
 
 class Test:
@@ -7,9 +8,11 @@ class Test:
         self.name = name
         self.description = description
         self.questions: List[Question] = []
+        self.index = SearchIndex()
 
     def add_question(self, question: Question):
         self.questions.append(question)
+        self.index.add(question)
 
     def show_all_questions(self):
         print(f"\nПитання тесту '{self.name}':")
@@ -21,14 +24,17 @@ class Test:
 
     def remove_question(self, index: int):
         if 0 <= index < len(self.questions):
-            self.questions.pop(index)
+            removed = self.questions.pop(index)
+            if removed not in self.questions:
+                self.index.remove(removed)
         else:
             print("Невірний індекс питання.")
 
+    def reindex_question(self, index: int):
+        self.index.update(self.questions[index])
+
     def find_questions(self, keyword: str):
-        keyword = keyword.lower()
-        found = [q for q in self.questions if keyword in q.text.lower()]
-        return found
+        return self.index.search(keyword)
 
 
 class BasicTest(Test):
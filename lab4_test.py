@@ -1,6 +1,8 @@
 import time
 import random
 
+from selection_module import SelectionIndex
+
 
 # -------------------------- QUESTION FROM L2 --------------------------
 class Question:
@@ -55,11 +57,9 @@ class AdaptiveSession(BaseSession):
     def start(self):
         score = 0
         difficulty = 1
+        index = SelectionIndex(self.questions)
         for _ in range(5):
-            available = [q for q in self.questions if q.difficulty == difficulty]
-            if not available:
-                available = self.questions
-            q = random.choice(available)
+            q = index.choice(difficulty) or index.choice()
 
             if self.ask_question(q):
                 score += 1
@@ -79,12 +79,14 @@ class TestEditor:
     def edit_question_text(self, test: Test, index: int, new_text: str) -> None:
         if 0 <= index < len(test.questions):
             test.questions[index].text = new_text
+            test.reindex_question(index)
         else:
             print("Невірний індекс питання")
 
     def edit_question_topic(self, test: Test, index: int, new_topic: str) -> None:
         if 0 <= index < len(test.questions):
             test.questions[index].topic = new_topic
+            test.reindex_question(index)
         else:
             print("Невірний індекс питання")
 
@@ -98,7 +100,8 @@ class TestEditor:
         return test.find_questions(keyword)
 
     def global_search(self, keyword: str) -> List[Question]:
-        result = []
+        scored = []
         for t in self.tests:
-            result.extend(t.find_questions(keyword))
-        return result
+            scored.extend(t.index.search_scored(keyword))
+        scored.sort(key=lambda item: -item[0])
+        return [q for _, q in scored]
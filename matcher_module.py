@@ -0,0 +1,86 @@
+from typing import List, Dict, Iterable, FrozenSet
+
+
+class KeywordMatcher:
+    """
+    Шукає одразу всі ключові слова у тексті за один прохід (автомат Ахо-Корасік).
+    matches() повертає, скільки ключових слів зі списку (з урахуванням повторів) є підрядками тексту.
+    """
+
+    # Для кількох слів вбудований пошук підрядка швидший за прохід автомата на Python
+    AUTOMATON_MIN_KEYWORDS = 8
+
+    __slots__ = ("_weights", "_always", "_total", "_keywords", "_goto", "_out")
+
+    def __init__(self, keywords: Iterable[str]):
+        weights: Dict[str, int] = {}
+        for keyword in keywords:
+            weights[keyword] = weights.get(keyword, 0) + 1
+        # Порожній рядок - підрядок будь-якого тексту
+        self._always = weights.pop("", 0)
+        self._keywords = list(weights)
+        self._weights = [weights[k] for k in self._keywords]
+        self._total = len(self._keywords)
+        self._goto: List[Dict[str, int]] = []
+        self._out: List[FrozenSet[int]] = []
+        if self._total >= self.AUTOMATON_MIN_KEYWORDS:
+            self._build()
+
+    def _build(self):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[set] = [set()]
+        for idx, keyword in enumerate(self._keywords):
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(set())
+                state = nxt
+            out[state].add(idx)
+
+        # Обхід у ширину: функція невдач і злиття виходів з усього ланцюжка невдач
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+
+        # Повна таблиця переходів, щоб під час сканування не ходити по ланцюжку невдач
+        for state in queue:
+            for ch, nxt in goto[fail[state]].items():
+                goto[state].setdefault(ch, nxt)
+
+        self._goto = goto
+        self._out = [frozenset(o) for o in out]
+
+    def matches(self, text: str) -> int:
+        count = self._always
+        if not self._total:
+            return count
+        if not self._goto:
+            weights = self._weights
+            for i, keyword in enumerate(self._keywords):
+                if keyword in text:
+                    count += weights[i]
+            return count
+
+        goto = self._goto
+        out = self._out
+        found = set()
+        state = 0
+        for ch in text:
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+                if len(found) == self._total:
+                    break
+        weights = self._weights
+        return count + sum(weights[i] for i in found)
@@ -0,0 +1,254 @@
+import argparse
+import bisect
+import functools
+import inspect
+import json
+import re
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Tuple
+
+# Межі кошиків затримки в секундах (як у клієнтів Prometheus, але з мікросекунд - check() дуже швидкий)
+LATENCY_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self) -> "Histogram":
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.count = self.count
+        other.sum = self.sum
+        return other
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            result.append((repr(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class Registry:
+    """Гістограми затримок за назвою метрики і мітками."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str = "", **labels: str) -> Histogram:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._metrics.setdefault(name, {})
+            if help_text:
+                self._help[name] = help_text
+            if key not in series:
+                series[key] = Histogram()
+            return series[key]
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def _copy(self) -> Tuple[Dict[str, List[Tuple[Labels, Histogram]]], Dict[str, str]]:
+        # Копія під замком: histogram() з іншого потоку може саме додавати нову серію чи метрику
+        with self._lock:
+            metrics = {name: [(labels, h.copy()) for labels, h in series.items()]
+                       for name, series in self._metrics.items()}
+            return metrics, dict(self._help)
+
+    def snapshot(self) -> Dict[str, Any]:
+        metrics = {}
+        for name, series in self._copy()[0].items():
+            metrics[name] = [{"labels": dict(labels), "count": h.count, "sum": h.sum,
+                              "buckets": dict(h.cumulative())} for labels, h in series]
+        return {"time": time.time(), "metrics": metrics}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=4)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        metrics, help_texts = self._copy()
+        for name, series in metrics.items():
+            if name in help_texts:
+                lines.append(f"# HELP {name} {help_texts[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in series:
+                base = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                for bound, n in h.cumulative():
+                    le = f'le="{bound}"'
+                    lines.append(f"{name}_bucket{{{base + ',' + le if base else le}}} {n}")
+                suffix = f"{{{base}}}" if base else ""
+                lines.append(f"{name}_sum{suffix} {h.sum!r}")
+                lines.append(f"{name}_count{suffix} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = Registry()
+
+# Підмінені методи: (клас, назва атрибута, що лежало у __dict__ класу до підміни)
+_ABSENT = object()
+_patches: List[Tuple[type, str, Any]] = []
+
+
+def _instrument(owner: type, name: str, metric: str, help_text: str = "", **labels: str):
+    original = owner.__dict__.get(name, _ABSENT)
+    attr = inspect.getattr_static(owner, name)
+    wrap = type(attr) if isinstance(attr, (classmethod, staticmethod)) else None
+    func = attr.__func__ if wrap else attr
+    histogram = REGISTRY.histogram(metric, help_text, **labels)
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+
+    setattr(owner, name, wrap(timed) if wrap else timed)
+    _patches.append((owner, name, original))
+
+
+def _subclasses(cls: type) -> List[type]:
+    result = []
+    for sub in cls.__subclasses__():
+        result.append(sub)
+        result.extend(_subclasses(sub))
+    return result
+
+
+def is_enabled() -> bool:
+    return bool(_patches)
+
+
+def enable():
+    """
+    Вмикає вимірювання: обгортає гарячі методи таймерами. Поки вимкнено, код працює з оригінальними
+    методами без жодних перевірок, тож накладних витрат немає зовсім.
+    Інструментуються лише вже імпортовані модулі (редактор, сервер, двійковий банк), тож викликати після імпортів.
+    """
+    if _patches:
+        return
+    from questions_module import Question, QUESTION_TYPES
+    import storage_module
+
+    for q_type, cls in QUESTION_TYPES.items():
+        _instrument(cls, "check", "question_check_seconds", "Перевірка однієї відповіді", q_type=q_type)
+        _instrument(cls, "check_batch", "question_check_batch_seconds", "Перевірка колонки відповідей",
+                    q_type=q_type)
+        _instrument(cls, "to_dict", "question_to_dict_seconds", "Серіалізація питання", q_type=q_type)
+    _instrument(Question, "from_dict", "question_decode_seconds", "Відновлення питань", method="from_dict")
+    _instrument(Question, "from_dicts", "question_decode_seconds", "Відновлення питань", method="from_dicts")
+
+    # Усі бекенди, що успадковують JsonStorage (журнал, каталог тестів, .qbank, якщо його вже імпортовано)
+    for backend in _subclasses(storage_module.JsonStorage):
+        for method in ("load", "apply_ops", "load_test"):
+            _instrument(backend, method, "storage_seconds", "Операції сховища",
+                        backend=backend.__name__, method=method)
+
+    editor = sys.modules.get("editor_module")
+    if editor is not None:
+        for method in ("read_tests", "save_ops"):
+            _instrument(editor.DataManager, method, "data_manager_seconds", "Завантаження і збереження редактора",
+                        method=method)
+
+    server = sys.modules.get("server_module")
+    if server is not None:
+        for method in ("start", "answer"):
+            _instrument(server.ExamServer, method, "session_step_seconds", "Кроки сесії тестування", step=method)
+
+
+def disable():
+    while _patches:
+        owner, name, original = _patches.pop()
+        if original is _ABSENT:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, original)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = REGISTRY.to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = REGISTRY.to_json(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type + "; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+    # HTTP-ендпоінт /metrics (текст Prometheus) і /metrics.json у фоновому потоці
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    samples = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples.append((name, dict(_LABEL.findall(labels or "")), float(value)))
+    return samples
+
+
+def scrape(url: str) -> List[Tuple[str, Dict[str, str], float]]:
+    """Замінник збирача метрик: читає /metrics і повертає (назва, мітки, значення)."""
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return parse_prometheus(response.read().decode("utf-8"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Зчитування метрик з ендпоінта /metrics")
+    parser.add_argument("url", nargs="?", default="http://127.0.0.1:9108/metrics")
+    args = parser.parse_args()
+
+    for name, labels, value in scrape(args.url):
+        if name.endswith("_count") and value:
+            label_text = ", ".join(f"{k}={v}" for k, v in labels.items())
+            print(f"{name[:-len('_count')]:32} {label_text:40} {int(value)}")
@@ -0,0 +1,98 @@
+import argparse
+import json
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from questions_module import Question
+from grading_module import (GradingCache, GradingReport, decode_sheet, grade_rows, student_result, load_test_dicts,
+                            parse_sheet)
+from storage_module import TESTS_FILE
+
+# Кожна стадія - генератор, який бере наступний елемент з попередньої лише тоді,
+# коли його попросить наступна. Тому в пам'яті одночасно живе не більше одного пакета.
+
+
+def read_jsonl(path: str, report: Optional[GradingReport] = None) -> Iterator[Dict[str, Any]]:
+    # Рядки, які не є бланком, пропускаються і рахуються у звіті, а не зупиняють увесь запуск
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                sheet = parse_sheet(line)
+                if sheet is not None:
+                    yield sheet
+                elif report is not None:
+                    report.skipped_lines += 1
+
+
+def decode_stage(sheets: Iterable[Dict[str, Any]],
+                 questions: List[Question]) -> Iterator[Tuple[Dict[str, Any], List[Any]]]:
+    for sheet in sheets:
+        yield sheet, decode_sheet(questions, sheet)
+
+
+def grade_stage(decoded: Iterable[Tuple[Dict[str, Any], List[Any]]], questions: List[Question],
+                batch_size: int = 1000, cache: Optional[GradingCache] = None) -> Iterator[Dict[str, Any]]:
+    decoded = iter(decoded)
+    while True:
+        batch = list(islice(decoded, batch_size))
+        if not batch:
+            return
+        scores = grade_rows(questions, [row for _, row in batch], cache)
+        for (sheet, answers), row in zip(batch, scores):
+            yield student_result(sheet, row, answers)
+
+
+def aggregate_stage(results: Iterable[Dict[str, Any]], report: GradingReport) -> Iterator[Dict[str, Any]]:
+    for result in results:
+        report.add(result["scores"])
+        yield result
+
+
+def write_jsonl(results: Iterable[Dict[str, Any]], path: str, flush_every: int = 1000) -> int:
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        buffer = []
+        for result in results:
+            buffer.append(json.dumps(result, ensure_ascii=False) + "\n")
+            if len(buffer) >= flush_every:
+                f.writelines(buffer)
+                written += len(buffer)
+                buffer = []
+        f.writelines(buffer)
+        written += len(buffer)
+    return written
+
+
+def run_pipeline(test_name: str, sheets_path: str, results_path: str, batch_size: int = 1000,
+                 tests_file: str = TESTS_FILE) -> GradingReport:
+    questions = Question.from_dicts(load_test_dicts(test_name, tests_file))
+    report = GradingReport(len(questions))
+    cache = GradingCache()
+
+    sheets = read_jsonl(sheets_path, report)
+    decoded = decode_stage(sheets, questions)
+    graded = grade_stage(decoded, questions, batch_size, cache)
+    aggregated = aggregate_stage(graded, report)
+    write_jsonl(aggregated, results_path)
+    report.add_cache_stats(cache.hits, cache.misses)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Потокове оцінювання бланків відповідей з постійним споживанням пам'яті")
+    parser.add_argument("test", help="Назва тесту з tests.json")
+    parser.add_argument("sheets", help="Файл бланків у форматі JSON Lines")
+    parser.add_argument("out", help="Куди записати результати по кожному студенту")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--tests-file", default=TESTS_FILE)
+    parser.add_argument("--metrics", help="Увімкнути вимірювання і записати знімок метрик у цей файл (JSON)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        import metrics_module
+        metrics_module.enable()
+    summary = run_pipeline(args.test, args.sheets, args.out, args.batch_size, args.tests_file)
+    print(json.dumps(summary.to_dict(), ensure_ascii=False, indent=4))
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics_module.REGISTRY.to_json())
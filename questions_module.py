@@ -1,15 +1,54 @@
-from typing import List, Dict, Any, Union
+import itertools
+import sys
+from typing import List, Dict, Any, Union, Callable, Iterable, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from matcher_module import KeywordMatcher
+from fuzzy_module import FuzzyMatcher
+
+# q_type -> клас питання; підкласи потрапляють сюди автоматично при оголошенні
+QUESTION_TYPES: Dict[str, type] = {}
+_DECODERS: Dict[str, Callable[[Dict[str, Any]], 'Question']] = {}
+# Стабільні ідентифікатори питань у межах процесу (рядки редактора, ключі кешів)
+_next_uid = itertools.count(1).__next__
+# Версії питань: лічильник спільний для всіх питань, тож пара (uid, version) ніколи не повторюється
+_next_version = itertools.count(1).__next__
+
 
 class Question:
+    # __slots__ замість __dict__: у великому банку питань саме словники екземплярів займають більшість пам'яті
+    __slots__ = ("uid", "version", "text", "difficulty", "topic")
+    q_type = "Base"
+
     def __init__(self, text: str, difficulty: int = 1, topic: str = "Загальне"):
+        self.uid = _next_uid()
         self.text = text
         self.difficulty = difficulty
-        self.topic = topic
-        self.q_type = "Base"
+        self.topic = sys.intern(topic)
+        # Версія змінюється сеттерами всього, від чого залежить check(), тож оцінки старої версії
+        # у GradingCache більше не знаходяться (текст і тема на оцінку не впливають)
+        self.version = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Реєструються лише класи, що оголошують власний q_type: допоміжний підклас, який його
+        # лише успадковує, не повинен перехоплювати розбір батьківського типу
+        if "q_type" in cls.__dict__:
+            QUESTION_TYPES[cls.q_type] = cls
+            _DECODERS[cls.q_type] = cls.from_data
 
     def check(self, answer: Any) -> float:
         return 0.0
 
+    def check_batch(self, answers: Sequence[Any]) -> List[float]:
+        # Оцінює цілу колонку відповідей; підкласи перевизначають це з попередньо обчисленою правильною відповіддю
+        check = self.check
+        return [check(answer) for answer in answers]
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "q_type": self.q_type,
@@ -18,56 +57,70 @@ class Question:
             "topic": self.topic
         }
 
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'Question':
+        return Question(data["text"], data.get("difficulty", 1), data.get("topic", "Загальне"))
+
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> 'Question':
-        q_type = data.get("q_type")
-        if q_type == "SingleChoice":
-            return SingleChoiceQuestion(data["text"], data["options"], data["correct"], data["difficulty"],
-                                        data["topic"])
-        elif q_type == "MultiChoice":
-            return MultiChoiceQuestion(data["text"], data["options"], data["correct_list"], data["difficulty"],
-                                       data["topic"])
-        elif q_type == "Text":
-            return TextQuestion(data["text"], data["keywords"], data["difficulty"], data["topic"])
-        elif q_type == "Scale":
-            return ScaleQuestion(data["text"], data["correct_val"], data["tolerance"], data["difficulty"],
-                                 data["topic"])
-        elif q_type == "TrueFalse":
-            return TrueFalseQuestion(data["text"], data["correct_bool"], data["difficulty"], data["topic"])
-        elif q_type == "Matching":
-            return MatchingQuestion(data["text"], data["pairs"], data["difficulty"], data["topic"])
-        elif q_type == "Ordering":
-            return OrderingQuestion(data["text"], data["correct_order"], data["difficulty"], data["topic"])
-        elif q_type == "FillBlank":
-            return FillBlankQuestion(data["text"], data["acceptable_answers"], data["difficulty"], data["topic"])
-        else:
-            return Question(data["text"], data.get("difficulty", 1), data.get("topic", "Загальне"))
+        decoder = _DECODERS.get(data.get("q_type"), Question.from_data)
+        return decoder(data)
+
+    @staticmethod
+    def from_dicts(data_list: Iterable[Dict[str, Any]]) -> List['Question']:
+        # Пакетне відновлення: пошук декодера - один dict.get на елемент без зайвих викликів
+        get_decoder = _DECODERS.get
+        fallback = Question.from_data
+        return [get_decoder(data.get("q_type"), fallback)(data) for data in data_list]
 
 
 class SingleChoiceQuestion(Question):
+    __slots__ = ("options", "_correct", "_correct_norm")
+    q_type = "SingleChoice"
+
     def __init__(self, text: str, options: List[str], correct: str, difficulty: int = 1, topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "SingleChoice"
-        self.options = options
+        self.options = tuple(options)
         self.correct = correct
 
+    @property
+    def correct(self) -> str:
+        return self._correct
+
+    @correct.setter
+    def correct(self, value: str):
+        # Нормалізована правильна відповідь рахується один раз при зміні, а не при кожній перевірці
+        self._correct = value
+        self._correct_norm = value.lower().strip()
+        self.version = _next_version()
+
     def check(self, answer: str) -> float:
         if not answer: return 0.0
-        return 1.0 if answer.lower().strip() == self.correct.lower().strip() else 0.0
+        return 1.0 if answer.lower().strip() == self._correct_norm else 0.0
+
+    def check_batch(self, answers: Sequence[str]) -> List[float]:
+        correct = self._correct_norm
+        return [1.0 if answer and answer.lower().strip() == correct else 0.0 for answer in answers]
 
     def to_dict(self):
         data = super().to_dict()
-        data.update({"options": self.options, "correct": self.correct})
+        data.update({"options": list(self.options), "correct": self.correct})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["options"], data["correct"], data["difficulty"], data["topic"])
+
 
 class MultiChoiceQuestion(Question):
+    __slots__ = ("options", "correct_list")
+    q_type = "MultiChoice"
+
     def __init__(self, text: str, options: List[str], correct_list: List[str], difficulty: int = 2,
                  topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "MultiChoice"
-        self.options = options
-        self.correct_list = correct_list
+        self.options = tuple(options)
+        self.correct_list = tuple(correct_list)
 
     def check(self, answer_list: List[str]) -> float:
         if not answer_list: return 0.0
@@ -77,71 +130,197 @@ class MultiChoiceQuestion(Question):
         score = (correct_hits / len(self.correct_list)) - (wrong_hits * 0.5)
         return max(0.0, min(1.0, score))
 
+    def check_batch(self, answer_lists: Sequence[List[str]]) -> List[float]:
+        if np is None or not self.correct_list:
+            return super().check_batch(answer_lists)
+        correct_set = frozenset(self.correct_list)
+        flat = [a for answer_list in answer_lists if answer_list for a in answer_list]
+        owners = np.repeat(np.arange(len(answer_lists)),
+                           [len(answer_list) if answer_list else 0 for answer_list in answer_lists])
+        is_hit = np.fromiter((a in correct_set for a in flat), dtype=bool, count=len(flat))
+
+        correct_hits = np.bincount(owners[is_hit], minlength=len(answer_lists))
+        wrong_hits = np.bincount(owners[~is_hit], minlength=len(answer_lists))
+        scores = np.clip(correct_hits / len(self.correct_list) - wrong_hits * 0.5, 0.0, 1.0)
+        scores[correct_hits + wrong_hits == 0] = 0.0
+        return scores.tolist()
+
     def to_dict(self):
         data = super().to_dict()
-        data.update({"options": self.options, "correct_list": self.correct_list})
+        data.update({"options": list(self.options), "correct_list": list(self.correct_list)})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["options"], data["correct_list"], data["difficulty"], data["topic"])
+
 
 class TextQuestion(Question):
-    def __init__(self, text: str, keywords: List[str], difficulty: int = 2, topic: str = "Загальне"):
+    __slots__ = ("_keywords", "_matcher", "_fuzzy")
+    q_type = "Text"
+
+    def __init__(self, text: str, keywords: List[str], difficulty: int = 2, topic: str = "Загальне",
+                 fuzzy: Optional[Dict[str, Any]] = None):
         super().__init__(text, difficulty, topic)
-        self.q_type = "Text"
-        self.keywords = [k.lower().strip() for k in keywords]
+        self._fuzzy = None
+        self._keywords = tuple(k.lower().strip() for k in keywords)
+        self.fuzzy = fuzzy
+
+    @property
+    def keywords(self) -> tuple:
+        return self._keywords
+
+    @keywords.setter
+    def keywords(self, value: List[str]):
+        self._keywords = tuple(k.lower().strip() for k in value)
+        self.fuzzy = self._fuzzy
+
+    @property
+    def fuzzy(self) -> Optional[Dict[str, Any]]:
+        # Налаштування нечіткого порівняння (max_distance, transpositions, stemming) або None - точний пошук
+        return self._fuzzy
+
+    @fuzzy.setter
+    def fuzzy(self, value: Optional[Dict[str, Any]]):
+        # Обидва матчери мають однаковий matches(), тож check і check_batch про режим не знають
+        if value is None:
+            self._fuzzy = None
+            self._matcher = KeywordMatcher(self._keywords)
+        else:
+            self._matcher = FuzzyMatcher(self._keywords, **value)
+            self._fuzzy = self._matcher.config()
+        self.version = _next_version()
 
     def check(self, answer: str) -> float:
         if not answer: return 0.0
-        ans_lower = answer.lower()
-        matches = sum(1 for k in self.keywords if k in ans_lower)
-        return matches / len(self.keywords) if self.keywords else 0.0
+        if not self._keywords: return 0.0
+        return self._matcher.matches(answer.lower()) / len(self._keywords)
+
+    def check_batch(self, answers: Sequence[str]) -> List[float]:
+        if not self._keywords:
+            return [0.0] * len(answers)
+        total = len(self._keywords)
+        matches = self._matcher.matches
+        return [matches(answer.lower()) / total if answer else 0.0 for answer in answers]
 
     def to_dict(self):
         data = super().to_dict()
-        data.update({"keywords": self.keywords})
+        data.update({"keywords": list(self.keywords)})
+        if self._fuzzy is not None:
+            data["fuzzy"] = dict(self._fuzzy)
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["keywords"], data["difficulty"], data["topic"], data.get("fuzzy"))
+
 
 class ScaleQuestion(Question):
+    __slots__ = ("_correct_val", "_tolerance")
+    q_type = "Scale"
+
     def __init__(self, text: str, correct_val: int, tolerance: int = 1, difficulty: int = 1, topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "Scale"
         self.correct_val = correct_val
         self.tolerance = tolerance
 
+    @property
+    def correct_val(self) -> int:
+        return self._correct_val
+
+    @correct_val.setter
+    def correct_val(self, value: int):
+        self._correct_val = value
+        self.version = _next_version()
+
+    @property
+    def tolerance(self) -> int:
+        return self._tolerance
+
+    @tolerance.setter
+    def tolerance(self, value: int):
+        self._tolerance = value
+        self.version = _next_version()
+
     def check(self, answer: Union[int, str]) -> float:
         try:
             val = int(answer)
-            diff = abs(val - self.correct_val)
+            diff = abs(val - self._correct_val)
             if diff == 0: return 1.0
-            if diff <= self.tolerance: return 0.5
+            if diff <= self._tolerance: return 0.5
             return 0.0
         except ValueError:
             return 0.0
 
+    def check_batch(self, answers: Sequence[Union[int, str]]) -> List[float]:
+        if np is None:
+            return super().check_batch(answers)
+        values = []
+        valid = []
+        for answer in answers:
+            try:
+                values.append(int(answer))
+                valid.append(True)
+            except ValueError:
+                values.append(0)
+                valid.append(False)
+        try:
+            diff = np.abs(np.array(values, dtype=np.int64) - self._correct_val)
+        except OverflowError:
+            return super().check_batch(answers)
+        scores = np.where(diff == 0, 1.0, np.where(diff <= self._tolerance, 0.5, 0.0))
+        scores[~np.array(valid, dtype=bool)] = 0.0
+        return scores.tolist()
+
     def to_dict(self):
         data = super().to_dict()
         data.update({"correct_val": self.correct_val, "tolerance": self.tolerance})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["correct_val"], data["tolerance"], data["difficulty"], data["topic"])
+
 class TrueFalseQuestion(Question):
+    __slots__ = ("_correct_bool",)
+    q_type = "TrueFalse"
+
     def __init__(self, text: str, correct_bool: bool, difficulty: int = 1, topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "TrueFalse"
         self.correct_bool = correct_bool
 
+    @property
+    def correct_bool(self) -> bool:
+        return self._correct_bool
+
+    @correct_bool.setter
+    def correct_bool(self, value: bool):
+        self._correct_bool = value
+        self.version = _next_version()
+
     def check(self, answer: bool) -> float:
-        return 1.0 if answer == self.correct_bool else 0.0
+        return 1.0 if answer == self._correct_bool else 0.0
+
+    def check_batch(self, answers: Sequence[bool]) -> List[float]:
+        correct = self._correct_bool
+        return [1.0 if answer == correct else 0.0 for answer in answers]
 
     def to_dict(self):
         data = super().to_dict()
         data.update({"correct_bool": self.correct_bool})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["correct_bool"], data["difficulty"], data["topic"])
+
 
 class MatchingQuestion(Question):
+    __slots__ = ("pairs",)
+    q_type = "Matching"
+
     def __init__(self, text: str, pairs: Dict[str, str], difficulty: int = 3, topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "Matching"
         self.pairs = pairs
 
     def check(self, answer_pairs: Dict[str, str]) -> float:
@@ -157,39 +336,110 @@ class MatchingQuestion(Question):
         data.update({"pairs": self.pairs})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["pairs"], data["difficulty"], data["topic"])
+
 
 class OrderingQuestion(Question):
+    __slots__ = ("correct_order",)
+    q_type = "Ordering"
+
     def __init__(self, text: str, correct_order: List[str], difficulty: int = 3, topic: str = "Загальне"):
         super().__init__(text, difficulty, topic)
-        self.q_type = "Ordering"
-        self.correct_order = correct_order
+        self.correct_order = tuple(correct_order)
 
     def check(self, answer_order: List[str]) -> float:
         if not answer_order or len(answer_order) != len(self.correct_order): return 0.0
         correct_positions = sum(1 for i, item in enumerate(answer_order) if item == self.correct_order[i])
         return correct_positions / len(self.correct_order)
 
+    def check_batch(self, answer_orders: Sequence[List[str]]) -> List[float]:
+        size = len(self.correct_order)
+        if np is None or size == 0:
+            return super().check_batch(answer_orders)
+        # Елементи кодуються цілими числами, далі - поелементне порівняння позицій для всіх відповідей одразу
+        codes = {item: code for code, item in enumerate(self.correct_order)}
+        expected = np.array([codes[item] for item in self.correct_order], dtype=np.int64)
+        rows = [i for i, order in enumerate(answer_orders) if order and len(order) == size]
+        scores = np.zeros(len(answer_orders))
+        if rows:
+            matrix = np.array([[codes.get(item, -1) for item in answer_orders[i]] for i in rows], dtype=np.int64)
+            scores[rows] = (matrix == expected).sum(axis=1) / size
+        return scores.tolist()
+
     def to_dict(self):
         data = super().to_dict()
-        data.update({"correct_order": self.correct_order})
+        data.update({"correct_order": list(self.correct_order)})
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["correct_order"], data["difficulty"], data["topic"])
+
 
 class FillBlankQuestion(Question):
-    def __init__(self, text: str, acceptable_answers: List[str], difficulty: int = 2, topic: str = "Загальне"):
+    __slots__ = ("_acceptable_answers", "_acceptable_set", "_fuzzy", "_fuzzy_matcher")
+    q_type = "FillBlank"
+
+    def __init__(self, text: str, acceptable_answers: List[str], difficulty: int = 2, topic: str = "Загальне",
+                 fuzzy: Optional[Dict[str, Any]] = None):
         super().__init__(text, difficulty, topic)
-        self.q_type = "FillBlank"
-        self.acceptable_answers = [ans.lower().strip() for ans in acceptable_answers]
+        self._fuzzy = None
+        self._acceptable_answers = tuple(ans.lower().strip() for ans in acceptable_answers)
+        self._acceptable_set = frozenset(self._acceptable_answers)
+        self.fuzzy = fuzzy
+
+    @property
+    def acceptable_answers(self) -> tuple:
+        return self._acceptable_answers
+
+    @acceptable_answers.setter
+    def acceptable_answers(self, value: List[str]):
+        self._acceptable_answers = tuple(ans.lower().strip() for ans in value)
+        self._acceptable_set = frozenset(self._acceptable_answers)
+        self.fuzzy = self._fuzzy
+
+    @property
+    def fuzzy(self) -> Optional[Dict[str, Any]]:
+        return self._fuzzy
+
+    @fuzzy.setter
+    def fuzzy(self, value: Optional[Dict[str, Any]]):
+        if value is None:
+            self._fuzzy = None
+            self._fuzzy_matcher = None
+        else:
+            self._fuzzy_matcher = FuzzyMatcher(self._acceptable_answers, **value)
+            self._fuzzy = self._fuzzy_matcher.config()
+        self.version = _next_version()
 
     def check(self, answer: str) -> float:
         if not answer: return 0.0
-        return 1.0 if answer.lower().strip() in self.acceptable_answers else 0.0
+        if answer.lower().strip() in self._acceptable_set: return 1.0
+        if self._fuzzy_matcher is not None and self._fuzzy_matcher.full_match(answer): return 1.0
+        return 0.0
+
+    def check_batch(self, answers: Sequence[str]) -> List[float]:
+        acceptable = self._acceptable_set
+        if self._fuzzy_matcher is None:
+            return [1.0 if answer and answer.lower().strip() in acceptable else 0.0 for answer in answers]
+        # Точний збіг перевіряється першим, нечіткий - лише для решти відповідей
+        full_match = self._fuzzy_matcher.full_match
+        return [1.0 if answer and (answer.lower().strip() in acceptable or full_match(answer)) else 0.0
+                for answer in answers]
 
     def to_dict(self):
         data = super().to_dict()
-        data.update({"acceptable_answers": self.acceptable_answers})
+        data.update({"acceptable_answers": list(self.acceptable_answers)})
+        if self._fuzzy is not None:
+            data["fuzzy"] = dict(self._fuzzy)
         return data
 
+    @classmethod
+    def from_data(cls, data):
+        return cls(data["text"], data["acceptable_answers"], data["difficulty"], data["topic"], data.get("fuzzy"))
+
 
 if __name__ == "__main__":
     print("Тестування системи оцінювання питань")
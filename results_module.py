@@ -0,0 +1,275 @@
+import json
+import math
+import os
+import time
+from typing import List, Dict, Any, Optional
+
+ATTEMPTS_FILE = "attempts.jsonl"
+
+
+class TimeHistogram:
+    """
+    Час відповідей у логарифмічних кошиках: кожен наступний кошик ширший за попередній у GROWTH разів.
+    Перцентилі рахуються з відносною похибкою до ~5% і за кількістю кошиків, а не спроб.
+    """
+
+    GROWTH = 1.1
+    MIN_TIME = 0.01
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+
+    def bucket(self, seconds: float) -> int:
+        if seconds <= self.MIN_TIME:
+            return 0
+        return 1 + int(math.log(seconds / self.MIN_TIME, self.GROWTH))
+
+    def add(self, seconds: float, count: int = 1):
+        b = self.bucket(seconds)
+        self.buckets[b] = self.buckets.get(b, 0) + count
+        self.count += count
+
+    def merge(self, other: "TimeHistogram"):
+        for b, n in other.buckets.items():
+            self.buckets[b] = self.buckets.get(b, 0) + n
+        self.count += other.count
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = p / 100.0 * self.count
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= rank:
+                if b == 0:
+                    return self.MIN_TIME
+                # Середина кошика в логарифмічній шкалі
+                return self.MIN_TIME * self.GROWTH ** (b - 0.5)
+        return self.MIN_TIME * self.GROWTH ** (max(self.buckets) - 0.5)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {str(b): n for b, n in self.buckets.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> "TimeHistogram":
+        hist = cls()
+        for b, n in data.items():
+            hist.buckets[int(b)] = n
+            hist.count += n
+        return hist
+
+
+class RunningStats:
+    """
+    Агрегати, що оновлюються по одній спробі: кількість, середнє і дисперсія (алгоритм Велфорда),
+    гістограма балів (частка від максимуму, з кроком 0.1) і розподіл часу.
+    """
+
+    SCORE_BINS = 10
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total_time = 0.0
+        self.score_hist = [0] * (self.SCORE_BINS + 1)
+        self.times = TimeHistogram()
+
+    def add(self, score: float, max_score: float = 1.0, seconds: Optional[float] = None):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        fraction = score / max_score if max_score else 0.0
+        self.score_hist[min(self.SCORE_BINS, max(0, round(fraction * self.SCORE_BINS)))] += 1
+        if seconds is not None:
+            self.total_time += seconds
+            self.times.add(seconds)
+
+    def merge(self, other: "RunningStats"):
+        # Паралельна формула Чана: об'єднання без повторного проходу по спробах
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.total_time += other.total_time
+        self.score_hist = [a + b for a, b in zip(self.score_hist, other.score_hist)]
+        self.times.merge(other.times)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.times.count if self.times.count else 0.0
+
+    def time_percentile(self, p: float) -> Optional[float]:
+        return self.times.percentile(p)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "total_time": self.total_time,
+                "score_hist": self.score_hist, "times": self.times.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunningStats":
+        stats = cls()
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.total_time = data["total_time"]
+        stats.score_hist = list(data["score_hist"])
+        stats.times = TimeHistogram.from_dict(data["times"])
+        return stats
+
+
+def question_key(question) -> str:
+    # Ключ питання між запусками (uid живе лише в межах процесу)
+    return f"{getattr(question, 'q_type', 'Question')}:{question.text}"
+
+
+class AttemptStore:
+    """
+    Сховище спроб: кожна спроба дописується рядком у attempts.jsonl, а агрегати по тестах,
+    питаннях і темах оновлюються одразу. Агрегати періодично зберігаються знімком разом
+    зі зсувом у файлі спроб, тож при запуску дочитуються лише нові рядки.
+    """
+
+    SNAPSHOT_EVERY = 100
+
+    def __init__(self, path: str = ATTEMPTS_FILE):
+        self.path = path
+        self.snapshot_path = path + ".stats"
+        self.tests: Dict[str, RunningStats] = {}
+        self.questions: Dict[str, RunningStats] = {}
+        self.topics: Dict[str, RunningStats] = {}
+        self._offset = 0
+        self._unsaved = 0
+        self._tail_checked = False
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                for name in ("tests", "questions", "topics"):
+                    setattr(self, name, {k: RunningStats.from_dict(v) for k, v in snapshot[name].items()})
+                self._offset = snapshot["offset"]
+            except (ValueError, KeyError, TypeError):
+                self.tests, self.questions, self.topics, self._offset = {}, {}, {}, 0
+        if not os.path.exists(self.path):
+            return
+        if os.path.getsize(self.path) < self._offset:
+            # Файл спроб замінили - знімок більше не відповідає йому
+            self.tests, self.questions, self.topics, self._offset = {}, {}, {}, 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    self._aggregate(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    # Зіпсований чи неповний рядок (не той тип, немає потрібного поля) пропускаємо
+                    pass
+                self._offset += len(line)
+                self._unsaved += 1
+
+    @staticmethod
+    def _stats(table: Dict[str, RunningStats], key: str) -> RunningStats:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = RunningStats()
+        return stats
+
+    @staticmethod
+    def _seconds(value) -> Optional[float]:
+        return None if value is None else float(value)
+
+    def _aggregate(self, attempt: Dict[str, Any]):
+        # Спершу перевіряються всі поля спроби, потім оновлюються агрегати: зіпсований рядок не додасться наполовину
+        updates = [(self.tests, attempt["test"], float(attempt["score"]), float(attempt["max_score"]),
+                    self._seconds(attempt.get("time")))]
+        for item in attempt.get("answers", []):
+            score, seconds = float(item["score"]), self._seconds(item.get("time"))
+            updates.append((self.questions, item["question"], score, 1.0, seconds))
+            if item.get("topic") is not None:
+                updates.append((self.topics, item["topic"], score, 1.0, seconds))
+        for table, key, _, _, _ in updates:
+            if not isinstance(key, str):
+                raise TypeError(f"Ключ статистики має бути рядком: {key!r}")
+        for table, key, score, max_score, seconds in updates:
+            self._stats(table, key).add(score, max_score, seconds)
+
+    def record(self, test_name: str, answers: List[Dict[str, Any]], student: Optional[str] = None,
+               seconds: Optional[float] = None) -> Dict[str, Any]:
+        """answers - список {"question": ключ, "topic": тема, "score": 0..1, "time": секунди}."""
+        if seconds is None and any("time" in item for item in answers):
+            seconds = sum(item.get("time", 0.0) for item in answers)
+        # Спроба без часу (не timed-сесія) лишається з "time": null, інакше в розподіл часу потрапили б нулі
+        attempt = {"test": test_name, "student": student, "at": time.time(),
+                   "score": sum(item["score"] for item in answers), "max_score": len(answers),
+                   "time": seconds, "answers": answers}
+        line = (json.dumps(attempt, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.path, "ab+") as f:
+            if not self._tail_checked:
+                self._trim_torn_tail(f)
+                self._tail_checked = True
+            f.write(line)
+        self._offset += len(line)
+        self._aggregate(attempt)
+        self._unsaved += 1
+        if self._unsaved >= self.SNAPSHOT_EVERY:
+            self.save_snapshot()
+        return attempt
+
+    @staticmethod
+    def _trim_torn_tail(f):
+        # Попередній запис міг обірватися посеред рядка. Дописана після обривка спроба злилася б із ним
+        # і загубилася при наступному читанні, тож файл обрізається до кінця останнього повного рядка
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 4096)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos != end:
+            f.truncate(pos)
+
+    def save_snapshot(self):
+        snapshot = {"offset": self._offset,
+                    "tests": {k: v.to_dict() for k, v in self.tests.items()},
+                    "questions": {k: v.to_dict() for k, v in self.questions.items()},
+                    "topics": {k: v.to_dict() for k, v in self.topics.items()}}
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+        self._unsaved = 0
+
+    def close(self):
+        if self._unsaved:
+            self.save_snapshot()
+
+    def test_stats(self, test_name: str) -> Optional[RunningStats]:
+        return self.tests.get(test_name)
+
+    def question_stats(self, key: str) -> Optional[RunningStats]:
+        return self.questions.get(key)
+
+    def topic_stats(self, topic: str) -> Optional[RunningStats]:
+        return self.topics.get(topic)
@@ -0,0 +1,115 @@
+import math
+import re
+from bisect import bisect_left, insort
+from typing import List, Dict, Any, Hashable, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+# Апостроф всередині українського слова (м'ята, з'єднайте) не розриває його на два токени
+APOSTROPHES = str.maketrans({"'": "", "’": "", "ʼ": "", "`": ""})
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.casefold().translate(APOSTROPHES))
+
+
+class SearchIndex:
+    """
+    Інвертований індекс питань за текстом, темою та варіантами відповідей.
+    Оновлюється поступово (add/update/remove), тож пошук не перечитує весь банк.
+    Кожне слово запиту шукається як префікс токена; результат - питання з усіма словами запиту,
+    впорядковані за вагою (текст важить більше за тему й варіанти).
+    """
+
+    FIELD_WEIGHTS = {"text": 2.0, "topic": 1.0, "options": 1.0}
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._doc_terms: Dict[Hashable, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, question) -> bool:
+        return question in self._doc_terms
+
+    def _question_terms(self, question) -> Dict[str, float]:
+        fields = {
+            "text": getattr(question, "text", "") or "",
+            "topic": getattr(question, "topic", "") or "",
+            "options": " ".join(str(opt) for opt in (getattr(question, "options", None) or ())),
+        }
+        terms: Dict[str, float] = {}
+        for field, value in fields.items():
+            weight = self.FIELD_WEIGHTS[field]
+            for token in tokenize(value):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+    def add(self, question):
+        if question in self._doc_terms:
+            self.remove(question)
+        terms = self._question_terms(question)
+        self._doc_terms[question] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                insort(self._vocabulary, term)
+            postings[question] = weight
+
+    def remove(self, question):
+        terms = self._doc_terms.pop(question, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[question]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect_left(self._vocabulary, term)]
+
+    def update(self, question):
+        # Викликається після редагування тексту, теми або варіантів
+        self.add(question)
+
+    def _expand(self, token: str) -> List[str]:
+        start = bisect_left(self._vocabulary, token)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def search_scored(self, query: str) -> List[Tuple[float, Any]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return [(0.0, question) for question in self._doc_terms]
+
+        total = len(self._doc_terms)
+        per_token = []
+        for token in dict.fromkeys(tokens):
+            matched: Dict[Hashable, float] = {}
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + total / len(postings))
+                for question, weight in postings.items():
+                    score = weight * idf
+                    if score > matched.get(question, 0.0):
+                        matched[question] = score
+            if not matched:
+                return []
+            per_token.append(matched)
+
+        # Перетин починаємо з найрідшого слова - так проміжні множини найменші
+        per_token.sort(key=len)
+        scores = dict(per_token[0])
+        for matched in per_token[1:]:
+            scores = {q: s + matched[q] for q, s in scores.items() if q in matched}
+            if not scores:
+                return []
+        return sorted(((s, q) for q, s in scores.items()), key=lambda item: -item[0])
+
+    def search(self, query: str) -> List[Any]:
+        return [question for _, question in self.search_scored(query)]
@@ -0,0 +1,86 @@
+import random
+from typing import List, Dict, Any, Optional, Tuple, Hashable
+
+BucketKey = Tuple[Any, Hashable]
+
+
+class SelectionIndex:
+    """
+    Питання, заздалегідь розкладені по кошиках (складність, тема).
+    Будується один раз на банк; вибір питання не переглядає весь список.
+    """
+
+    def __init__(self, questions: List[Any]):
+        self.buckets: Dict[BucketKey, List[Any]] = {}
+        self.by_difficulty: Dict[Any, List[BucketKey]] = {}
+        for q in questions:
+            key = (q.difficulty, getattr(q, "topic", None))
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = []
+                self.by_difficulty.setdefault(q.difficulty, []).append(key)
+            bucket.append(q)
+
+    def keys_for(self, difficulty=None, topic=None) -> List[BucketKey]:
+        if difficulty is None:
+            keys = list(self.buckets)
+        else:
+            keys = self.by_difficulty.get(difficulty, [])
+        if topic is not None:
+            keys = [key for key in keys if key[1] == topic]
+        return keys
+
+    def choice(self, difficulty=None, topic=None, rng: random.Random = random) -> Optional[Any]:
+        # Вибір з поверненням, рівноймовірний серед усіх питань, що підходять
+        keys = self.keys_for(difficulty, topic)
+        total = sum(len(self.buckets[key]) for key in keys)
+        if not total:
+            return None
+        r = rng.randrange(total)
+        for key in keys:
+            bucket = self.buckets[key]
+            if r < len(bucket):
+                return bucket[r]
+            r -= len(bucket)
+
+    def sampler(self, rng: random.Random = random) -> "SessionSampler":
+        return SessionSampler(self, rng)
+
+
+class SessionSampler:
+    """
+    Вибір без повторень для однієї сесії. Спільні кошики індексу не копіюються:
+    сесія зберігає лише розріджену перестановку Фішера-Єйтса для кожного кошика,
+    тож і пам'ять, і час кроку залежать від кількості вже заданих питань, а не від розміру банку.
+    """
+
+    def __init__(self, index: SelectionIndex, rng: random.Random = random):
+        self.index = index
+        self.rng = rng
+        self._swaps: Dict[BucketKey, Dict[int, int]] = {}
+        self._remaining: Dict[BucketKey, int] = {}
+
+    def remaining(self, key: BucketKey) -> int:
+        return self._remaining.get(key, len(self.index.buckets[key]))
+
+    def _draw_from(self, key: BucketKey) -> Any:
+        n = self.remaining(key)
+        swaps = self._swaps.setdefault(key, {})
+        r = self.rng.randrange(n)
+        pick = swaps.get(r, r)
+        last = n - 1
+        swaps[r] = swaps.pop(last, last)
+        self._remaining[key] = last
+        return self.index.buckets[key][pick]
+
+    def draw(self, difficulty=None, topic=None) -> Optional[Any]:
+        keys = self.index.keys_for(difficulty, topic)
+        total = sum(self.remaining(key) for key in keys)
+        if not total:
+            return None
+        r = self.rng.randrange(total)
+        for key in keys:
+            left = self.remaining(key)
+            if r < left:
+                return self._draw_from(key)
+            r -= left
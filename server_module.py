@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from typing import List, Dict, Any, Optional
+
+from questions_module import Question
+from grading_module import GradingCache, decode_answer, _INVALID
+from results_module import AttemptStore, question_key, ATTEMPTS_FILE
+from irt_module import ItemBank, CATSession, load_bank_params, params_path, np as irt_numpy
+from selection_module import SelectionIndex
+from storage_module import open_storage, LazyTestBank, TESTS_FILE
+
+# Протокол: один JSON-об'єкт на рядок в обидва боки.
+#   {"cmd": "start", "test": "Назва", "mode": "basic" | "timed" | "adaptive" | "cat", "student": "Ім'я" (необов'язково)}
+#   {"cmd": "answer", "session": "<id>", "answer": ...}
+#   {"cmd": "stats"} - кількість сесій і статистика кешу оцінок
+# Відповідь сервера містить наступне питання (без правильних відповідей) або підсумок.
+
+logger = logging.getLogger(__name__)
+
+
+def public_view(question: Question) -> Dict[str, Any]:
+    # Те, що бачить студент: без правильних відповідей
+    view = {"q_type": question.q_type, "text": question.text,
+            "difficulty": question.difficulty, "topic": question.topic}
+    if hasattr(question, "options"):
+        view["options"] = list(question.options)
+    if question.q_type == "Ordering":
+        view["items"] = random.sample(list(question.correct_order), len(question.correct_order))
+    elif question.q_type == "Matching":
+        view["left"] = list(question.pairs.keys())
+        view["right"] = random.sample(list(question.pairs.values()), len(question.pairs))
+    return view
+
+
+class ExamSession:
+    # Спільний кеш оцінок сервера; без нього кожна відповідь перевіряється напряму
+    cache: Optional[GradingCache] = None
+    # Тест і студент - для запису завершеної спроби в AttemptStore
+    test_name: Optional[str] = None
+    student: Optional[str] = None
+
+    def __init__(self, questions: List[Question]):
+        self.id = uuid.uuid4().hex
+        self.questions = questions
+        self.score = 0.0
+        self.asked = 0
+        self.current: Optional[Question] = None
+        # Відповіді у форматі AttemptStore.record
+        self.answers: List[Dict[str, Any]] = []
+
+    def next_question(self) -> Optional[Question]:
+        if self.asked >= len(self.questions):
+            return None
+        return self.questions[self.asked]
+
+    def answer(self, raw_answer: Any) -> float:
+        if raw_answer is None:
+            result = 0.0
+        else:
+            answer = decode_answer(self.current, raw_answer)
+            if answer is _INVALID:
+                # Студент може надіслати відповідь ще раз, тож питання поки не зараховується
+                raise ValueError("Неправильний тип відповіді")
+            result = self.cache.check(self.current, answer) if self.cache is not None else self.current.check(answer)
+        self.answers.append({"question": question_key(self.current), "topic": self.current.topic, "score": result})
+        self.score += result
+        self.asked += 1
+        return result
+
+    def advance(self) -> Optional[Question]:
+        self.current = self.next_question()
+        return self.current
+
+    @property
+    def max_questions(self) -> int:
+        return len(self.questions)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"score": self.score, "total": self.max_questions}
+
+
+class TimedExamSession(ExamSession):
+    """Як TimedSession з lab4_test: рахує час кожної відповіді, але без блокування на input()."""
+
+    def __init__(self, questions: List[Question]):
+        super().__init__(questions)
+        self.shown_at = time.monotonic()
+        self.last_time = 0.0
+        self.total_time = 0.0
+
+    def answer(self, raw_answer: Any) -> float:
+        result = super().answer(raw_answer)
+        self.last_time = time.monotonic() - self.shown_at
+        self.total_time += self.last_time
+        self.answers[-1]["time"] = self.last_time
+        return result
+
+    def advance(self) -> Optional[Question]:
+        self.shown_at = time.monotonic()
+        return super().advance()
+
+    def summary(self) -> Dict[str, Any]:
+        data = super().summary()
+        data["time"] = self.total_time
+        return data
+
+
+class AdaptiveExamSession(ExamSession):
+    QUESTION_LIMIT = 5
+
+    def __init__(self, questions: List[Question], index: Optional[SelectionIndex] = None):
+        super().__init__(questions)
+        self.difficulty = 1
+        self.sampler = (index or SelectionIndex(questions)).sampler()
+
+    def next_question(self) -> Optional[Question]:
+        if self.asked >= self.max_questions:
+            return None
+        return self.sampler.draw(self.difficulty) or self.sampler.draw()
+
+    def answer(self, raw_answer: Any) -> float:
+        result = super().answer(raw_answer)
+        if result >= 1.0:
+            self.difficulty = min(3, self.difficulty + 1)
+        else:
+            self.difficulty = max(1, self.difficulty - 1)
+        return result
+
+    @property
+    def max_questions(self) -> int:
+        return min(self.QUESTION_LIMIT, len(self.questions))
+
+
+class CATExamSession(ExamSession):
+    def __init__(self, questions: List[Question], bank: ItemBank):
+        super().__init__(questions)
+        self.cat = CATSession(bank)
+        self.item: Optional[int] = None
+
+    def next_question(self) -> Optional[Question]:
+        self.item = self.cat.next_item()
+        return None if self.item is None else self.questions[self.item]
+
+    def answer(self, raw_answer: Any) -> float:
+        result = super().answer(raw_answer)
+        self.cat.record(self.item, result)
+        return result
+
+    @property
+    def max_questions(self) -> int:
+        return min(self.cat.max_items, len(self.questions))
+
+    def summary(self) -> Dict[str, Any]:
+        data = super().summary()
+        data.update({"total": self.asked, "theta": self.cat.theta, "se": self.cat.se})
+        return data
+
+
+class ExamSessionFactory:
+    """Створює неблокуючу сесію потрібного типу (аналог SessionFactory з lab4_test)."""
+
+    def create_session(self, session_type: str, questions: List[Question],
+                       index: Optional[SelectionIndex] = None, bank: Optional[ItemBank] = None) -> ExamSession:
+        if session_type == "basic":
+            return ExamSession(questions)
+        elif session_type == "timed":
+            return TimedExamSession(questions)
+        elif session_type == "adaptive":
+            return AdaptiveExamSession(questions, index)
+        elif session_type == "cat":
+            return CATExamSession(questions, bank or ItemBank(questions))
+        else:
+            raise ValueError("Невідомий тип сесії")
+
+
+class ExamServer:
+    def __init__(self, tests_file: str = TESTS_FILE, irt_params: Optional[str] = None,
+                 store: Optional[AttemptStore] = None):
+        storage = open_storage(tests_file)
+        storage.load()
+        self.tests = LazyTestBank(storage)
+        # Відкалібровані параметри IRT: явно вказаний файл або tests.irt.json поруч із банком, якщо він є
+        # (без numpy режим cat недоступний, тож знайдений поруч файл не читається)
+        if irt_params is None and irt_numpy is not None and os.path.exists(params_path(tests_file)):
+            irt_params = params_path(tests_file)
+        self.irt_params = load_bank_params(irt_params) if irt_params else {}
+        self.factory = ExamSessionFactory()
+        self.sessions: Dict[str, ExamSession] = {}
+        # Індекс вибору та таблиці IRT будуються один раз на тест і спільні для всіх сесій
+        self.selection: Dict[str, SelectionIndex] = {}
+        self.item_banks: Dict[str, ItemBank] = {}
+        # Питання тестів спільні для всіх сесій, тож однакові відповіді різних студентів оцінюються один раз
+        self.grading_cache = GradingCache()
+        # Завершені спроби дописуються сюди; без сховища сервер нічого не зберігає
+        self.store = store
+
+    def item_bank(self, test_name: str, questions: List[Question]) -> ItemBank:
+        # Параметри, відкалібровані для іншої версії тесту (інша кількість питань), не підходять - тоді типові
+        a, b = self.irt_params.get(test_name, (None, None))
+        if a is None or len(a) != len(questions) or len(b) != len(questions):
+            return ItemBank(questions)
+        return ItemBank(questions, a, b)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Уся робота з сесією - швидкі операції в пам'яті, тож цикл подій ніколи не блокується
+        if not isinstance(request, dict):
+            return {"error": "Запит має бути JSON-об'єктом"}
+        cmd = request.get("cmd")
+        if cmd == "start":
+            test_name, mode = request.get("test"), request.get("mode", "basic")
+            if not isinstance(test_name, str) or not isinstance(mode, str):
+                return {"error": "Назва тесту і режим мають бути рядками"}
+            return self.start(test_name, mode, request.get("student"))
+        elif cmd == "answer":
+            session_id = request.get("session")
+            if not isinstance(session_id, str):
+                return {"error": "Ідентифікатор сесії має бути рядком"}
+            return self.answer(session_id, request.get("answer"))
+        elif cmd == "stats":
+            return {"sessions": len(self.sessions), "grading_cache": self.grading_cache.stats()}
+        return {"error": f"Невідома команда: {cmd}"}
+
+    def start(self, test_name: str, mode: str, student: Optional[str] = None) -> Dict[str, Any]:
+        if test_name not in self.tests:
+            return {"error": f"Тест '{test_name}' не знайдено"}
+        questions = self.tests[test_name]
+        if not questions:
+            return {"error": "У тесті немає питань"}
+        try:
+            if mode == "adaptive" and test_name not in self.selection:
+                self.selection[test_name] = SelectionIndex(questions)
+            if mode == "cat" and test_name not in self.item_banks:
+                self.item_banks[test_name] = self.item_bank(test_name, questions)
+            session = self.factory.create_session(mode, questions, self.selection.get(test_name),
+                                                  self.item_banks.get(test_name))
+        except (ValueError, RuntimeError) as e:
+            return {"error": str(e)}
+        session.cache = self.grading_cache
+        session.test_name = test_name
+        session.student = student
+        self.sessions[session.id] = session
+        question = session.advance()
+        return {"session": session.id, "question": public_view(question), "total": session.max_questions}
+
+    def answer(self, session_id: str, raw_answer: Any) -> Dict[str, Any]:
+        session = self.sessions.get(session_id)
+        if session is None or session.current is None:
+            return {"error": "Сесію не знайдено"}
+        try:
+            result = session.answer(raw_answer)
+        except (TypeError, AttributeError, ValueError):
+            return {"error": "Неправильний формат відповіді"}
+        question = session.advance()
+        if question is None:
+            del self.sessions[session_id]
+            self.record_attempt(session)
+            response = {"result": result, "finished": True}
+            response.update(session.summary())
+            return response
+        response = {"result": result, "finished": False, "question": public_view(question)}
+        if isinstance(session, TimedExamSession):
+            response["time"] = session.last_time
+        return response
+
+    def record_attempt(self, session: ExamSession):
+        # Один рядок у файлі спроб - коротке дописування, тож його можна робити просто в циклі подій
+        if self.store is None:
+            return
+        seconds = session.total_time if isinstance(session, TimedExamSession) else None
+        try:
+            self.store.record(session.test_name, session.answers, session.student, seconds)
+        except OSError:
+            # Студент уже завершив тест: помилка запису не має забрати в нього результат
+            logger.exception("Не вдалося записати спробу (тест '%s')", session.test_name)
+
+    def drop_sessions(self, session_ids):
+        for session_id in session_ids:
+            self.sessions.pop(session_id, None)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Сесії, розпочаті цим з'єднанням: якщо клієнт відключиться посеред тесту, вони видаляються
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"error": "Некоректний JSON"}
+                else:
+                    try:
+                        response = self.handle(request)
+                    except Exception:
+                        # Непередбачена помилка в одному запиті не повинна рвати з'єднання і забирати його сесії
+                        logger.exception("Помилка обробки запиту %r", request)
+                        response = {"error": "Внутрішня помилка сервера"}
+                    if "session" in response:
+                        owned.add(response["session"])
+                writer.write((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.drop_sessions(owned)
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+class ExamClient:
+    """Простий асинхронний клієнт - замінник справжнього інтерфейсу студента для перевірки сервера."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.writer.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _main(args):
+    if args.metrics_port:
+        import metrics_module
+        metrics_module.enable()
+        metrics_module.serve(args.host, args.metrics_port)
+        print(f"Метрики: http://{args.host}:{args.metrics_port}/metrics")
+    store = AttemptStore(args.attempts_file)
+    server = await ExamServer(args.tests_file, args.irt_params, store).serve(args.host, args.port)
+    print(f"Сервер тестування слухає {args.host}:{args.port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Асинхронний сервер сесій тестування")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tests-file", default=TESTS_FILE)
+    parser.add_argument("--attempts-file", default=ATTEMPTS_FILE, help="Куди записувати завершені спроби")
+    parser.add_argument("--irt-params", default=None,
+                        help="Файл параметрів IRT (irt_module.py --test); типово - tests.irt.json поруч із банком")
+    parser.add_argument("--metrics-port", type=int, default=None, help="Увімкнути вимірювання і віддавати /metrics")
+    asyncio.run(_main(parser.parse_args()))
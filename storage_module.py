@@ -0,0 +1,584 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Mapping, MutableMapping
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from questions_module import Question
+
+TESTS_FILE = "tests.json"
+TESTS_DIR = "tests.d"
+MANIFEST_FILE = "manifest.json"
+
+RawBank = Dict[str, List[Dict[str, Any]]]
+Changes = Dict[str, Optional[List[Dict[str, Any]]]]
+Op = Dict[str, Any]
+
+
+def write_json_atomic(path: str, data: Any) -> str:
+    # Спочатку пишемо у тимчасовий файл, потім атомарно підміняємо старий,
+    # щоб збій посеред запису не залишив пошкоджений tests.json. Повертає відбиток записаного вмісту.
+    payload = json.dumps(data, ensure_ascii=False, indent=4).encode("utf-8")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def changes_to_ops(changes: Changes) -> List[Op]:
+    # changes: назва тесту -> новий список питань, або None якщо тест видалено
+    return [{"op": "del", "test": name} if q_list is None else {"op": "put", "test": name, "questions": q_list}
+            for name, q_list in changes.items()]
+
+
+def apply_op(data: RawBank, op: Op):
+    kind = op.get("op")
+    if kind == "put":
+        data[op["test"]] = op["questions"]
+    elif kind == "del":
+        data.pop(op["test"], None)
+    elif kind == "add":
+        data.setdefault(op["test"], []).insert(op["index"], op["question"])
+    elif kind == "remove":
+        q_list = data.get(op["test"])
+        if q_list is not None and 0 <= op["index"] < len(q_list):
+            del q_list[op["index"]]
+
+
+def question_hash(data: Dict[str, Any]) -> str:
+    # Адреса питання - хеш канонічного to_dict (ключі відсортовано), тож однаковий вміст дає однакову адресу
+    canonical = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:20]
+
+
+class QuestionPool:
+    """
+    Спільний пул питань: кожен вміст зберігається один раз, тести тримають лише посилання-хеші.
+    Лічильник посилань прибирає питання з пулу, коли його не використовує жоден тест.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.refcounts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, data: Dict[str, Any], ref: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+        ref = ref or question_hash(data)
+        shared = self.entries.get(ref)
+        if shared is None:
+            shared = self.entries[ref] = data
+            self.refcounts[ref] = 0
+        self.refcounts[ref] += 1
+        return ref, shared
+
+    def release(self, ref: str):
+        count = self.refcounts[ref] - 1
+        if count:
+            self.refcounts[ref] = count
+        else:
+            del self.refcounts[ref]
+            del self.entries[ref]
+
+
+def is_pooled(data: Any) -> bool:
+    return isinstance(data, dict) and set(data) == {"$pool", "$tests"}
+
+
+class JsonStorage:
+    """
+    Увесь банк тестів в одному JSON-файлі (поведінка до появи журналу).
+    Методи захищені блокуванням, тож редактор може зберігати у фоновому потоці,
+    поки головний потік дочитує ще не відкриті тести.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: RawBank = {}
+        self._digest: Optional[str] = None
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        # Посилання тестів на спільний пул; у _data лежать ті самі спільні словники з пулу
+        self.pool = QuestionPool()
+        self._refs: Dict[str, List[str]] = {}
+
+    def load(self) -> RawBank:
+        with self._lock:
+            self.pool = QuestionPool()
+            self._refs = {}
+            self._data = {}
+            if not os.path.exists(self.path):
+                self._digest = None
+            else:
+                with open(self.path, "rb") as f:
+                    payload = f.read()
+                self._set_bank(json.loads(payload.decode("utf-8")))
+                self._digest = hashlib.sha1(payload).hexdigest()
+            self._fingerprint = self.fingerprint()
+            return self._data
+
+    def _set_bank(self, data: Any):
+        if is_pooled(data):
+            entries = data["$pool"]
+            for test_name, refs in data["$tests"].items():
+                self._refs[test_name] = list(refs)
+                self._data[test_name] = [self.pool.add(entries[ref], ref)[1] for ref in refs]
+        else:
+            # Старий формат: повні копії питань у кожному тесті, дублікати зливаються тут
+            for test_name, q_list in data.items():
+                self._apply({"op": "put", "test": test_name, "questions": q_list})
+
+    def _apply(self, op: Op):
+        # Те саме, що apply_op, але з підтриманням пулу і лічильників посилань
+        kind = op.get("op")
+        test_name = op["test"]
+        if kind == "put":
+            self._release_test(test_name)
+            refs, q_list = [], []
+            for data in op["questions"]:
+                ref, shared = self.pool.add(data)
+                refs.append(ref)
+                q_list.append(shared)
+            self._refs[test_name] = refs
+            self._data[test_name] = q_list
+        elif kind == "del":
+            self._release_test(test_name)
+            self._data.pop(test_name, None)
+        elif kind == "add":
+            ref, shared = self.pool.add(op["question"])
+            self._refs.setdefault(test_name, []).insert(op["index"], ref)
+            self._data.setdefault(test_name, []).insert(op["index"], shared)
+        elif kind == "remove":
+            refs = self._refs.get(test_name)
+            if refs is not None and 0 <= op["index"] < len(refs):
+                self.pool.release(refs.pop(op["index"]))
+                del self._data[test_name][op["index"]]
+
+    def _release_test(self, test_name: str):
+        for ref in self._refs.pop(test_name, []):
+            self.pool.release(ref)
+
+    def _checkpoint(self, ops: List[Op]) -> Dict[str, tuple]:
+        # Стан тестів, яких торкаються операції, - щоб повернути його, якщо запис на диск не вдався
+        saved = {}
+        for op in ops:
+            test_name = op["test"]
+            if test_name not in saved:
+                q_list = self._data.get(test_name)
+                refs = self._refs.get(test_name)
+                saved[test_name] = (None if q_list is None else list(q_list), None if refs is None else list(refs))
+        return saved
+
+    def _rollback(self, saved: Dict[str, tuple]):
+        # Відпускаємо посилання нового стану і знову беремо старі, тож лічильники пулу теж повертаються
+        for test_name, (q_list, refs) in saved.items():
+            self._release_test(test_name)
+            self._data.pop(test_name, None)
+            if q_list is not None:
+                for ref, data in zip(refs, q_list):
+                    self.pool.add(data, ref)
+                self._refs[test_name] = refs
+                self._data[test_name] = q_list
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"$pool": self.pool.entries, "$tests": self._refs}
+
+    def test_refs(self, test_name: str) -> Optional[List[str]]:
+        with self._lock:
+            return self._refs.get(test_name)
+
+    def files(self) -> List[str]:
+        return [self.path]
+
+    def fingerprint(self) -> tuple:
+        # Час зміни і розмір файлів сховища - дешево перевірити без читання вмісту
+        result = []
+        for path in self.files():
+            try:
+                st = os.stat(path)
+                result.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                result.append(None)
+        return tuple(result)
+
+    def changed_externally(self) -> bool:
+        # Чи змінив файли хтось інший після нашого останнього читання або запису
+        with self._lock:
+            return self._fingerprint is not None and self.fingerprint() != self._fingerprint
+
+    def test_names(self) -> List[str]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def load_test(self, test_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._data.get(test_name, [])
+
+    def peek_test(self, test_name: str) -> List[Dict[str, Any]]:
+        # Читання для фонових переглядів усього банку: нічого не кешує (тут банк і так увесь у пам'яті)
+        return self.load_test(test_name)
+
+    def question_count(self, test_name: str) -> int:
+        return len(self.load_test(test_name))
+
+    def write(self, changes: Changes):
+        self.apply_ops(changes_to_ops(changes))
+
+    def apply_ops(self, ops: List[Op]):
+        # Операції: put/del - цілий тест, add/remove - одне питання за індексом
+        if not ops:
+            return
+        with self._lock:
+            saved = self._checkpoint(ops)
+            try:
+                for op in ops:
+                    self._apply(op)
+                self._digest = write_json_atomic(self.path, self.snapshot())
+            except BaseException:
+                # Інакше повторне збереження тих самих операцій застосувало б їх двічі
+                self._rollback(saved)
+                raise
+            self._fingerprint = self.fingerprint()
+
+
+class JournalStorage(JsonStorage):
+    """
+    tests.json як знімок + журнал змін tests.json.journal, у який дописуються
+    лише операції над зміненими тестами і питаннями. Коли журнал розростається,
+    він згортається у новий знімок.
+    """
+
+    COMPACT_MIN_RECORDS = 50
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+        self._journal_records = 0
+        self._journal_bytes = 0
+
+    def load(self) -> RawBank:
+        with self._lock:
+            super().load()
+            self._journal_records = 0
+            self._journal_bytes = 0
+            if os.path.exists(self.journal_path):
+                self._replay()
+            self._fingerprint = self.fingerprint()
+            return self._data
+
+    def files(self) -> List[str]:
+        return [self.path, self.journal_path]
+
+    def _replay(self):
+        good_offset = 0
+        with open(self.journal_path, "rb") as f:
+            for line in f:
+                # Незавершений останній рядок означає збій під час дописування - відкидаємо його
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get("op") == "base":
+                    # Журнал веде облік від конкретного знімка. Якщо знімок уже інший
+                    # (збій між згортанням і очищенням журналу), усі ці операції в ньому вже є
+                    if record.get("digest") != self._digest:
+                        break
+                else:
+                    self._apply(record)
+                    self._journal_records += 1
+                good_offset += len(line)
+
+        if good_offset != os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good_offset)
+        self._journal_bytes = good_offset
+
+    def apply_ops(self, ops: List[Op]):
+        if not ops:
+            return
+        with self._lock:
+            saved = self._checkpoint(ops)
+            try:
+                for op in ops:
+                    self._apply(op)
+                lines = [json.dumps(op, ensure_ascii=False) + "\n" for op in ops]
+                if not self._journal_bytes:
+                    lines.insert(0, json.dumps({"op": "base", "digest": self._digest}) + "\n")
+                self._append(lines)
+            except BaseException:
+                self._rollback(saved)
+                raise
+            self._journal_records += len(ops)
+
+            if self._needs_compaction():
+                try:
+                    self.compact()
+                except OSError:
+                    # Операції вже надійно в журналі; згортання спробуємо під час наступного збереження
+                    pass
+            self._fingerprint = self.fingerprint()
+
+    def _append(self, lines: Iterable[str]):
+        payload = "".join(lines).encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            try:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            except BaseException:
+                # Частково дописані рядки відрізаються, щоб вони не відтворились при наступному завантаженні
+                f.truncate(self._journal_bytes)
+                raise
+        self._journal_bytes += len(payload)
+
+    def _needs_compaction(self) -> bool:
+        if self._journal_records < self.COMPACT_MIN_RECORDS:
+            return False
+        snapshot_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        return self._journal_bytes > snapshot_size or self._journal_records > 4 * max(1, len(self._data))
+
+    def compact(self):
+        with self._lock:
+            self._digest = write_json_atomic(self.path, self.snapshot())
+            with open(self.journal_path, "wb") as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_records = 0
+            self._journal_bytes = 0
+            self._fingerprint = self.fingerprint()
+
+
+class _ShardedBank(Mapping):
+    # Словник "назва тесту -> питання", що читає файл тесту лише при зверненні
+    def __init__(self, storage: "ShardedStorage"):
+        self.storage = storage
+
+    def __getitem__(self, test_name: str) -> List[Dict[str, Any]]:
+        if test_name not in self.storage._manifest:
+            raise KeyError(test_name)
+        return self.storage.load_test(test_name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.storage.test_names())
+
+    def __len__(self) -> int:
+        return len(self.storage._manifest)
+
+
+class ShardedStorage(JsonStorage):
+    """
+    Банк тестів як каталог: по файлу на тест і manifest.json з назвами, кількістю питань,
+    відбитками та часом зміни кожного файлу. Список тестів береться з маніфесту без читання файлів,
+    а збереження переписує лише файли змінених тестів і їхні записи в маніфесті.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.manifest_path = os.path.join(path, MANIFEST_FILE)
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        # Відбитки файлів тестів, які ми прочитали або записали - за ними видно чужі зміни
+        self._known_hashes: Dict[str, Optional[str]] = {}
+
+    @staticmethod
+    def shard_name(test_name: str) -> str:
+        # Назва тесту може містити будь-які символи, тож файл називається за її хешем
+        return hashlib.sha1(test_name.encode("utf-8")).hexdigest()[:16] + ".json"
+
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("tests", {})
+
+    def load(self) -> Mapping:
+        with self._lock:
+            self._manifest = self._read_manifest()
+            self._data = {}
+            self._known_hashes = {}
+            return _ShardedBank(self)
+
+    def files(self) -> List[str]:
+        return [self.manifest_path]
+
+    def test_names(self) -> List[str]:
+        with self._lock:
+            return list(self._manifest)
+
+    def load_test(self, test_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            if test_name not in self._data:
+                entry = self._manifest.get(test_name)
+                if entry is None:
+                    return []
+                with open(os.path.join(self.path, entry["file"]), "rb") as f:
+                    payload = f.read()
+                self._data[test_name] = json.loads(payload.decode("utf-8"))
+                self._known_hashes[test_name] = hashlib.sha1(payload).hexdigest()
+            return self._data[test_name]
+
+    def peek_test(self, test_name: str) -> List[Dict[str, Any]]:
+        # Файл тесту читається, але не лишається в кеші і не стає "відкритим" для changed_externally
+        with self._lock:
+            if test_name in self._data:
+                return self._data[test_name]
+            entry = self._manifest.get(test_name)
+        if entry is None:
+            return []
+        with open(os.path.join(self.path, entry["file"]), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def question_count(self, test_name: str) -> int:
+        with self._lock:
+            if test_name in self._data:
+                return len(self._data[test_name])
+            entry = self._manifest.get(test_name)
+            return entry["count"] if entry else 0
+
+    def changed_externally(self) -> bool:
+        # Конфлікт - лише якщо хтось інший змінив тести, які ми відкривали; інші тести можна правити паралельно
+        with self._lock:
+            current = self._read_manifest()
+            for test_name, known in self._known_hashes.items():
+                entry = current.get(test_name)
+                if (entry["hash"] if entry else None) != known:
+                    return True
+            return False
+
+    def apply_ops(self, ops: List[Op]):
+        if not ops:
+            return
+        with self._lock:
+            affected = []
+            for op in ops:
+                if op.get("op") in ("add", "remove"):
+                    self.load_test(op["test"])
+                if op["test"] not in affected:
+                    affected.append(op["test"])
+            saved = {name: list(self._data[name]) if name in self._data else None for name in affected}
+            try:
+                for op in ops:
+                    apply_op(self._data, op)
+                self._write_shards(affected)
+            except BaseException:
+                for test_name, q_list in saved.items():
+                    if q_list is None:
+                        self._data.pop(test_name, None)
+                    else:
+                        self._data[test_name] = q_list
+                raise
+
+    def compact(self):
+        # Переписує всі відкриті тести нашою версією (вибір "перезаписати" при конфлікті)
+        with self._lock:
+            self._write_shards(list(self._data) + [name for name in self._known_hashes if name not in self._data])
+
+    def _write_shards(self, test_names: List[str]):
+        os.makedirs(self.path, exist_ok=True)
+        # Маніфест перечитуємо з диска і змінюємо лише свої записи, щоб не затерти тести інших адміністраторів
+        manifest = self._read_manifest()
+        written: Dict[str, Optional[str]] = {}
+        for test_name in test_names:
+            file_name = self.shard_name(test_name)
+            shard_path = os.path.join(self.path, file_name)
+            if test_name in self._data:
+                digest = write_json_atomic(shard_path, self._data[test_name])
+                manifest[test_name] = {"file": file_name, "count": len(self._data[test_name]), "hash": digest,
+                                       "mtime": os.stat(shard_path).st_mtime_ns}
+                written[test_name] = digest
+            else:
+                manifest.pop(test_name, None)
+                written[test_name] = None
+                if os.path.exists(shard_path):
+                    os.remove(shard_path)
+        write_json_atomic(self.manifest_path, {"version": 1, "tests": manifest})
+        # Відбитки оновлюються лише після запису маніфесту, інакше невдалий запис виглядав би як чужа зміна
+        self._known_hashes.update(written)
+        self._manifest = manifest
+        self._fingerprint = self.fingerprint()
+
+
+def open_storage(path: str) -> JsonStorage:
+    # Бекенд обирається за розширенням файлу банку; каталог - банк, розкладений по файлах тестів
+    if os.path.isdir(path) or path.endswith(("/", os.sep)):
+        return ShardedStorage(path.rstrip("/" + os.sep))
+    if path.endswith(".qbank"):
+        from binbank_module import BinaryStorage
+        return BinaryStorage(path)
+    return JournalStorage(path)
+
+
+def convert_storage(source: str, target: str):
+    # Перенесення банку між форматами, наприклад tests.json -> tests.d/
+    src = open_storage(source)
+    src.load()
+    dst = open_storage(target)
+    dst.load()
+    dst.apply_ops([{"op": "put", "test": name, "questions": src.load_test(name)} for name in src.test_names()])
+
+
+class LazyTestBank(MutableMapping):
+    """
+    Банк тестів, що поводиться як dict, але створює об'єкти Question
+    лише при першому зверненні до конкретного тесту і далі тримає їх у кеші.
+
+    Питання зі спільного пулу - один об'єкт у всіх тестах, що на нього посилаються, тож питання
+    з банку лише для читання: змінювати тест можна тільки командами (вставити, прибрати, замінити
+    список), а не присвоюванням атрибутів питання, інакше зміна непомітно потрапить в усі ці тести.
+    """
+
+    def __init__(self, storage: JsonStorage):
+        self.storage = storage
+        self._names: Dict[str, None] = dict.fromkeys(storage.test_names())
+        self._loaded: Dict[str, List[Question]] = {}
+        # Питання з однаковим вмістом у різних тестах - один і той самий об'єкт
+        self._shared: Dict[str, Question] = {}
+
+    def __getitem__(self, test_name: str) -> List[Question]:
+        if test_name not in self._loaded:
+            if test_name not in self._names:
+                raise KeyError(test_name)
+            raw = self.storage.load_test(test_name)
+            refs = self.storage.test_refs(test_name)
+            if refs is None or len(refs) != len(raw):
+                self._loaded[test_name] = Question.from_dicts(raw)
+            else:
+                q_list = []
+                for ref, data in zip(refs, raw):
+                    question = self._shared.get(ref)
+                    if question is None:
+                        question = self._shared[ref] = Question.from_dict(data)
+                    q_list.append(question)
+                self._loaded[test_name] = q_list
+        return self._loaded[test_name]
+
+    def __setitem__(self, test_name: str, q_list: List[Question]):
+        self._names[test_name] = None
+        self._loaded[test_name] = q_list
+
+    def __delitem__(self, test_name: str):
+        del self._names[test_name]
+        self._loaded.pop(test_name, None)
+
+    def __contains__(self, test_name) -> bool:
+        return test_name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def is_loaded(self, test_name: str) -> bool:
+        return test_name in self._loaded
+
+    def question_count(self, test_name: str) -> int:
+        if test_name in self._loaded:
+            return len(self._loaded[test_name])
+        return self.storage.question_count(test_name)
@@ -0,0 +1,65 @@
+import pytest
+
+from questions_module import (Question, SingleChoiceQuestion, MultiChoiceQuestion, TextQuestion, ScaleQuestion,
+                              TrueFalseQuestion, MatchingQuestion, OrderingQuestion, FillBlankQuestion)
+from binbank_module import BinaryBank, BinaryStorage, write_bank, json_to_binary, binary_to_json
+from storage_module import open_storage, JournalStorage
+
+QUESTIONS = [
+    SingleChoiceQuestion("2 + 2?", ["3", "4"], "4", topic="Математика"),
+    MultiChoiceQuestion("Мови?", ["Python", "HTML", "C++"], ["Python", "C++"]),
+    TextQuestion("ООП?", ["інкапсуляція"], fuzzy={"max_distance": 1, "transpositions": False, "stemming": True}),
+    ScaleQuestion("Оцінка?", 7, 2, difficulty=3),
+    TrueFalseQuestion("Так?", False),
+    MatchingQuestion("Столиці", {"Україна": "Київ", "Франція": "Париж"}),
+    OrderingQuestion("Порядок", ["a", "b", "c"]),
+    FillBlankQuestion("___ - столиця", ["Київ", "Kyiv"]),
+]
+RAW = {"Усі типи": [q.to_dict() for q in QUESTIONS],
+       "Порожній": [],
+       # Незвичні значення базових полів лишаються в JSON-навантаженні запису
+       "Дивний": [{"q_type": "TrueFalse", "text": "Без складності", "topic": "Т", "correct_bool": True,
+                   "difficulty": 2 ** 40}]}
+
+
+def test_round_trip_through_open_storage(tmp_path):
+    path = str(tmp_path / "tests.qbank")
+    write_bank(path, RAW)
+
+    storage = open_storage(path)
+    assert isinstance(storage, BinaryStorage)
+    bank = storage.load()
+    assert list(bank) == list(RAW)
+    for name, q_list in RAW.items():
+        assert storage.load_test(name) == q_list
+        assert storage.question_count(name) == len(q_list)
+    restored = Question.from_dicts(storage.load_test("Усі типи"))
+    assert [q.to_dict() for q in restored] == RAW["Усі типи"]
+    assert bank.question("Усі типи", 2).fuzzy == QUESTIONS[2].fuzzy
+    storage.load()  # перевідкриття закриває попередній mmap
+
+
+def test_conversion_to_and_from_json(tmp_path):
+    source = JournalStorage(str(tmp_path / "tests.json"))
+    source.load()
+    source.apply_ops([{"op": "put", "test": name, "questions": q_list} for name, q_list in RAW.items()])
+    json_to_binary(source.path, str(tmp_path / "tests.qbank"))
+    binary_to_json(str(tmp_path / "tests.qbank"), str(tmp_path / "back.json"))
+    back = JournalStorage(str(tmp_path / "back.json"))
+    back.load()
+    assert {name: back.load_test(name) for name in back.test_names()} == RAW
+
+
+def test_bad_magic_and_truncated_files_are_rejected(tmp_path):
+    path = tmp_path / "tests.qbank"
+    write_bank(str(path), RAW)
+    data = path.read_bytes()
+
+    broken = tmp_path / "broken.qbank"
+    for content in (b"XXXX" + data[4:], b"", data[:10], data[:len(data) // 2], data[:-1]):
+        broken.write_bytes(content)
+        with pytest.raises(ValueError):
+            BinaryBank(str(broken))
+    broken.write_bytes(data)
+    with BinaryBank(str(broken)) as bank:
+        assert bank["Усі типи"] == RAW["Усі типи"]
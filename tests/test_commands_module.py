@@ -0,0 +1,99 @@
+import copy
+
+from questions_module import TrueFalseQuestion, SingleChoiceQuestion
+from commands_module import CommandHistory, AddQuestion, DeleteQuestion, CreateTest, DeleteTest
+from storage_module import JournalStorage, LazyTestBank, apply_op
+
+
+def raw(tests):
+    return {name: [q.to_dict() for q in q_list] for name, q_list in tests.items()}
+
+
+def make_bank():
+    return {"A": [TrueFalseQuestion("A0?", True), TrueFalseQuestion("A1?", False)],
+            "B": [SingleChoiceQuestion("B0?", ["x", "y"], "x")]}
+
+
+def edit(history):
+    history.execute(AddQuestion("A", TrueFalseQuestion("A-new?", True), 1))
+    history.execute(DeleteQuestion("A", 0))
+    history.execute(CreateTest("C"))
+    history.execute(AddQuestion("C", SingleChoiceQuestion("C0?", ["1", "2"], "2")))
+    history.execute(DeleteTest("B"))
+
+
+def test_undo_restores_and_redo_reapplies():
+    tests = make_bank()
+    original = raw(tests)
+    history = CommandHistory(tests)
+    edit(history)
+    edited = raw(tests)
+    assert edited == {"A": [{**original["A"][0], "text": "A-new?"}, original["A"][1]],
+                      "C": [SingleChoiceQuestion("C0?", ["1", "2"], "2").to_dict()]}
+
+    while history.can_undo():
+        history.undo()
+    assert raw(tests) == original
+    assert list(tests) == ["A", "B"]
+
+    while history.can_redo():
+        history.redo()
+    assert raw(tests) == edited
+
+
+def test_new_command_clears_redo():
+    history = CommandHistory(make_bank())
+    edit(history)
+    history.undo()
+    assert history.can_redo()
+    history.execute(CreateTest("D"))
+    assert not history.can_redo()
+
+
+def test_emitted_ops_replay_to_the_same_bank():
+    tests = make_bank()
+    replayed = copy.deepcopy(raw(tests))
+    history = CommandHistory(tests)
+    edit(history)
+    history.undo()
+    history.undo()
+    history.redo()
+    for op in history.pending_ops:
+        apply_op(replayed, op)
+    assert replayed == raw(tests)
+
+
+def test_ops_saved_to_storage_match_the_editor(tmp_path):
+    storage = JournalStorage(str(tmp_path / "tests.json"))
+    storage.load()
+    storage.apply_ops([{"op": "put", "test": name, "questions": q_list} for name, q_list in raw(make_bank()).items()])
+
+    tests = LazyTestBank(storage)
+    history = CommandHistory(tests)
+    edit(history)
+    history.undo()
+    # Частина операцій записується, а решта лишається в журналі до наступного збереження
+    count = len(history.pending_ops) - 1
+    storage.apply_ops(history.pending_ops[:count])
+    history.mark_saved(count)
+    assert history.has_unsaved_changes()
+    storage.apply_ops(history.pending_ops)
+    history.mark_saved(len(history.pending_ops))
+    assert not history.has_unsaved_changes()
+
+    fresh = JournalStorage(storage.path)
+    fresh.load()
+    assert {name: list(fresh.load_test(name)) for name in fresh.test_names()} == raw(tests)
+
+
+def test_history_limit_drops_oldest_commands():
+    tests = {"A": []}
+    history = CommandHistory(tests, limit=3)
+    for i in range(5):
+        history.execute(AddQuestion("A", TrueFalseQuestion(f"{i}?", True)))
+    undone = 0
+    while history.can_undo():
+        history.undo()
+        undone += 1
+    assert undone == 3
+    assert [q.text for q in tests["A"]] == ["0?", "1?"]
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+import dedup_module
+from dedup_module import MinHashIndex, shingles, signature, similarity, cluster, cluster_bank
+from questions_module import SingleChoiceQuestion, TrueFalseQuestion
+
+WORDS = ("масив список словник кортеж множина рядок функція клас метод модуль пакет цикл умова виняток "
+         "ітератор генератор декоратор змінна значення індекс ключ об'єкт тип число байт файл потік").split()
+
+NEAR_DUPLICATES = [
+    ("Яка складність пошуку елемента у відсортованому масиві двійковим пошуком?",
+     "Яка складність пошуку елемента у відсортованому масиві бінарним пошуком?"),
+    ("Що повертає функція len для порожнього списку в Python?",
+     "Що повертає функція len() для порожнього списку у Python"),
+    ("Який тип даних у Python є незмінним: список, словник чи кортеж?",
+     "Який тип даних у Python є незмінним: кортеж, список чи словник?"),
+]
+
+
+def jaccard(a, b):
+    a, b = set(shingles(a)), set(shingles(b))
+    return len(a & b) / len(a | b)
+
+
+def sentence(rng, length=14):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def test_known_near_duplicates_are_found():
+    index = MinHashIndex()
+    for i, (original, _) in enumerate(NEAR_DUPLICATES):
+        index.add(i, original)
+    index.add("інше", "Назвіть столицю Франції та рік її заснування")
+    for i, (_, variant) in enumerate(NEAR_DUPLICATES):
+        assert [key for _, key in index.query(variant)] == [i]
+
+
+def test_reordered_options_match_through_question_content():
+    index = MinHashIndex()
+    first = SingleChoiceQuestion("Яка складність вставки в кінець списку?", ["O(1)", "O(n)", "O(log n)"], "O(1)")
+    second = SingleChoiceQuestion("Яка складність вставки в кінець списку?", ["O(n)", "O(log n)", "O(1)"], "O(1)")
+    other = TrueFalseQuestion("Кортеж можна змінити після створення", False)
+    for q in (first, second, other):
+        index.add_question(q)
+    assert [key for _, key in index.similar_questions(first)] == [second]
+    assert index.similar_questions(other) == []
+
+
+def test_similarity_estimates_jaccard():
+    rng = random.Random(3)
+    for _ in range(20):
+        a = sentence(rng)
+        words = a.split()
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+        b = " ".join(words)
+        # Стандартне відхилення оцінки з 64 перестановок не більше 1/16
+        assert abs(similarity(signature(a), signature(b)) - jaccard(a, b)) < 0.25
+
+
+def test_lsh_recall_on_generated_near_duplicates():
+    rng = random.Random(11)
+    index = MinHashIndex(threshold=0.5)
+    pairs = []
+    for i in range(200):
+        text = sentence(rng, 20)
+        words = text.split()
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+        variant = " ".join(words)
+        if jaccard(text, variant) >= 0.8:
+            index.add(i, text)
+            pairs.append((i, variant))
+    found = sum(1 for i, variant in pairs if i in {key for _, key in index.query(variant)})
+    # За кривою 1 - (1 - s^4)^16 пару з s >= 0.8 кошики пропускають з імовірністю < 2%
+    assert len(pairs) > 100
+    assert found / len(pairs) >= 0.95
+
+
+def test_remove_and_readd():
+    index = MinHashIndex()
+    index.add("a", NEAR_DUPLICATES[0][0])
+    index.add("a", NEAR_DUPLICATES[1][0])
+    assert len(index) == 1
+    assert index.query(NEAR_DUPLICATES[0][1]) == []
+    index.remove("a")
+    assert "a" not in index and index.query(NEAR_DUPLICATES[1][1]) == []
+    assert all(not buckets for buckets in index._buckets)
+
+
+def test_signature_without_numpy_is_the_same(monkeypatch):
+    text = NEAR_DUPLICATES[0][0]
+    expected = signature(text)
+    monkeypatch.setattr(dedup_module, "np", None)
+    assert signature(text) == expected
+
+
+def test_cluster_groups_near_duplicates():
+    pytest.importorskip("numpy")
+    texts = [text for pair in NEAR_DUPLICATES for text in pair] + ["Назвіть столицю Франції та рік її заснування"]
+    assert dedup_module.signature_matrix(texts).tolist() == [list(signature(text)) for text in texts]
+    groups = sorted(sorted(group) for group in cluster(texts))
+    assert groups == [[0, 1], [2, 3], [4, 5]]
+
+    bank = {"A": [TrueFalseQuestion(NEAR_DUPLICATES[0][0], True)],
+            "B": [TrueFalseQuestion("Інше питання про файли", True), TrueFalseQuestion(NEAR_DUPLICATES[0][1], True)]}
+    assert [[(item["test"], item["index"]) for item in group] for group in cluster_bank(bank)] == [[("A", 0), ("B", 1)]]
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from fuzzy_module import (bounded_distance, stem, normalize_text, auto_distance, _deletions, FuzzyMatcher,
+                          MIN_STEM)
+
+
+def osa_distance(a, b, transpositions=True):
+    # Еталон: повна матриця без смуги і без раннього виходу
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if transpositions and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+@pytest.mark.parametrize("transpositions", [True, False])
+def test_bounded_distance_matches_osa_reference(transpositions):
+    rng = random.Random(1)
+    pairs = [("kitten", "sitting"), ("ab", "ba"), ("ca", "abc"), ("функція", "фукнція"), ("", "abc"), ("a", "")]
+    pairs += [("".join(rng.choice("abc") for _ in range(rng.randint(0, 7))),
+               "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))) for _ in range(500)]
+    for a, b in pairs:
+        exact = osa_distance(a, b, transpositions)
+        for limit in range(4):
+            assert bounded_distance(a, b, limit, transpositions) == min(exact, limit + 1), (a, b, limit)
+
+
+def test_cutoff_boundary():
+    # kitten -> sitting: 3 правки. На межі відстань ще точна, на крок нижче - limit + 1
+    assert bounded_distance("kitten", "sitting", 3) == 3
+    assert bounded_distance("kitten", "sitting", 2) == 3
+    assert bounded_distance("ab", "ba", 1) == 1
+    assert bounded_distance("ab", "ba", 1, transpositions=False) == 2
+    assert bounded_distance("ab", "ba", 0) == 1
+
+
+def test_deletions():
+    assert _deletions("abc", 0) == {"abc"}
+    assert _deletions("abc", 1) == {"abc", "bc", "ac", "ab"}
+    assert _deletions("abc", 2) == {"abc", "bc", "ac", "ab", "a", "b", "c"}
+
+
+def test_deletion_index_finds_every_word_within_limit():
+    rng = random.Random(2)
+    vocabulary = ["функція", "змінна", "цикл", "клас", "object", "variable", "масив"]
+    matcher = FuzzyMatcher(vocabulary, stemming=False)
+    words = vocabulary + ["".join(rng.choice("абвгклмнорстуфцяі") for _ in range(rng.randint(2, 8)))
+                          for _ in range(300)]
+    words += ["фукнція", "змінан", "цикол", "клсс", "obejct", "varible", "масиви", "функцііі"]
+    for word in words:
+        token = normalize_text(word, stemming=False)[0]
+        expected = {i for i, v in enumerate(normalize_text(" ".join(vocabulary), stemming=False))
+                    if osa_distance(token, v) <= auto_distance(v)}
+        assert set(matcher.token_matches(word)) == expected, word
+
+
+@pytest.mark.parametrize("forms", [("функція", "функції", "функцію", "функцією"),
+                                   ("змінна", "змінні", "змінну", "змінною"),
+                                   ("масив", "масиву", "масиві", "масивами")])
+def test_ukrainian_forms_share_a_stem(forms):
+    assert len({stem(form) for form in forms}) == 1
+
+
+def test_stem_keeps_short_and_english_words():
+    assert stem("цикл") == "цикл"
+    # Основа не буває коротшою за MIN_STEM
+    assert stem("для") == "для"
+    assert stem("кола") == "кол" and len(stem("кола")) == MIN_STEM
+    assert normalize_text("for object") == normalize_text("for object", stemming=False)
+    # Латинські двійники літер зводяться до кириличних ще до відкидання закінчень
+    assert normalize_text("фyнкцiя") == normalize_text("функція")
+
+
+def test_matcher_counts_phrases_and_full_match():
+    matcher = FuzzyMatcher(["функція", "змінна", "цикл for"])
+    assert matcher.matches("Функцію та змінні") == 2
+    assert matcher.matches("фунція, цикл for") == 2
+    # Слова фрази мають іти поспіль і в тому самому порядку
+    assert matcher.matches("for цикл") == 0
+    assert FuzzyMatcher(["variable"]).matches("varaible") == 1
+    assert FuzzyMatcher(["variable"], transpositions=False, max_distance=1).matches("varaible") == 0
+    blank = FuzzyMatcher(["Київ", "Kyiv"])
+    assert blank.full_match("  киів ") and blank.full_match("Kyiv")
+    assert not blank.full_match("Київ і Львів")
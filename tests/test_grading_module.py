@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from questions_module import (SingleChoiceQuestion, MultiChoiceQuestion, TextQuestion, ScaleQuestion,
+                              TrueFalseQuestion, MatchingQuestion, OrderingQuestion, FillBlankQuestion)
+from grading_module import grade_sheets, grade_file, student_result, decode_sheet, grade_rows, GradingCache
+from pipeline_module import run_pipeline
+
+QUESTIONS = [
+    SingleChoiceQuestion("2 + 2?", ["3", "4"], "4"),
+    MultiChoiceQuestion("Мови?", ["Python", "HTML", "C++"], ["Python", "C++"]),
+    TextQuestion("ООП?", ["інкапсуляція"]),
+    ScaleQuestion("Оцінка?", 7, 1),
+    TrueFalseQuestion("Так?", True),
+    MatchingQuestion("Столиці", {"Україна": "Київ", "Франція": "Париж"}),
+    OrderingQuestion("Порядок", ["a", "b", "c"]),
+    FillBlankQuestion("___ - столиця", ["Київ"]),
+]
+GOOD = ["4", ["Python", "C++"], "інкапсуляція", 7, "так", [["Україна", "Київ"], ["Франція", "Париж"]],
+        ["a", "b", "c"], "київ"]
+BAD = [4, 5, ["інкапсуляція"], [7], {"x": 1}, [["лише ключ"]], 3, None]
+
+
+def test_int_answer_to_single_choice_is_coerced():
+    assert grade_sheets(QUESTIONS[:1], [{"answers": [4]}]) == [[1.0]]
+
+
+def test_wrong_types_score_zero_and_are_reported():
+    sheets = [{"student": "good", "answers": GOOD}, {"student": "bad", "answers": BAD},
+              {"student": "inf", "answers": [None, None, None, float("inf")]}]
+    rows = [decode_sheet(QUESTIONS, sheet) for sheet in sheets]
+    scores = grade_rows(QUESTIONS, rows)
+    results = [student_result(sheet, row, decoded) for sheet, row, decoded in zip(sheets, scores, rows)]
+
+    assert results[0]["score"] == len(QUESTIONS) and "invalid" not in results[0]
+    # 4 -> "4" для SingleChoice - правильна відповідь; None - це пропуск, а не помилка
+    assert results[1]["scores"][0] == 1.0
+    assert sum(results[1]["scores"][1:]) == 0.0
+    assert results[1]["invalid"] == [1, 2, 3, 4, 5, 6]
+    assert results[2]["invalid"] == [3]
+
+
+def test_cache_gives_same_scores_on_bad_input():
+    sheets = [{"answers": BAD}, {"answers": GOOD}] * 3
+    assert grade_sheets(QUESTIONS, sheets, GradingCache()) == grade_sheets(QUESTIONS, sheets)
+
+
+@pytest.fixture
+def files(tmp_path):
+    tests = tmp_path / "tests.json"
+    tests.write_text(json.dumps({"Т": [q.to_dict() for q in QUESTIONS]}, ensure_ascii=False), encoding="utf-8")
+    sheets = tmp_path / "sheets.jsonl"
+    lines = [{"student": i, "answers": BAD if i % 3 == 0 else GOOD} for i in range(30)]
+    lines.append({"student": "not a list", "answers": 5})
+    sheets.write_text("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines), encoding="utf-8")
+    return str(tests), str(sheets), tmp_path
+
+
+def read_results(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_pipeline_and_pool_survive_bad_sheets(files):
+    tests, sheets, tmp_path = files
+    pipeline = run_pipeline("Т", sheets, str(tmp_path / "p.jsonl"), batch_size=7, tests_file=tests)
+    pooled = grade_file("Т", sheets, str(tmp_path / "g.jsonl"), workers=2, chunk_size=5, tests_file=tests)
+    assert pipeline.students == pooled.students == 31
+    assert pipeline.to_dict()["mean_score"] == pytest.approx(pooled.to_dict()["mean_score"])
+    for path in ("p.jsonl", "g.jsonl"):
+        invalid = [r for r in read_results(tmp_path / path) if "invalid" in r]
+        assert len(invalid) == 10
+
+
+def append_bad_lines(sheets):
+    with open(sheets, "a", encoding="utf-8") as f:
+        f.write('{"student": "torn", "answers": [\n[1, 2]\n"рядок"\n')
+
+
+def test_pipeline_and_pool_skip_lines_that_are_not_sheets(files):
+    tests, sheets, tmp_path = files
+    append_bad_lines(sheets)
+    pipeline = run_pipeline("Т", sheets, str(tmp_path / "p.jsonl"), batch_size=7, tests_file=tests)
+    pooled = grade_file("Т", sheets, str(tmp_path / "g.jsonl"), workers=2, chunk_size=2, tests_file=tests)
+    for report, path in ((pipeline, "p.jsonl"), (pooled, "g.jsonl")):
+        assert report.students == 31
+        assert report.to_dict()["skipped_lines"] == 3
+        assert len(read_results(tmp_path / path)) == 31
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from questions_module import SingleChoiceQuestion
+from grading_module import grade_file
+from irt_module import load_results_matrix, calibrate, params_path, save_test_params, load_bank_params
+
+QUESTIONS = [SingleChoiceQuestion(f"Питання {i}?", ["так", "ні"], "так") for i in range(3)]
+
+
+def test_missing_answers_stay_missing(tmp_path):
+    tests = tmp_path / "tests.json"
+    tests.write_text(json.dumps({"Т": [q.to_dict() for q in QUESTIONS]}, ensure_ascii=False), encoding="utf-8")
+    sheets = tmp_path / "sheets.jsonl"
+    lines = [{"student": 1, "answers": ["так", "ні", None]}, {"student": 2, "answers": {"1": "так"}}]
+    sheets.write_text("".join(json.dumps(line, ensure_ascii=False) + "\n" for line in lines), encoding="utf-8")
+    grade_file("Т", str(sheets), str(tmp_path / "results.jsonl"), tests_file=str(tests))
+
+    matrix = load_results_matrix(str(tmp_path / "results.jsonl"))
+    np.testing.assert_array_equal(matrix, [[1.0, 0.0, np.nan], [np.nan, 1.0, np.nan]])
+    a, b = calibrate(matrix, iterations=5)
+    assert np.isfinite(a).all() and np.isfinite(b).all()
+
+
+def test_bank_params_file(tmp_path):
+    path = params_path(str(tmp_path / "tests.json"))
+    assert path == str(tmp_path / "tests.irt.json") == params_path(str(tmp_path / "tests.d") + "/")
+    save_test_params(path, "А", np.array([1.5, 0.5]), np.array([-1.0, 2.0]))
+    save_test_params(path, "Б", np.array([1.0]), np.array([0.0]))
+    params = load_bank_params(path)
+    assert sorted(params) == ["А", "Б"]
+    np.testing.assert_array_equal(params["А"][1], [-1.0, 2.0])
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from questions_module import SingleChoiceQuestion, TrueFalseQuestion
+from item_analysis_module import analyze_file, analyze_sheets
+
+QUESTIONS = [SingleChoiceQuestion("2 + 2?", ["3", "4"], "4"), TrueFalseQuestion("Так?", True)]
+SHEETS = [{"answers": ["4", True]}, {"answers": ["3", True]}, {"answers": ["4", False]}, {"answers": ["3"]}]
+
+
+def test_malformed_lines_are_skipped_and_counted(tmp_path):
+    tests = tmp_path / "tests.json"
+    tests.write_text(json.dumps({"Т": [q.to_dict() for q in QUESTIONS]}, ensure_ascii=False), encoding="utf-8")
+    sheets = tmp_path / "sheets.jsonl"
+    lines = [json.dumps(sheet, ensure_ascii=False) for sheet in SHEETS] + ["{bad", "[1, 2]", '"рядок"']
+    sheets.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    report = analyze_file("Т", str(sheets), workers=2, chunk_size=2, tests_file=str(tests))
+    assert report["students"] == 4
+    assert report["skipped"] == 3
+    assert [row["p_value"] for row in report["items"]] == [0.5, 0.5]
+    assert report["items"][1]["omitted"] == 1
+
+    clean = analyze_sheets(QUESTIONS, SHEETS)
+    assert "skipped" not in clean
+    assert clean["items"] == report["items"]
+
+
+def test_only_bad_sheets_give_empty_report():
+    assert analyze_sheets(QUESTIONS, [[1, 2], None]) == {"students": 0, "items": [], "skipped": 2}
+
+
+def test_discrimination_matches_float64_reference():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    answers = rng.random((3000, 2)) < np.array([0.3, 0.8])
+    sheets = [{"answers": ["4" if a else "3", bool(b)]} for a, b in answers]
+    report = analyze_sheets(QUESTIONS, sheets, chunk_size=700)
+
+    x = answers.astype(np.float64)
+    for i, row in enumerate(report["items"]):
+        rest = x.sum(axis=1) - x[:, i]
+        assert row["discrimination"] == pytest.approx(np.corrcoef(x[:, i], rest)[0, 1], abs=1e-9)
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from matcher_module import KeywordMatcher
+from questions_module import TextQuestion
+
+
+def scan(keywords, text):
+    # Старий спосіб: окрема перевірка "in" для кожного ключового слова
+    return sum(1 for keyword in keywords if keyword in text)
+
+
+@pytest.fixture(params=["scan", "automaton"])
+def matcher(request, monkeypatch):
+    # Той самий matches() і для кількох слів (вбудований пошук підрядка), і для автомата
+    if request.param == "automaton":
+        monkeypatch.setattr(KeywordMatcher, "AUTOMATON_MIN_KEYWORDS", 1)
+    return KeywordMatcher
+
+
+CASES = [
+    # Ключові слова, що перекриваються в тексті
+    (["abc", "bcd", "cde"], "abcde", 3),
+    (["aa", "aaa"], "aaaa", 2),
+    # Префікси і суфікси одне одного
+    (["he", "she", "his", "hers"], "ushers", 3),
+    (["клас", "класи", "підклас"], "підкласи", 3),
+    (["клас", "класи", "підклас"], "клас", 1),
+    # Повтори ключових слів рахуються, порожнє слово - завжди збіг
+    (["ооп", "ооп", ""], "про ооп", 3),
+    (["x"], "", 0),
+    # Юнікод: апостроф, ґ, латиниця поруч із кирилицею
+    (["об'єкт", "ґанок", "class"], "об'єкт class ґанок", 3),
+    (["об'єкт"], "об’єкт", 0),
+]
+
+
+@pytest.mark.parametrize("keywords, text, expected", CASES)
+def test_matches(matcher, keywords, text, expected):
+    assert matcher(keywords).matches(text) == expected == scan(keywords, text)
+
+
+def test_agrees_with_per_keyword_scan(matcher):
+    rng = random.Random(3)
+    alphabet = "абвгaб"
+    for _ in range(300):
+        keywords = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 4)))
+                    for _ in range(rng.randint(1, 12))]
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert matcher(keywords).matches(text) == scan(keywords, text), (keywords, text)
+
+
+def test_text_question_folds_case(matcher):
+    keywords = ["Інкапсуляція", "УСПАДКУВАННЯ", " поліморфізм ", "Straße", "ґанок", "об'єкт", "клас", "метод"]
+    question = TextQuestion("ООП?", keywords)
+    assert question.check("ІНКАПСУЛЯЦІЯ, успадкування, Поліморфізм, straße, Ґанок, ОБ'ЄКТ, Клас, Метод") == 1.0
+    assert question.check("інкапсуляція") == pytest.approx(1 / 8)
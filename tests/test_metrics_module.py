@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+import metrics_module
+from metrics_module import Registry, REGISTRY, enable, disable, serve, scrape, parse_prometheus
+from questions_module import SingleChoiceQuestion, TextQuestion
+from grading_module import grade_sheets
+from storage_module import ShardedStorage
+
+QUESTIONS = [SingleChoiceQuestion("2 + 2?", ["3", "4"], "4"), TextQuestion("ООП?", ["інкапсуляція"])]
+
+
+@pytest.fixture
+def instrumented():
+    REGISTRY.reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+        REGISTRY.reset()
+
+
+def test_grading_shows_up_in_metrics(instrumented):
+    sheets = [{"answers": ["4", "інкапсуляція"]}, {"answers": ["3"]}, {"answers": ["4", "ні"]}]
+    assert grade_sheets(QUESTIONS, sheets) == [[1.0, 1.0], [0.0, 0.0], [1.0, 0.0]]
+    QUESTIONS[0].check("4")
+
+    server = serve("127.0.0.1", 0)
+    try:
+        samples = scrape(f"http://127.0.0.1:{server.server_address[1]}/metrics")
+    finally:
+        server.shutdown()
+        server.server_close()
+    counts = {(name, labels.get("q_type")): value for name, labels, value in samples if name.endswith("_count")}
+    assert counts[("question_check_batch_seconds_count", "SingleChoice")] == 1
+    assert counts[("question_check_batch_seconds_count", "Text")] == 1
+    assert counts[("question_check_seconds_count", "SingleChoice")] == 1
+    buckets = [value for name, labels, value in samples
+               if name == "question_check_batch_seconds_bucket" and labels["q_type"] == "Text"]
+    assert buckets == sorted(buckets) and buckets[-1] == 1
+
+
+def test_disable_restores_methods():
+    original = SingleChoiceQuestion.check
+    enable()
+    assert metrics_module.is_enabled() and SingleChoiceQuestion.check is not original
+    disable()
+    assert not metrics_module.is_enabled() and SingleChoiceQuestion.check is original
+    REGISTRY.reset()
+
+
+def test_export_while_series_are_added():
+    registry = Registry()
+    total = 2000
+
+    def add_series():
+        for i in range(total):
+            registry.histogram(f"metric_{i % 50}", "Довідка", worker=str(i)).observe(0.001)
+
+    thread = threading.Thread(target=add_series)
+    thread.start()
+    try:
+        while thread.is_alive():
+            parse_prometheus(registry.to_prometheus())
+            registry.snapshot()
+    finally:
+        thread.join()
+    samples = parse_prometheus(registry.to_prometheus())
+    assert sum(value for name, _, value in samples if name.endswith("_count")) == total
+
+
+def test_every_storage_backend_is_instrumented(instrumented, tmp_path):
+    storage = ShardedStorage(str(tmp_path / "tests.d"))
+    storage.load()
+    storage.apply_ops([{"op": "put", "test": "A", "questions": [QUESTIONS[0].to_dict()]}])
+    storage.load_test("A")
+
+    counts = {(labels["backend"], labels["method"]): value
+              for name, labels, value in parse_prometheus(REGISTRY.to_prometheus())
+              if name == "storage_seconds_count"}
+    for method in ("load", "apply_ops", "load_test"):
+        assert counts[("ShardedStorage", method)] >= 1
+    assert ("JournalStorage", "load") in counts
@@ -0,0 +1,74 @@
+import pytest
+
+import questions_module
+from questions_module import (Question, QUESTION_TYPES, SingleChoiceQuestion, MultiChoiceQuestion, TextQuestion,
+                              ScaleQuestion, TrueFalseQuestion, MatchingQuestion, OrderingQuestion,
+                              FillBlankQuestion)
+
+
+def test_subclass_without_own_q_type_is_not_registered():
+    class LoggedTrueFalse(TrueFalseQuestion):
+        pass
+
+    assert QUESTION_TYPES["TrueFalse"] is TrueFalseQuestion
+    question = Question.from_dict(TrueFalseQuestion("Так?", True).to_dict())
+    assert type(question) is TrueFalseQuestion
+
+
+# Питання кожного зареєстрованого типу і відповіді: правильні, часткові, з іншим регістром і пробілами,
+# порожні, None і значення не того типу
+CASES = {
+    "SingleChoice": (SingleChoiceQuestion("2 + 2?", ["3", "4"], " Чотири "),
+                     ["чотири", " ЧОТИРИ ", "4", "", None, "три", 4, ["чотири"]]),
+    "MultiChoice": (MultiChoiceQuestion("Мови?", ["Python", "HTML", "C++"], ["Python", "C++"]),
+                    [["Python", "C++"], ["Python"], ["python"], ["Python", "HTML"], ["Python", "Python"],
+                     [], None, ["HTML", "CSS", "Java"], ("C++",)]),
+    "Text": (TextQuestion("ООП?", ["Інкапсуляція", "успадкування", "поліморфізм"]),
+             ["інкапсуляція, успадкування і поліморфізм", "  ІНКАПСУЛЯЦІЯ ", "Успадкування", "", None,
+              "нічого", 5, ["інкапсуляція"]]),
+    "Scale": (ScaleQuestion("Оцінка?", 7, 1),
+              [7, "7", " 7 ", 8, "6", 5, 7.9, "сім", "", None, True, [7], 10 ** 30]),
+    "TrueFalse": (TrueFalseQuestion("Так?", True), [True, False, 1, 0, "так", None, [True]]),
+    "Matching": (MatchingQuestion("Столиці", {"Україна": "Київ", "Франція": "Париж"}),
+                 [{"Україна": "Київ", "Франція": "Париж"}, {"Україна": "Київ"}, {"Україна": "київ"}, {},
+                  None, {"Італія": "Рим"}, [("Україна", "Київ")], 5]),
+    "Ordering": (OrderingQuestion("Порядок", ["a", "b", "c"]),
+                 [["a", "b", "c"], ["a", "c", "b"], ["c", "b", "a"], ["A", "b", "c"], ["a", "b"], [], None,
+                  ["a", "b", "c", "d"], "abc", ["x", "y", "z"]]),
+    "FillBlank": (FillBlankQuestion("___ - столиця", ["Київ", "Kyiv"]),
+                  ["київ", " КИЇВ ", "Kyiv", "kiev", "", None, 5, ["Київ"]]),
+}
+BATCH_ERRORS = (TypeError, ValueError, AttributeError, OverflowError, KeyError)
+
+
+def scalar(question, answer):
+    try:
+        return question.check(answer)
+    except BATCH_ERRORS as e:
+        return type(e)
+
+
+def test_every_registered_type_has_cases():
+    assert set(CASES) == set(QUESTION_TYPES)
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+@pytest.mark.parametrize("q_type", sorted(CASES))
+def test_check_batch_matches_check(q_type, use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(questions_module, "np", None)
+    question, answers = CASES[q_type]
+    expected = [scalar(question, answer) for answer in answers]
+
+    # Кожна відповідь окремо: той самий бал або та сама помилка, що й у check
+    for answer, value in zip(answers, expected):
+        if isinstance(value, type):
+            with pytest.raises(BATCH_ERRORS):
+                question.check_batch([answer])
+        else:
+            assert question.check_batch([answer]) == [value]
+
+    # Усі відповіді, на яких check не падає, - одним пакетом, у тому самому порядку
+    valid = [(answer, value) for answer, value in zip(answers, expected) if not isinstance(value, type)]
+    assert question.check_batch([answer for answer, _ in valid]) == [value for _, value in valid]
+    assert question.check_batch([]) == []
@@ -0,0 +1,50 @@
+import json
+
+from results_module import AttemptStore
+
+
+def test_damaged_lines_are_skipped(tmp_path):
+    path = tmp_path / "attempts.jsonl"
+    good = {"test": "Т", "score": 1.0, "max_score": 2, "time": 3.0,
+            "answers": [{"question": "q1", "topic": "a", "score": 1.0}, {"question": "q2", "score": 0.0}]}
+    lines = [good, [1, 2], 5, {"test": "Т"}, {"test": "Т", "score": "x", "max_score": 1},
+             {"test": "Т", "score": 1.0, "max_score": 1, "answers": [{"question": "q1"}]},
+             {"test": "Т", "score": 1.0, "max_score": 1, "answers": 7}, good]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines) + "{\"test\": \"обрізаний", encoding="utf-8")
+
+    store = AttemptStore(str(path))
+    assert store.test_stats("Т").count == 2
+    assert store.question_stats("q1").count == 2
+    assert store.topic_stats("a").mean == 1.0
+    store.close()
+    assert AttemptStore(str(path)).test_stats("Т").count == 2
+
+
+def test_record_after_torn_line_is_kept(tmp_path):
+    path = tmp_path / "attempts.jsonl"
+    path.write_text(json.dumps({"test": "Т", "score": 1.0, "max_score": 1}) + "\n{\"test\": \"обрізаний",
+                    encoding="utf-8")
+
+    store = AttemptStore(str(path))
+    store.record("Т", [{"question": "q1", "score": 0.0}])
+    store.record("Т", [{"question": "q1", "score": 1.0}])
+    store.close()
+    assert path.read_bytes().count(b"\n") == 3
+    reopened = AttemptStore(str(path))
+    assert reopened.test_stats("Т").count == 3
+    assert reopened.question_stats("q1").count == 2
+    # Зсув у знімку відповідає файлу: без знімка виходить те саме
+    (tmp_path / "attempts.jsonl.stats").unlink()
+    assert AttemptStore(str(path)).test_stats("Т").count == 3
+
+
+def test_untimed_attempt_has_no_time(tmp_path):
+    store = AttemptStore(str(tmp_path / "attempts.jsonl"))
+    attempt = store.record("Т", [{"question": "q1", "score": 1.0}])
+    assert attempt["time"] is None
+    stats = store.test_stats("Т")
+    assert stats.count == 1 and stats.times.count == 0 and stats.time_percentile(50) is None
+
+    timed = store.record("Т", [{"question": "q1", "score": 1.0, "time": 2.0}, {"question": "q2", "score": 0.0}])
+    assert timed["time"] == 2.0
+    assert store.test_stats("Т").times.count == 1
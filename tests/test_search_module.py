@@ -0,0 +1,75 @@
+from questions_module import SingleChoiceQuestion, TrueFalseQuestion
+from search_module import SearchIndex, tokenize
+
+LOOP = TrueFalseQuestion("Цикл for у Python перебирає елементи послідовності", True, topic="Цикли")
+WHILE = TrueFalseQuestion("Тіло циклу while виконується, поки умова істинна", True, topic="Цикли")
+DICT = SingleChoiceQuestion("Що повертає метод get словника для відсутнього ключа?", ["None", "KeyError", "0"], "None",
+                            topic="Словники")
+APOSTROPHE = TrueFalseQuestion("З'єднайте рядки методом join", True, topic="Рядки")
+QUESTIONS = [LOOP, WHILE, DICT, APOSTROPHE]
+
+
+def make_index():
+    index = SearchIndex()
+    for q in QUESTIONS:
+        index.add(q)
+    return index
+
+
+def test_tokenize_folds_case_and_apostrophes():
+    assert tokenize("З'єднайте  РЯДКИ, м’ята!") == ["зєднайте", "рядки", "мята"]
+
+
+def test_word_is_a_token_prefix_not_a_substring():
+    index = make_index()
+    assert set(index.search("цикл")) == {LOOP, WHILE}
+    assert index.search("циклу") == [WHILE]
+    # Старий пошук підрядком знаходив би "икл" і "ловник" усередині слів - тепер ні
+    assert index.search("икл") == []
+    assert index.search("ловник") == []
+    assert index.search("циклами") == []
+
+
+def test_all_query_words_are_required_in_any_order():
+    index = make_index()
+    assert index.search("while умова") == [WHILE]
+    assert index.search("умова while") == [WHILE]
+    assert index.search("while словник") == []
+    assert index.search("ЦИКЛ for") == [LOOP]
+
+
+def test_topic_options_and_apostrophes_are_searchable():
+    index = make_index()
+    assert index.search("словники") == [DICT]
+    assert index.search("keyerror") == [DICT]
+    assert index.search("з'єднайте") == index.search("зєдн") == [APOSTROPHE]
+
+
+def test_text_match_ranks_above_topic_match():
+    index = make_index()
+    # Префікс "цикл" є в темі всіх трьох питань, але лише в LOOP і WHILE - ще й у тексті
+    in_topic_only = TrueFalseQuestion("Як перервати виконання достроково?", True, topic="Цикли")
+    index.add(in_topic_only)
+    assert index.search("цикл")[-1] is in_topic_only
+
+
+def test_empty_query_returns_everything():
+    index = make_index()
+    assert set(index.search("")) == set(QUESTIONS)
+    assert set(index.search(" ,. ")) == set(QUESTIONS)
+
+
+def test_update_and_remove_keep_vocabulary_in_sync():
+    index = make_index()
+    edited = TrueFalseQuestion(APOSTROPHE.text, True, topic="Рядки")
+    index.add(edited)
+    edited.text = "Метод split розбиває рядок"
+    index.update(edited)
+    assert index.search("split") == [edited]
+    assert index.search("join") == [APOSTROPHE]
+
+    for q in QUESTIONS + [edited]:
+        index.remove(q)
+    index.remove(LOOP)
+    assert len(index) == 0 and index.search("цикл") == []
+    assert index._vocabulary == [] and index._postings == {}
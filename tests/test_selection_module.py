@@ -0,0 +1,82 @@
+import random
+from collections import Counter
+
+import pytest
+
+from questions_module import TrueFalseQuestion
+from selection_module import SelectionIndex
+
+QUESTIONS = [TrueFalseQuestion(f"Питання {i}", True, difficulty=1 + i % 3, topic="AB"[i % 2]) for i in range(30)]
+
+
+class ScriptedRandom:
+    """Замість випадкових чисел повертає заданий наперед сценарій індексів."""
+
+    def __init__(self, picks):
+        self.picks = list(picks)
+
+    def randrange(self, n):
+        pick = self.picks.pop(0)
+        assert 0 <= pick < n
+        return pick
+
+
+def test_buckets_and_filters():
+    index = SelectionIndex(QUESTIONS)
+    assert sum(len(bucket) for bucket in index.buckets.values()) == len(QUESTIONS)
+    for difficulty in (1, 2, 3):
+        for topic in "AB":
+            chosen = {index.choice(difficulty, topic, random.Random(seed)) for seed in range(50)}
+            assert chosen and all(q.difficulty == difficulty and q.topic == topic for q in chosen)
+    assert index.choice(4) is None
+    assert index.choice(1, "В") is None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sampler_draws_every_question_once(seed):
+    index = SelectionIndex(QUESTIONS)
+    sampler = index.sampler(random.Random(seed))
+    drawn = [sampler.draw() for _ in QUESTIONS]
+    assert sorted(map(id, drawn)) == sorted(map(id, QUESTIONS))
+    assert sampler.draw() is None
+    # Розріджена перестановка: на кошик не більше записів, ніж у ньому питань
+    assert all(len(swaps) <= len(index.buckets[key]) for key, swaps in sampler._swaps.items())
+
+
+def test_sampler_filters_without_repeats():
+    index = SelectionIndex(QUESTIONS)
+    sampler = index.sampler(random.Random(1))
+    first = [sampler.draw(2, "A") for _ in range(len(index.buckets[(2, "A")]))]
+    assert len(set(map(id, first))) == len(first)
+    assert sampler.draw(2, "A") is None
+    # Інші кошики вичерпання одного не зачіпає
+    rest = [sampler.draw() for _ in range(len(QUESTIONS) - len(first))]
+    assert not set(map(id, first)) & set(map(id, rest))
+    assert sampler.draw() is None
+
+
+def test_sparse_swap_reset_when_last_slot_is_drawn():
+    questions = [TrueFalseQuestion(f"Питання {i}", True) for i in range(4)]
+    index = SelectionIndex(questions)
+    # Кожен крок - пара чисел (кошик, слот). Крок 1 бере слот 0 і переносить туди останнє питання; крок 2 бере останній живий слот,
+    # тобто запис для r == last скидається сам на себе; далі знову слот 0 - перенесене питання
+    sampler = index.sampler(ScriptedRandom([0, 0, 0, 2, 0, 0, 0, 0]))
+    drawn = [sampler.draw() for _ in questions]
+    assert drawn == [questions[0], questions[2], questions[3], questions[1]]
+    assert sampler.draw() is None
+
+
+def test_sessions_share_index_but_not_state():
+    index = SelectionIndex(QUESTIONS)
+    first, second = index.sampler(random.Random(1)), index.sampler(random.Random(1))
+    drawn = [first.draw() for _ in range(10)]
+    assert [second.draw() for _ in range(10)] == drawn
+    assert [len(bucket) for bucket in index.buckets.values()] == [5] * 6
+
+
+def test_sampler_is_uniform_over_matching_questions():
+    index = SelectionIndex(QUESTIONS)
+    rng = random.Random(7)
+    counts = Counter(id(index.sampler(rng).draw(1)) for _ in range(5000))
+    assert len(counts) == 10
+    assert max(counts.values()) < 2 * min(counts.values())
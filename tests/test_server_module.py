@@ -0,0 +1,214 @@
+import asyncio
+import json
+
+import pytest
+
+from questions_module import SingleChoiceQuestion, TrueFalseQuestion, ScaleQuestion, MatchingQuestion
+from results_module import AttemptStore
+from server_module import ExamServer, ExamClient, irt_numpy
+
+needs_numpy = pytest.mark.skipif(irt_numpy is None, reason="режим cat потребує numpy")
+
+
+@pytest.fixture
+def tests_file(tmp_path):
+    questions = [SingleChoiceQuestion(f"Питання {i}?", ["так", "ні"], "так", difficulty=i % 3 + 1)
+                 for i in range(12)]
+    questions += [TrueFalseQuestion("Земля кругла?", True), ScaleQuestion("7?", 7, 1),
+                  MatchingQuestion("Столиці", {"Україна": "Київ", "Франція": "Париж"})]
+    path = tmp_path / "tests.json"
+    path.write_text(json.dumps({"Тест": [q.to_dict() for q in questions]}, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def run_with_server(tests_file, scenario, store=None):
+    # Сервер на вільному порту і клієнт-замінник в одному циклі подій
+    async def main():
+        server = ExamServer(tests_file, store=store)
+        listener = await server.serve("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return await scenario(server, port)
+        finally:
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(main())
+
+
+def answer_for(question):
+    if question["q_type"] == "TrueFalse":
+        return True
+    if question["q_type"] == "Scale":
+        return 7
+    if question["q_type"] == "Matching":
+        return {"Україна": "Київ", "Франція": "Париж"}
+    return "так"
+
+
+async def take_exam(port, mode):
+    client = ExamClient("127.0.0.1", port)
+    await client.connect()
+    try:
+        response = await client.request({"cmd": "start", "test": "Тест", "mode": mode})
+        session = response["session"]
+        question = response["question"]
+        answered = 0
+        while True:
+            response = await client.request({"cmd": "answer", "session": session, "answer": answer_for(question)})
+            answered += 1
+            if response["finished"]:
+                return response, answered
+            question = response["question"]
+    finally:
+        await client.close()
+
+
+@pytest.mark.parametrize("mode", ["basic", "timed", "adaptive", pytest.param("cat", marks=needs_numpy)])
+def test_session_modes(tests_file, mode):
+    async def scenario(server, port):
+        summary, answered = await take_exam(port, mode)
+        return summary, answered, len(server.sessions)
+
+    summary, answered, left = run_with_server(tests_file, scenario)
+    assert summary["finished"] is True
+    assert summary["score"] == pytest.approx(answered)
+    assert left == 0
+    if mode == "basic":
+        assert answered == summary["total"] == 15
+    if mode == "timed":
+        assert summary["time"] >= 0.0
+    if mode == "cat":
+        assert summary["theta"] > 0
+
+
+def test_concurrent_sessions(tests_file):
+    async def scenario(server, port):
+        return await asyncio.gather(*(take_exam(port, "basic") for _ in range(50)))
+
+    results = run_with_server(tests_file, scenario)
+    assert all(summary["score"] == 15 for summary, _ in results)
+
+
+def test_bad_input(tests_file):
+    async def scenario(server, port):
+        client = ExamClient("127.0.0.1", port)
+        await client.connect()
+        client.writer.write(b"{not json\n")
+        await client.writer.drain()
+        broken = json.loads(await client.reader.readline())
+        not_object = await client.request([1])
+        unknown = await client.request({"cmd": "fly"})
+        no_test = await client.request({"cmd": "start", "test": "Немає"})
+        bad_mode = await client.request({"cmd": "start", "test": "Тест", "mode": "turbo"})
+        no_session = await client.request({"cmd": "answer", "session": "x", "answer": "так"})
+        list_test = await client.request({"cmd": "start", "test": ["Тест"]})
+        list_session = await client.request({"cmd": "answer", "session": ["x"], "answer": "так"})
+        # Сесія переживає всі помилки і далі працює
+        started = await client.request({"cmd": "start", "test": "Тест"})
+        answered = await client.request({"cmd": "answer", "session": started["session"], "answer": "так"})
+        await client.close()
+        return broken, not_object, unknown, no_test, bad_mode, no_session, list_test, list_session, answered
+
+    *errors, answered = run_with_server(tests_file, scenario)
+    broken, not_object, unknown, no_test, bad_mode, no_session, list_test, list_session = errors
+    assert broken == {"error": "Некоректний JSON"}
+    for response in (not_object, unknown, no_test, bad_mode, no_session, list_test, list_session):
+        assert "error" in response
+    assert answered["result"] == 1.0
+
+
+def test_malformed_answer_is_not_reported_as_bad_json(tests_file):
+    async def scenario(server, port):
+        client = ExamClient("127.0.0.1", port)
+        await client.connect()
+        response = await client.request({"cmd": "start", "test": "Тест"})
+        session = response["session"]
+        while response["question"]["q_type"] != "Matching":
+            response = await client.request({"cmd": "answer", "session": session, "answer": "так"})
+        response = await client.request({"cmd": "answer", "session": session, "answer": [["лише ключ"]]})
+        await client.close()
+        return response
+
+    response = run_with_server(tests_file, scenario)
+    assert response.get("error") != "Некоректний JSON"
+
+
+def test_disconnect_drops_sessions(tests_file):
+    async def scenario(server, port):
+        clients = []
+        for _ in range(10):
+            client = ExamClient("127.0.0.1", port)
+            await client.connect()
+            await client.request({"cmd": "start", "test": "Тест"})
+            clients.append(client)
+        started = len(server.sessions)
+        for client in clients:
+            await client.close()
+        for _ in range(100):
+            if not server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        return started, len(server.sessions)
+
+    started, left = run_with_server(tests_file, scenario)
+    assert started == 10
+    assert left == 0
+
+
+@needs_numpy
+def test_cat_uses_calibrated_params(tests_file):
+    # Калібрування з tests.irt.json поруч із банком; тест з іншою кількістю питань отримує типові параметри
+    b = [float(i) - 7.0 for i in range(15)]
+    params = {"Тест": [{"a": 2.0, "b": value} for value in b], "Інший": [{"a": 1.0, "b": 0.0}]}
+    with open(tests_file.replace("tests.json", "tests.irt.json"), "w", encoding="utf-8") as f:
+        json.dump(params, f, ensure_ascii=False)
+
+    server = ExamServer(tests_file)
+    response = server.start("Тест", "cat")
+    assert "error" not in response
+    bank = server.item_banks["Тест"]
+    assert bank.a.tolist() == [2.0] * 15 and bank.b.tolist() == b
+    assert server.item_bank("Тест", server.tests["Тест"][:3]).a.tolist() == [1.0] * 3
+
+
+def test_finished_sessions_are_recorded(tests_file, tmp_path):
+    store = AttemptStore(str(tmp_path / "attempts.jsonl"))
+
+    async def scenario(server, port):
+        await take_exam(port, "timed")
+        await take_exam(port, "adaptive")
+
+    run_with_server(tests_file, scenario, store)
+    stats = store.test_stats("Тест")
+    assert stats.count == 2
+    assert stats.mean == pytest.approx((15 + 5) / 2)
+    assert stats.time_percentile(50) is not None
+    assert store.question_stats("SingleChoice:Питання 0?").count >= 1
+    # Після перезапуску агрегати відновлюються з файлу спроб
+    assert AttemptStore(str(tmp_path / "attempts.jsonl")).test_stats("Тест").count == 2
+
+
+def test_unexpected_error_keeps_connection(tests_file, monkeypatch):
+    async def scenario(server, port):
+        client = ExamClient("127.0.0.1", port)
+        await client.connect()
+        started = await client.request({"cmd": "start", "test": "Тест"})
+        with monkeypatch.context() as patch:
+            patch.setattr(server, "answer", lambda *args: 1 / 0)
+            failed = await client.request({"cmd": "answer", "session": started["session"], "answer": "так"})
+        answered = await client.request({"cmd": "answer", "session": started["session"], "answer": "так"})
+        await client.close()
+        return failed, answered
+
+    failed, answered = run_with_server(tests_file, scenario)
+    assert "error" in failed
+    assert answered["result"] == 1.0
+
+
+def test_cat_without_numpy_is_an_error_reply(tests_file, monkeypatch):
+    import irt_module
+    monkeypatch.setattr(irt_module, "np", None)
+    server = ExamServer(tests_file)
+    assert "error" in server.start("Тест", "cat")
+    assert "session" in server.start("Тест", "basic")
@@ -0,0 +1,147 @@
+import json
+import os
+
+import pytest
+
+import binbank_module
+import storage_module
+from binbank_module import BinaryStorage
+from storage_module import JsonStorage, JournalStorage, ShardedStorage
+
+
+def question(i):
+    return {"q_type": "TrueFalse", "text": f"Питання {i}", "difficulty": 1, "topic": "Загальне",
+            "correct_bool": True}
+
+
+OPS = [{"op": "add", "test": "A", "index": 1, "question": question(10)},
+       {"op": "remove", "test": "A", "index": 0},
+       {"op": "put", "test": "B", "questions": [question(1), question(20)]},
+       {"op": "del", "test": "C"}]
+
+
+def make_storage(kind, tmp_path):
+    if kind == "sharded":
+        storage = ShardedStorage(str(tmp_path / "tests.d"))
+    else:
+        storage = kind(str(tmp_path / "tests.json"))
+    storage.load()
+    storage.apply_ops([{"op": "put", "test": "A", "questions": [question(0), question(1)]},
+                       {"op": "put", "test": "C", "questions": [question(1)]}])
+    return storage
+
+
+def bank(storage):
+    return {name: list(storage.load_test(name)) for name in sorted(storage.test_names())}
+
+
+def fail(*args, **kwargs):
+    raise OSError("диск заповнено")
+
+
+@pytest.mark.parametrize("kind", [JsonStorage, JournalStorage, "sharded", BinaryStorage])
+def test_failed_write_leaves_data_unchanged_and_retry_applies_once(kind, tmp_path, monkeypatch):
+    storage = make_storage(kind, tmp_path)
+    before = bank(storage)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(storage_module, "write_json_atomic", fail)
+        patch.setattr(JournalStorage, "_append", fail)
+        patch.setattr(binbank_module, "write_bank", fail)
+        with pytest.raises(OSError):
+            storage.apply_ops(OPS)
+    assert bank(storage) == before
+    if kind in (JsonStorage, JournalStorage):
+        assert sorted(storage.pool.refcounts.values()) == [1, 2]
+
+    # Повторне збереження тих самих операцій (як після on_save_error) застосовує їх рівно один раз
+    storage.apply_ops(OPS)
+    expected = {"A": [question(10), question(1)], "B": [question(1), question(20)]}
+    assert bank(storage) == expected
+    fresh = ShardedStorage(storage.path) if kind == "sharded" else kind(storage.path)
+    fresh.load()
+    assert bank(fresh) == expected
+
+
+def test_partial_journal_append_is_truncated(tmp_path, monkeypatch):
+    storage = make_storage(JournalStorage, tmp_path)
+    size = (tmp_path / "tests.json.journal").stat().st_size
+
+    real_fsync = storage_module.os.fsync
+    monkeypatch.setattr(storage_module.os, "fsync", fail)
+    with pytest.raises(OSError):
+        storage.apply_ops(OPS)
+    monkeypatch.setattr(storage_module.os, "fsync", real_fsync)
+
+    assert (tmp_path / "tests.json.journal").stat().st_size == size
+    fresh = JournalStorage(storage.path)
+    fresh.load()
+    assert bank(fresh) == {"A": [question(0), question(1)], "C": [question(1)]}
+
+
+def test_sharded_peek_does_not_cache_tests(tmp_path):
+    storage = make_storage("sharded", tmp_path)
+    fresh = ShardedStorage(storage.path)
+    fresh.load()
+    assert fresh.peek_test("A") == [question(0), question(1)]
+    assert fresh.peek_test("missing") == []
+    assert fresh._data == {} and fresh._known_hashes == {}
+
+
+def test_sharded_manifest_and_test_files_round_trip(tmp_path):
+    path = str(tmp_path / "tests.d")
+    storage = ShardedStorage(path)
+    storage.load()
+    names = ["A", "Тест / з символами: *?", "Порожній"]
+    storage.apply_ops([{"op": "put", "test": "A", "questions": [question(0), question(1)]},
+                       {"op": "put", "test": names[1], "questions": [question(2)]},
+                       {"op": "put", "test": names[2], "questions": []},
+                       {"op": "put", "test": "Видалений", "questions": [question(3)]},
+                       {"op": "del", "test": "Видалений"}])
+
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)["tests"]
+    assert sorted(manifest) == sorted(names)
+    files = sorted(os.listdir(path))
+    assert files == sorted(["manifest.json"] + [ShardedStorage.shard_name(name) for name in names])
+    for name, entry in manifest.items():
+        assert entry["file"] == ShardedStorage.shard_name(name)
+        with open(os.path.join(path, entry["file"]), encoding="utf-8") as f:
+            assert len(json.load(f)) == entry["count"]
+
+    fresh = ShardedStorage(path)
+    fresh.load()
+    # Кількість питань береться з маніфесту, без читання файлів тестів
+    assert {name: fresh.question_count(name) for name in fresh.test_names()} == {"A": 2, names[1]: 1, names[2]: 0}
+    assert fresh._data == {}
+    assert bank(fresh) == {"A": [question(0), question(1)], names[1]: [question(2)], names[2]: []}
+    assert not fresh.changed_externally()
+
+
+def test_shared_pool_questions_are_read_only_for_editor_commands(tmp_path):
+    from commands_module import CommandHistory, AddQuestion, DeleteQuestion, DeleteTest
+    from questions_module import TrueFalseQuestion
+    from storage_module import LazyTestBank
+
+    storage = make_storage(JournalStorage, tmp_path)
+    tests = LazyTestBank(storage)
+    # question(1) лежить у пулі один раз і стоїть і в A, і в C
+    shared = tests["A"][1]
+    assert tests["C"][0] is shared
+    before = shared.to_dict()
+
+    history = CommandHistory(tests)
+    history.execute(DeleteQuestion("A", 1))
+    history.execute(AddQuestion("A", TrueFalseQuestion("Нове", False), 0))
+    history.execute(DeleteTest("A"))
+    while history.can_undo():
+        history.undo()
+    history.execute(DeleteQuestion("C", 0))
+    storage.apply_ops(history.pending_ops)
+
+    # Команди лише переставляють посилання: спільне питання і решта тестів не змінилися
+    assert shared.to_dict() == before
+    assert tests["A"][1] is shared and tests["A"][1].to_dict() == question(1)
+    fresh = JournalStorage(storage.path)
+    fresh.load()
+    assert bank(fresh) == {"A": [question(0), question(1)], "C": []}